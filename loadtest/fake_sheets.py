@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+# In-memory stand-in for the Google Sheets / Drive REST endpoints used by gspread.
+# Plugs in below gspread as its HTTP session, so utils.sheets runs unchanged
+# (used by the load-test harness in loadtest/run.py).
+
+import json as _json
+import re
+import threading
+import time
+from collections import Counter
+from urllib.parse import unquote, urlparse
+
+_NUM_RE = re.compile(r"^-?\d+(\.\d+)?$")
+
+
+class _Response:
+    def __init__(self, payload, status=200):
+        self._payload = payload
+        self.status_code = status
+        self.ok = status < 400
+        self.text = _json.dumps(payload)
+        self.content = self.text.encode("utf-8")
+
+    def json(self):
+        return self._payload
+
+
+class FakeSheetsSession:
+    """Minimal Sheets v4 + Drive v3 backend keeping every sheet as a list of rows."""
+
+    def __init__(self, spreadsheet_name="HR_Hours_System", latency=0.0):
+        self.name = spreadsheet_name
+        self.id = "fake-spreadsheet-id"
+        self.latency = latency
+        self.lock = threading.RLock()
+        self.calls = Counter()
+        self.sheets = {}          # title -> {"id": int, "rows": [[...]], "nrows": int, "ncols": int}
+        self._next_id = 1
+        self.headers = {}
+
+    # ---------- seeding / inspection ----------
+    def add_sheet(self, title, rows, nrows=1000, ncols=None):
+        width = max([len(r) for r in rows] + [ncols or 0, 1])
+        self.sheets[title] = {"id": self._next_id, "rows": [list(r) for r in rows],
+                              "nrows": max(nrows, len(rows)), "ncols": width}
+        self._next_id += 1
+
+    def values(self, title):
+        return [list(r) for r in self.sheets[title]["rows"]]
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    # ---------- requests.Session surface ----------
+    def request(self, method, url, json=None, params=None, data=None, files=None,
+                headers=None, timeout=None):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            path = unquote(urlparse(url).path)
+            key, payload = self._dispatch(method.lower(), path, json or {}, params or {})
+            self.calls[key] += 1
+            return _Response(payload)
+
+    def close(self):
+        pass
+
+    # ---------- routing ----------
+    def _dispatch(self, method, path, body, params):
+        if path.startswith("/drive/v3/files"):
+            return "drive.files", {"files": [{"id": self.id, "name": self.name,
+                                              "createdTime": "", "modifiedTime": ""}]}
+        m = re.match(r"^/v4/spreadsheets/[^/:]+(.*)$", path)
+        rest = m.group(1) if m else ""
+        if rest == "" and method == "get":
+            return "get", self._metadata()
+        if rest == ":batchUpdate":
+            return "batchUpdate", self._batch_update(body)
+        if rest == "/values:batchGet":
+            ranges = params.get("ranges") or []
+            if isinstance(ranges, str):
+                ranges = [ranges]
+            cols = params.get("majorDimension") == "COLUMNS"
+            return "values.batchGet", {"valueRanges": [
+                {"range": r, "values": self._get(r, cols)} for r in ranges]}
+        if rest == "/values:batchUpdate":
+            for item in body.get("data", []):
+                self._put(item["range"], item.get("values", []), body.get("valueInputOption"))
+            return "values.batchUpdate", {}
+        if rest == "/values:batchClear":
+            for r in body.get("ranges", []):
+                self._clear(r)
+            return "values.batchClear", {}
+        m = re.match(r"^/values/(.+?)(:clear|:append)?$", rest)
+        if m:
+            rng, verb = m.group(1), m.group(2)
+            if verb == ":clear":
+                self._clear(rng)
+                return "values.clear", {}
+            if verb == ":append":
+                return "values.append", self._append(rng, body.get("values", []),
+                                                     params.get("valueInputOption"))
+            if method == "put":
+                self._put(rng, body.get("values", []), params.get("valueInputOption"))
+                return "values.update", {}
+            cols = params.get("majorDimension") == "COLUMNS"
+            return "values.get", {"range": rng, "values": self._get(rng, cols)}
+        raise ValueError(f"unsupported fake endpoint: {method} {path}")
+
+    # ---------- helpers ----------
+    def _metadata(self):
+        return {
+            "spreadsheetId": self.id,
+            "properties": {"title": self.name, "locale": "en_US", "timeZone": "UTC"},
+            "sheets": [
+                {"properties": {"sheetId": s["id"], "title": t, "index": i, "sheetType": "GRID",
+                                "gridProperties": {"rowCount": s["nrows"], "columnCount": s["ncols"]}}}
+                for i, (t, s) in enumerate(self.sheets.items())
+            ],
+        }
+
+    def _by_id(self, sheet_id):
+        for t, s in self.sheets.items():
+            if s["id"] == sheet_id:
+                return t, s
+        raise KeyError(sheet_id)
+
+    def _batch_update(self, body):
+        replies = []
+        for req in body.get("requests", []):
+            if "addSheet" in req:
+                p = req["addSheet"]["properties"]
+                g = p.get("gridProperties", {})
+                self.add_sheet(p["title"], [], g.get("rowCount", 1000), g.get("columnCount", 26))
+                s = self.sheets[p["title"]]
+                replies.append({"addSheet": {"properties": {
+                    "sheetId": s["id"], "title": p["title"], "index": len(self.sheets) - 1,
+                    "sheetType": "GRID",
+                    "gridProperties": {"rowCount": s["nrows"], "columnCount": s["ncols"]}}}})
+            elif "appendDimension" in req:
+                r = req["appendDimension"]
+                _, s = self._by_id(r["sheetId"])
+                s["ncols" if r["dimension"] == "COLUMNS" else "nrows"] += r["length"]
+                replies.append({})
+            elif "updateSheetProperties" in req:
+                p = req["updateSheetProperties"]["properties"]
+                _, s = self._by_id(p["sheetId"])
+                g = p.get("gridProperties", {})
+                s["nrows"] = g.get("rowCount", s["nrows"])
+                s["ncols"] = g.get("columnCount", s["ncols"])
+                replies.append({})
+            elif "deleteSheet" in req:
+                t, _ = self._by_id(req["deleteSheet"]["sheetId"])
+                del self.sheets[t]
+                replies.append({})
+            else:
+                replies.append({})
+        return {"spreadsheetId": self.id, "replies": replies}
+
+    def _split(self, rng):
+        if "!" in rng:
+            title, a1 = rng.rsplit("!", 1)
+        else:
+            title, a1 = rng, ""
+        title = title.strip("'").replace("''", "'")
+        if title not in self.sheets:
+            raise ValueError(f"Unable to parse range: {rng}")
+        s = self.sheets[title]
+        from gspread.utils import a1_range_to_grid_range  # not at import: see loadtest/startup.py
+        g = a1_range_to_grid_range(a1) if a1 else {}
+        r0 = g.get("startRowIndex", 0)
+        r1 = g.get("endRowIndex", max(s["nrows"], len(s["rows"])))
+        c0 = g.get("startColumnIndex", 0)
+        c1 = g.get("endColumnIndex", s["ncols"])
+        return s, r0, r1, c0, c1
+
+    def _get(self, rng, columns=False):
+        s, r0, r1, c0, c1 = self._split(rng)
+        out = [list(row[c0:c1]) for row in s["rows"][r0:r1]]
+        if columns:
+            width = max([len(r) for r in out] + [0])
+            out = [[(r[j] if j < len(r) else "") for r in out] for j in range(width)]
+        for row in out:
+            while row and row[-1] in ("", None):
+                row.pop()
+        while out and not out[-1]:
+            out.pop()
+        return out
+
+    @staticmethod
+    def _coerce(v, mode):
+        if mode == "USER_ENTERED" and isinstance(v, str) and _NUM_RE.match(v.strip()):
+            f = float(v)
+            return int(f) if f.is_integer() and "." not in v else f
+        return "" if v is None else v
+
+    def _put(self, rng, values, mode=None):
+        s, r0, _, c0, _ = self._split(rng)
+        for i, row in enumerate(values):
+            ri = r0 + i
+            while len(s["rows"]) <= ri:
+                s["rows"].append([])
+            target = s["rows"][ri]
+            for j, v in enumerate(row):
+                cj = c0 + j
+                while len(target) <= cj:
+                    target.append("")
+                target[cj] = self._coerce(v, mode)
+        s["nrows"] = max(s["nrows"], len(s["rows"]))
+        s["ncols"] = max([s["ncols"]] + [len(r) for r in s["rows"]])
+
+    def _clear(self, rng):
+        s, r0, r1, c0, c1 = self._split(rng)
+        for row in s["rows"][r0:r1]:
+            for j in range(c0, min(c1, len(row))):
+                row[j] = ""
+        while s["rows"] and not any(v not in ("", None) for v in s["rows"][-1]):
+            s["rows"].pop()
+
+    def _append(self, rng, values, mode=None):
+        s, _, _, c0, _ = self._split(rng)
+        last = len(s["rows"])
+        while last > 0 and not any(v not in ("", None) for v in s["rows"][last - 1]):
+            last -= 1
+        title = rng.rsplit("!", 1)[0] if "!" in rng else rng
+        self._put(f"{title}!A{last + 1}", [[""] * c0 + list(r) for r in values], mode)
+        return {"updates": {"updatedRange": f"{title}!A{last + 1}", "updatedRows": len(values)}}
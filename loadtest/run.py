@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+# Multi-session load test for the Streamlit pages.
+# - Drives the real page scripts through streamlit.testing AppTest, one AppTest per
+#   simulated session, many sessions at once (threads), against the in-memory
+#   Sheets stand-in in loadtest/fake_sheets.py (optional per-call latency).
+# - Workloads: members submit, reviewers approve/reject, browsers open Analytics
+#   and Period Admin.
+# - Reports p50/p95/p99 latency and Sheets calls per action, throughput, and
+#   lost updates (acknowledged writes missing from the sheets after the journal
+#   is drained). Exit code 1 when updates were lost, a page raised, or reviewers
+#   ran but no decision went through.
+#
+#   python -m loadtest.run --members 20 --reviewers 4 --browsers 4 --actions 5 --latency 0.05
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from loadtest.fake_sheets import FakeSheetsSession  # noqa: E402
+
+PAGES = {
+    "member": os.path.join(ROOT, "pages", "1_Member_Form.py"),
+    "hr": os.path.join(ROOT, "pages", "2_HR_Review.py"),
+    "analytics": os.path.join(ROOT, "pages", "3_Analytics.py"),
+    "period": os.path.join(ROOT, "pages", "Period_Admin.py"),
+}
+SESSION_KEY = "__loadtest_session"
+DEPTS = ["الإعلام", "التنظيم", "التطوير", "العلاقات العامة"]
+HR_DEPT = "الموارد البشرية"
+_ID_RE = re.compile(r"#(\d+)")
+REVIEW_WAIT_SECONDS = 30   # a reviewer waits this long (in total) for pending requests
+
+# ---------------- Backend ----------------
+def seed(fake: FakeSheetsSession, n_members: int, tasks_per_dept: int, hr_members: int = 3):
+    """Member_Data / Tasks_Data for the run; the app bootstraps every other sheet."""
+    from utils import sheets as S
+
+    members = [[S.COL_AR_NAME, S.COL_EN_NAME, S.COL_NAT_ID, S.COL_STUD_ID, S.COL_EMAIL, S.COL_PHONE, S.COL_DEPT]]
+    for i in range(n_members):
+        members.append([f"عضو {i}", f"Member {i}", 1000000 + i, 441000 + i, "", "", DEPTS[i % len(DEPTS)]])
+    for i in range(hr_members):
+        members.append([f"مراجع {i}", f"Reviewer {i}", 2000000 + i, 442000 + i, "", "", HR_DEPT])
+    tasks = [[S.COL_TASK_NAME, S.COL_TASK_MINUTES, S.COL_TASK_DEPT]]
+    for d in DEPTS:
+        for j in range(tasks_per_dept):
+            tasks.append([f"مهمة {j} - {d}", 30 * (j + 1), d])
+    fake.add_sheet("Member_Data", members)
+    fake.add_sheet("Tasks_Data", tasks)
+
+def install(fake: FakeSheetsSession, rec: "Recorder"):
+    """Point utils.sheets at the stand-in and attribute every call to its session."""
+    import gspread
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    from utils import sheets as S
+
+    inner = fake.request
+
+    def request(*args, **kwargs):
+        ctx = get_script_run_ctx()
+        session = None
+        if ctx is not None and SESSION_KEY in ctx.session_state:
+            session = ctx.session_state[SESSION_KEY]
+        rec.count_call(session or "background")
+        return inner(*args, **kwargs)
+
+    fake.request = request
+    sh = gspread.Client(None, session=fake).open(fake.name)
+    S._open_spreadsheet = lambda: sh
+
+def isolate_sessions():
+    """Make AppTest safe for sessions running different pages at the same time.
+
+    AppTest installs and clears the global Runtime instance around every run,
+    patches config.get_option process-wide for the run, and Streamlit caches the
+    page list of one app in a module global; all three leak between concurrent
+    sessions. Keep one shared runtime, the AppTest option set once, and a page list
+    per script.
+    """
+    import contextlib
+    from unittest.mock import MagicMock
+
+    from streamlit import config, logger, source_util
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import app_test
+
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = shared
+    # AppTest's own set/reset now lands on this subclass instead of the shared slot
+    app_test.Runtime = type("SessionRuntime", (Runtime,), {})
+    # Overlapping runs restored each other's get_option patch, so a run could see
+    # global.appTest off: its widgets then skip registering their format_func and the
+    # session's next run fails with KeyError('$$ID-...'). Set it once, skip the patch.
+    config.set_option("global.appTest", True)
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+
+    pages, uncached = {}, source_util.get_pages
+
+    def get_pages(main_script_path):
+        with source_util._pages_cache_lock:
+            if main_script_path not in pages:
+                source_util._cached_pages = None
+                pages[main_script_path] = uncached(main_script_path)
+                source_util._cached_pages = None
+            return pages[main_script_path]
+
+    source_util.get_pages = get_pages
+    # bare-mode / background-thread warnings would drown the report
+    config.set_option("logger.level", "error")
+    logger.set_log_level("error")
+
+# ---------------- Recording ----------------
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = Counter()                 # session -> Sheets calls so far
+        self.samples = defaultdict(list)       # action -> [(seconds, sheets calls)]
+        self.errors = Counter()                # action -> page exceptions / timeouts
+        self.first_error = {}                  # action -> first error message
+        self.submitted = []                    # (request id, member name, queued)
+        self.decided = defaultdict(set)        # request id -> acknowledged statuses
+        self.decision_attempts = 0             # approve / reject clicks
+        self.conflicts = 0                     # request decided by someone else first
+        self.stale_selections = 0              # selection reset by a pending-list change
+
+    def count_call(self, session: str):
+        with self.lock:
+            self.calls[session] += 1
+
+    def step(self, at, action: str, interact=None, timeout: float = 120):
+        """Apply `interact` to the widgets, rerun the page, record latency + calls."""
+        session = at.session_state[SESSION_KEY]
+        before = self.calls[session]
+        t0 = time.perf_counter()
+        try:
+            if interact is not None:
+                interact()
+            at.run(timeout=timeout)
+        except Exception as e:
+            self._error(action, repr(e))
+            return False
+        elapsed = time.perf_counter() - t0
+        with self.lock:
+            self.samples[action].append((elapsed, self.calls[session] - before))
+        if len(at.exception):
+            self._error(action, at.exception[0].value)
+        return not len(at.exception)
+
+    def _error(self, action: str, message: str):
+        with self.lock:
+            self.errors[action] += 1
+            self.first_error.setdefault(action, message)
+
+def _open(rec: Recorder, page: str, session: str):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(PAGES[page])
+    at.session_state[SESSION_KEY] = session
+    rec.step(at, f"{page}.open")
+    return at
+
+def _select(at, label: str):
+    for sb in at.selectbox:
+        if sb.label == label:
+            return sb
+    return None
+
+def _button(at, label: str):
+    for b in at.button:
+        if b.label == label:
+            return b
+    return None
+
+def _messages(at) -> list[str]:
+    return [m.value for m in list(at.success) + list(at.info) + list(at.warning)]
+
+# ---------------- Workloads ----------------
+def member_session(rec: Recorder, idx: int, actions: int, think: float, seed_: int):
+    from utils import sheets as S
+
+    rng = random.Random(seed_)
+    at = _open(rec, "member", f"member-{idx}")
+    for _ in range(actions):
+        dept_sb = _select(at, "القسم")
+        if dept_sb is None:
+            break
+        dept = rng.choice([d for d in dept_sb.options if d in DEPTS] or dept_sb.options)
+        rec.step(at, "member.select", lambda: _select(at, "القسم").set_value(dept))
+        name_sb, task_sb = _select(at, "الاسم"), _select(at, "المهمة")
+        if not (name_sb and name_sb.options and task_sb and task_sb.options):
+            continue
+        # the name selectbox holds member-index positions (AppTest's select_index
+        # would hand the label to format_func), so pick a position directly
+        pos = rng.choice(S.get_member_index().by_dept(dept))
+        name = S.get_member_index().name(pos)
+        task = rng.choice(task_sb.options)
+
+        def pick():
+            _select(at, "الاسم").set_value(pos)
+            _select(at, "المهمة").set_value(task)
+        rec.step(at, "member.select", pick)
+
+        if rec.step(at, "member.submit", lambda: _button(at, "إرسال الطلب").click()):
+            for msg in _messages(at):
+                m = _ID_RE.search(msg)
+                if m:
+                    with rec.lock:
+                        rec.submitted.append((int(m.group(1)), name, "قائمة الانتظار" in msg))
+        time.sleep(think)
+
+def reviewer_session(rec: Recorder, idx: int, actions: int, think: float, seed_: int,
+                     approve_ratio: float):
+    from views.hr_review import SELECTED_KEY
+
+    rng = random.Random(seed_)
+    at = _open(rec, "hr", f"reviewer-{idx}")
+    done, waited = 0, 0.0
+    while done < actions:
+        rec.step(at, "hr.refresh")
+        req_sb, hr_sb = _select(at, "Request (pending only)"), _select(at, "HR Name *")
+        if not (req_sb and req_sb.options and hr_sb and hr_sb.options):
+            if waited >= REVIEW_WAIT_SECONDS:
+                break
+            # nothing submitted yet: wait instead of using up the action
+            pause = max(think, 0.2)
+            time.sleep(pause)
+            waited += pause
+            continue
+        done += 1
+        rid = int(_ID_RE.search(rng.choice(req_sb.options)).group(1))
+        hr_name = rng.choice(hr_sb.options)
+
+        def pick():
+            # by request id: the widget value, plus the id the page keeps in case a
+            # new submit rebuilds the dropdown before this rerun
+            at.session_state[SELECTED_KEY] = rid
+            _select(at, "Request (pending only)").set_value(rid)
+            _select(at, "HR Name *").set_value(hr_name)
+        rec.step(at, "hr.select", pick)
+
+        approve = rng.random() < approve_ratio
+        action, button, status = (("hr.approve", "Approve", "approved") if approve
+                                  else ("hr.reject", "Reject", "rejected"))
+        with rec.lock:
+            rec.decision_attempts += 1
+        if rec.step(at, action, lambda: _button(at, button).click()):
+            if any("لم يعد ضمن قائمة الانتظار" in e.value for e in at.error):
+                # still listed as pending: the page lost the selection, not the request
+                sb = _select(at, "Request (pending only)")
+                still_pending = bool(sb) and any(o.startswith(f"#{rid} ") for o in sb.options)
+                with rec.lock:
+                    if still_pending:
+                        rec.stale_selections += 1
+                    else:
+                        rec.conflicts += 1
+            elif not len(at.error):
+                with rec.lock:
+                    rec.decided[rid].add(status)
+        time.sleep(think)
+
+def browser_session(rec: Recorder, idx: int, actions: int, think: float, seed_: int):
+    rng = random.Random(seed_)
+    pages = {"analytics": _open(rec, "analytics", f"browser-{idx}-a"),
+             "period": _open(rec, "period", f"browser-{idx}-p")}
+    for _ in range(actions):
+        page = rng.choice(list(pages))
+        rec.step(pages[page], f"{page}.rerun")
+        time.sleep(think)
+
+# ---------------- Verification ----------------
+def lost_updates(fake: FakeSheetsSession, rec: Recorder) -> dict:
+    """Compare acknowledged writes with what ended up in the sheets."""
+    from utils import sheets as S
+
+    def key(v):
+        try:
+            return str(int(float(v)))
+        except (TypeError, ValueError):
+            return str(v)
+
+    def table(title):
+        rows = fake.values(title) if title in fake.sheets else []
+        if not rows:
+            return []
+        head = rows[0]
+        return [dict(zip(head, r + [""] * (len(head) - len(r)))) for r in rows[1:] if any(v != "" for v in r)]
+
+    # every Requests shard ("Requests" and "Requests - <dept>" when sharded)
+    requests = [r for title in fake.sheets
+                if title == S.SHEET_REQUESTS or title.startswith(S.SHEET_REQUESTS + " - ")
+                for r in table(title)]
+    by_id = defaultdict(list)
+    for r in requests:
+        by_id[key(r.get("id"))].append(r)
+    approved_ids = {key(r.get("id")) for r in table(S.SHEET_APPROVED)}
+    rejected_ids = {key(r.get("id")) for r in table(S.SHEET_REJECTED)}
+
+    missing = mismatched = 0
+    for rid, name, _ in rec.submitted:
+        rows = by_id.get(str(rid), [])
+        if not rows:
+            missing += 1
+        elif not any(str(r.get("name")) == name for r in rows):
+            mismatched += 1
+    lost_decisions = 0
+    for rid, statuses in rec.decided.items():
+        rows = by_id.get(str(rid), [])
+        final = str(rows[0].get("status")) if rows else ""
+        in_sheet = {"approved": approved_ids, "rejected": rejected_ids}.get(final, set())
+        if final not in statuses or str(rid) not in in_sheet:
+            lost_decisions += 1
+    return {
+        "submits_missing": missing,
+        "submits_mismatched": mismatched,
+        "duplicate_ids": sum(len(v) - 1 for v in by_id.values() if len(v) > 1),
+        "decisions_lost": lost_decisions,
+    }
+
+# ---------------- Report ----------------
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, max(0, int(round(p / 100 * len(s) + 0.5)) - 1))]
+
+def summarize(rec: Recorder, fake: FakeSheetsSession, wall: float, sessions: int, lost: dict) -> dict:
+    actions = {}
+    for action, samples in sorted(rec.samples.items()):
+        lat = [s for s, _ in samples]
+        calls = [c for _, c in samples]
+        actions[action] = {
+            "n": len(samples),
+            "p50_ms": 1000 * _pct(lat, 50),
+            "p95_ms": 1000 * _pct(lat, 95),
+            "p99_ms": 1000 * _pct(lat, 99),
+            "calls_per_action": sum(calls) / len(calls),
+            "errors": rec.errors.get(action, 0),
+        }
+    total = sum(len(s) for s in rec.samples.values())
+    return {
+        "sessions": sessions,
+        "wall_s": wall,
+        "actions": total,
+        "throughput_per_s": total / wall if wall else 0.0,
+        "sheets_calls": fake.total_calls(),
+        "sheets_calls_background": rec.calls.get("background", 0),
+        "sheets_calls_by_endpoint": dict(fake.calls),
+        "submitted": len(rec.submitted),
+        "queued_submits": sum(1 for *_, q in rec.submitted if q),
+        "decisions": len(rec.decided),
+        "decision_attempts": rec.decision_attempts,
+        "decided_ratio": len(rec.decided) / rec.decision_attempts if rec.decision_attempts else 0.0,
+        "decision_conflicts": rec.conflicts,
+        "stale_selections": rec.stale_selections,
+        "lost_updates": lost,
+        "by_action": actions,
+        "errors": sum(rec.errors.values()),
+        "first_errors": dict(rec.first_error),
+    }
+
+def print_report(r: dict):
+    print(f"\nsessions={r['sessions']}  actions={r['actions']}  wall={r['wall_s']:.1f}s  "
+          f"throughput={r['throughput_per_s']:.2f} actions/s")
+    print(f"{'action':<18}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'calls/act':>11}{'errors':>8}")
+    for name, a in r["by_action"].items():
+        print(f"{name:<18}{a['n']:>6}{a['p50_ms']:>10.1f}{a['p95_ms']:>10.1f}{a['p99_ms']:>10.1f}"
+              f"{a['calls_per_action']:>11.2f}{a['errors']:>8}")
+    print(f"sheets calls: {r['sheets_calls']} total, {r['sheets_calls_background']} background  "
+          f"{r['sheets_calls_by_endpoint']}")
+    print(f"submitted={r['submitted']} (queued {r['queued_submits']})  "
+          f"decided={r['decisions']}/{r['decision_attempts']}  "
+          f"conflicts={r['decision_conflicts']}  stale selections={r['stale_selections']}")
+    print(f"lost updates: {r['lost_updates']}")
+    for name, msg in r["first_errors"].items():
+        print(f"first error in {name}: {msg}")
+
+# ---------------- Main ----------------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Concurrent AppTest load test against a local Sheets stand-in.")
+    ap.add_argument("--members", type=int, default=10, help="concurrent member sessions")
+    ap.add_argument("--reviewers", type=int, default=2, help="concurrent HR review sessions")
+    ap.add_argument("--browsers", type=int, default=2, help="concurrent analytics/period sessions")
+    ap.add_argument("--actions", type=int, default=5, help="actions per session")
+    ap.add_argument("--think", type=float, default=0.0, help="seconds between actions")
+    ap.add_argument("--latency", type=float, default=0.0, help="simulated seconds per Sheets call")
+    ap.add_argument("--approve-ratio", type=float, default=0.8)
+    ap.add_argument("--member-rows", type=int, default=200, help="rows seeded into Member_Data")
+    ap.add_argument("--tasks-per-dept", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--shards", choices=["off", "worksheet"], default="off",
+                    help="department sharding of Requests (sets HR_REQUEST_SHARDS)")
+    ap.add_argument("--json", help="also write the report as JSON to this path")
+    args = ap.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    isolate_sessions()
+    os.environ["HR_REQUEST_SHARDS"] = "" if args.shards == "off" else args.shards
+    # journal, metrics, reconcile state and profiles of the run stay out of the working tree
+    tmp = tempfile.mkdtemp(prefix="hr_loadtest_")
+    os.environ.setdefault("HR_JOURNAL_PATH", os.path.join(tmp, "journal.sqlite3"))
+    os.environ.setdefault("HR_METRICS_PATH", os.path.join(tmp, "hr_pipeline.prom"))
+    os.environ.setdefault("HR_RECONCILE_STATE", os.path.join(tmp, "reconcile.json"))
+    os.environ.setdefault("HR_PROFILE_DIR", os.path.join(tmp, "profiles"))
+    from utils import sheets as S
+
+    rec = Recorder()
+    fake = FakeSheetsSession(latency=args.latency)
+    seed(fake, args.member_rows, args.tasks_per_dept)
+    install(fake, rec)
+
+    jobs = ([(member_session, i, ()) for i in range(args.members)]
+            + [(reviewer_session, i, (args.approve_ratio,)) for i in range(args.reviewers)]
+            + [(browser_session, i, ()) for i in range(args.browsers)])
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        futures = [pool.submit(fn, rec, i, args.actions, args.think, args.seed * 1000 + n, *extra)
+                   for n, (fn, i, extra) in enumerate(jobs)]
+        for f in futures:
+            f.result()
+    wall = time.perf_counter() - t0
+
+    # anything still queued is applied before checking for lost updates
+    while S.replay_journal():
+        pass
+    report = summarize(rec, fake, wall, len(jobs), lost_updates(fake, rec))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+    no_decisions = args.reviewers > 0 and report["decided_ratio"] == 0
+    if no_decisions:
+        print("no reviewer decision went through: the HR write path was not exercised")
+    return 1 if report["errors"] or any(report["lost_updates"].values()) or no_decisions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# Cold-start benchmark for the entry scripts (landingPage.py, app.py, pages/*).
+# - Each script runs in a fresh interpreter (so nothing is imported or cached yet)
+#   through AppTest, against the in-memory Sheets stand-in; the stand-in is
+#   installed when utils.sheets is first imported, so the harness itself pulls in
+#   none of the modules being measured.
+# - first paint: script start -> first element sent to the browser.
+# - imports: time spent in import statements during the run (top-level only).
+# - heavy before paint: pandas / gspread / google-auth / ... already loaded at
+#   first paint.
+# - warm: a second run of the same script in the same process.
+#
+#   python -m loadtest.startup [--repeat 3] [--latency 0.05] [--json startup.json]
+
+import argparse
+import builtins
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+SCRIPTS = ["landingPage.py", "app.py"] + sorted(
+    os.path.join("pages", f) for f in os.listdir(os.path.join(ROOT, "pages")) if f.endswith(".py"))
+HEAVY = ("pandas", "numpy", "pyarrow", "gspread", "gspread_dataframe", "google.oauth2", "dateutil")
+
+# ---------------- Child: one cold run ----------------
+def _child(script: str, latency: float) -> dict:
+    from streamlit.delta_generator import DeltaGenerator
+    from streamlit.testing.v1 import AppTest
+
+    from loadtest.fake_sheets import FakeSheetsSession
+
+    fake = FakeSheetsSession(latency=latency)
+    state = {"start": None, "paint": None, "heavy": None, "imports": 0.0, "installed": False}
+    local = threading.local()
+    real_import = builtins.__import__
+
+    def install_fake():
+        # stand-in for the first data access; not counted as import time
+        from loadtest.run import Recorder, install, seed
+        state["installed"] = True
+        seed(fake, 200, 5)
+        install(fake, Recorder())
+
+    def timed_import(name, *args, **kwargs):
+        if getattr(local, "depth", 0) or state["start"] is None:
+            return real_import(name, *args, **kwargs)
+        local.depth = 1
+        t0 = time.perf_counter()
+        try:
+            return real_import(name, *args, **kwargs)
+        finally:
+            state["imports"] += time.perf_counter() - t0
+            local.depth = 0
+            if not state["installed"] and "utils.sheets" in sys.modules:
+                local.depth = 1
+                try:
+                    install_fake()
+                finally:
+                    local.depth = 0
+
+    real_enqueue = DeltaGenerator._enqueue
+
+    def enqueue(self, *args, **kwargs):
+        if state["paint"] is None and state["start"] is not None:
+            state["paint"] = time.perf_counter()
+            state["heavy"] = [m for m in HEAVY if m in sys.modules]
+        return real_enqueue(self, *args, **kwargs)
+
+    DeltaGenerator._enqueue = enqueue
+    builtins.__import__ = timed_import
+    at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=120)
+    state["start"] = time.perf_counter()
+    at.run()
+    end = time.perf_counter()
+    builtins.__import__ = real_import
+
+    t0 = time.perf_counter()
+    AppTest.from_file(os.path.join(ROOT, script), default_timeout=120).run()
+    warm = time.perf_counter() - t0
+    return {
+        "first_paint_ms": None if state["paint"] is None else (state["paint"] - state["start"]) * 1000,
+        "import_ms": state["imports"] * 1000,
+        "run_ms": (end - state["start"]) * 1000,
+        "warm_run_ms": warm * 1000,
+        "heavy_before_paint": state["heavy"] or [],
+        "errors": [str(e.value) for e in at.exception],
+    }
+
+# ---------------- Parent ----------------
+def measure(script: str, latency: float) -> dict:
+    tmp = tempfile.mkdtemp(prefix="hr_startup_")
+    env = dict(os.environ,
+               HR_JOURNAL_PATH=os.path.join(tmp, "journal.sqlite3"),
+               HR_METRICS_PATH=os.path.join(tmp, "hr_pipeline.prom"),
+               HR_AUTO_APPROVE="0")
+    out = subprocess.run(
+        [sys.executable, "-m", "loadtest.startup", "--child", script, "--latency", str(latency)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=False)
+    lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+    if not lines:
+        return {"errors": [out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "no output"]}
+    return json.loads(lines[-1])
+
+def summarize(runs: list) -> dict:
+    ok = [r for r in runs if "run_ms" in r]
+
+    def med(key):
+        vals = [r[key] for r in ok if r.get(key) is not None]
+        return round(statistics.median(vals), 1) if vals else None
+
+    return {
+        "runs": len(runs),
+        "first_paint_ms": med("first_paint_ms"),
+        "import_ms": med("import_ms"),
+        "run_ms": med("run_ms"),
+        "warm_run_ms": med("warm_run_ms"),
+        "heavy_before_paint": ok[-1]["heavy_before_paint"] if ok else [],
+        "errors": sorted({e for r in runs for e in r.get("errors", [])}),
+    }
+
+def print_report(report: dict):
+    print(f"{'script':<28}{'paint ms':>10}{'import ms':>11}{'run ms':>10}{'warm ms':>10}  heavy before paint")
+    for script, r in report["scripts"].items():
+        cells = [f"{r[k]:>{w}.1f}" if r[k] is not None else f"{'—':>{w}}"
+                 for k, w in (("first_paint_ms", 10), ("import_ms", 11), ("run_ms", 10), ("warm_run_ms", 10))]
+        print(f"{script:<28}{''.join(cells)}  {', '.join(r['heavy_before_paint']) or '-'}")
+        for e in r["errors"]:
+            print(f"  error: {e}")
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Cold-start (first paint / import time) benchmark of the entry scripts.")
+    ap.add_argument("--repeat", type=int, default=3, help="cold runs per script (median reported)")
+    ap.add_argument("--latency", type=float, default=0.0, help="simulated seconds per Sheets call")
+    ap.add_argument("--scripts", nargs="*", default=SCRIPTS, help="entry scripts, relative to the repo root")
+    ap.add_argument("--json", help="also write the report as JSON to this path")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        warnings.filterwarnings("ignore")
+        print(json.dumps(_child(args.child, args.latency)))
+        return 0
+
+    report = {"latency": args.latency, "repeat": args.repeat, "scripts": {}}
+    for script in args.scripts:
+        report["scripts"][script] = summarize([measure(script, args.latency) for _ in range(args.repeat)])
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+    return 1 if any(r["errors"] for r in report["scripts"].values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+# 4_My_Hours.py: page entry for views/my_hours.py (shared with app.py).
+import streamlit as st
+
+from views import my_hours
+
+st.set_page_config(page_title="ساعاتي", layout="centered")
+my_hours.render()
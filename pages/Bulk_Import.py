@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+# Bulk_Import.py: page entry for views/bulk_import.py (shared with app.py).
+import streamlit as st
+
+from views import bulk_import
+
+st.set_page_config(page_title="استيراد الساعات", layout="centered")
+bulk_import.render()
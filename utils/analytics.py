@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# Analytics over Approved, built once per data version and shared by all sessions.
+# - Rows are kept sorted by date, so a date range is two searchsorted calls on the
+#   date column (rows without a date sort last and only appear when no range is set).
+# - Department / task are parsed out of `notes` once, at build time.
+# - Aggregates are memoized per (row range, dimension) in a bounded LRU, so moving the
+#   date picker costs two binary searches plus a dict lookup once a range was seen
+#   (date ranges covering the same rows share one entry).
+# - Trends (TrendBuckets) keep hours / request counts per (week or month, dept, task)
+#   and fold in only the rows appended since the last update; the tables the page
+#   charts are memoized until the next fold.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+NOTES_SEP = " - "
+CACHE_SIZE = 128
+
+# Weeks run Sunday-Saturday.
+TREND_FREQS = {"week": "W-SAT", "month": "M"}
+
+DIMENSIONS = {
+    "member": ["member_id", "name"],
+    "dept": ["dept"],
+    "task": ["task"],
+}
+
+# ---------------- Notes ("{dept} - {task} - {minutes} دقيقة") ----------------
+def format_notes(dept: str, task: str, minutes) -> str:
+    return NOTES_SEP.join([str(dept), str(task), f"{int(minutes)} دقيقة"])
+
+_MINUTES_SUFFIX = r" - [\d.]+ دقيقة$"
+
+def split_notes(notes: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """(department, task) parsed from request notes (task names may contain NOTES_SEP)."""
+    head = notes.fillna("").astype(str).str.replace(_MINUTES_SUFFIX, "", regex=True)
+    parts = head.str.split(NOTES_SEP, n=1)
+    return parts.str[0], parts.str[1]
+
+# ---------------- Engine ----------------
+class AnalyticsEngine:
+    """Date-sorted Approved rows with range lookups and memoized aggregates."""
+
+    def __init__(self, approved: pd.DataFrame, cache_size: int = CACHE_SIZE, data_version: int = 0):
+        self.data_version = data_version   # utils.sheets.approved_version() it was built from
+        dept, task = split_notes(approved["notes"]) if "notes" in approved.columns else ("", "")
+        df = approved.assign(
+            date=pd.to_datetime(approved["date"], errors="coerce"),
+            hours=pd.to_numeric(approved["hours"], errors="coerce").fillna(0.0),
+            dept=pd.Series(dept, index=approved.index, dtype="category"),
+            task=pd.Series(task, index=approved.index, dtype="category"),
+        )
+        self.frame = df.sort_values("date", kind="stable", na_position="last").reset_index(drop=True)
+        dates = self.frame["date"].to_numpy()
+        self._dates = dates[: int(self.frame["date"].notna().sum())]
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def min_date(self):
+        return pd.Timestamp(self._dates[0]) if len(self._dates) else None
+
+    @property
+    def max_date(self):
+        return pd.Timestamp(self._dates[-1]) if len(self._dates) else None
+
+    # ---------- ranges ----------
+    def bounds(self, start=None, end=None) -> tuple[int, int]:
+        """Row positions [i, j) for dates in [start, end + 1 day]; no range = all rows."""
+        if start is None or end is None:
+            return 0, len(self.frame)
+        lo = np.datetime64(pd.Timestamp(start), "ns")
+        hi = np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1), "ns")
+        return (int(np.searchsorted(self._dates, lo, side="left")),
+                int(np.searchsorted(self._dates, hi, side="right")))
+
+    def rows(self, start=None, end=None) -> pd.DataFrame:
+        i, j = self.bounds(start, end)
+        return self.frame.iloc[i:j]
+
+    # ---------- aggregates ----------
+    def kpis(self, start=None, end=None) -> dict:
+        return self._memo(start, end, "kpis", self._kpis)
+
+    def totals(self, dim: str, start=None, end=None) -> pd.DataFrame:
+        """Hours per `dim` (member / dept / task) in the range, largest first."""
+        return self._memo(start, end, dim, lambda df: self._group(df, DIMENSIONS[dim]))
+
+    def _memo(self, start, end, dim, compute):
+        i, j = self.bounds(start, end)
+        key = (i, j, dim)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        value = compute(self.frame.iloc[i:j])
+        with self._lock:
+            self._cache[key] = value
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _kpis(df: pd.DataFrame) -> dict:
+        return {
+            "total_hours": float(df["hours"].sum()),
+            "total_requests": int(df.shape[0]),
+            "unique_members": int(df[["member_id", "name"]].drop_duplicates().shape[0]),
+        }
+
+    @staticmethod
+    def _group(df: pd.DataFrame, cols: list) -> pd.DataFrame:
+        return (df.groupby(cols, dropna=False, observed=True)["hours"].sum()
+                  .reset_index()
+                  .sort_values("hours", ascending=False, kind="stable")
+                  .reset_index(drop=True))
+
+# ---------------- Trends ----------------
+class TrendBuckets:
+    """Incremental hours / count totals per (period start, dept, task) at one granularity."""
+
+    def __init__(self, granularity: str):
+        self.granularity = granularity
+        self.freq = TREND_FREQS[granularity]
+        self.version = 0
+        self._sums = {}       # (period start, dept, task) -> [hours, count]
+        self._ids = np.empty(0, dtype="int64")
+        self._hours = np.empty(0, dtype="float64")
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def update(self, approved: pd.DataFrame) -> int:
+        """Fold rows appended since the last call (full rebuild if earlier rows changed).
+
+        Returns the number of rows folded.
+        """
+        ids = pd.to_numeric(approved["id"], errors="coerce").fillna(-1).to_numpy("int64")
+        hours = pd.to_numeric(approved["hours"], errors="coerce").fillna(0.0).to_numpy("float64")
+        with self._lock:
+            n = len(self._ids)
+            if len(ids) == n and np.array_equal(ids, self._ids) and np.array_equal(hours, self._hours):
+                return 0
+            if len(ids) < n or not (np.array_equal(ids[:n], self._ids)
+                                    and np.array_equal(hours[:n], self._hours)):
+                self._sums, n = {}, 0
+            self._fold(approved.iloc[n:])
+            self._ids, self._hours = ids, hours
+            self._tables = {}
+            self.version += 1
+            return len(ids) - n
+
+    def _fold(self, rows: pd.DataFrame):
+        dates = pd.to_datetime(rows["date"], errors="coerce")
+        keep = dates.notna().to_numpy()
+        if not keep.any():
+            return
+        rows, dates = rows[keep], dates[keep]
+        dept, task = split_notes(rows["notes"])
+        grouped = pd.DataFrame({
+            "bucket": dates.dt.to_period(self.freq).dt.start_time,
+            "dept": dept, "task": task,
+            "hours": pd.to_numeric(rows["hours"], errors="coerce").fillna(0.0),
+        }).groupby(["bucket", "dept", "task"], dropna=False)["hours"].agg(["sum", "size"])
+        for key, (h, c) in zip(grouped.index, grouped.to_numpy()):
+            acc = self._sums.setdefault(key, [0.0, 0])
+            acc[0] += float(h)
+            acc[1] += int(c)
+
+    def table(self, dim: str = "dept", value: str = "hours") -> pd.DataFrame:
+        """Period start (sorted index) x `dim` values; `value` is "hours" or "count"."""
+        with self._lock:
+            key = (dim, value)
+            if key not in self._tables:
+                self._tables[key] = self._pivot(dim, value)
+            return self._tables[key]
+
+    def _pivot(self, dim: str, value: str) -> pd.DataFrame:
+        if not self._sums:
+            return pd.DataFrame(index=pd.DatetimeIndex([], name="bucket"))
+        keys = list(self._sums)
+        vals = np.array(list(self._sums.values()), dtype="float64")
+        flat = pd.DataFrame(keys, columns=["bucket", "dept", "task"])
+        flat["hours"], flat["count"] = vals[:, 0], vals[:, 1].astype("int64")
+        return (flat.pivot_table(index="bucket", columns=dim, values=value,
+                                 aggfunc="sum", fill_value=0)
+                    .sort_index())
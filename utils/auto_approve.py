@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# Rule-based auto-approval of routine pending requests, run as a batch job.
+# - A pending request is approved when every rule passes:
+#     * its member is in Member_Data, in the request's department;
+#     * the department / task are allowed (empty list = all);
+#     * the task is a Tasks_Data task of that department, at its suggested minutes;
+#     * no approved or earlier pending request has the same (member_id, date, task);
+#     * the member's approved hours that day / week (Sunday-Saturday), including
+#       the ones approved in this run, stay within the caps.
+#   Anything else is left pending for HR, with the first failing rule as the reason.
+# - Matches are approved together through utils.sheets.approve_requests: one journal
+#   replay batch, so one Requests write, one Approved append and one rollup rebuild.
+#   An approval never overrides a decision HR made in the meantime.
+# - Rules come from st.secrets["auto_approve"] (see DEFAULT_RULES). HR_AUTO_APPROVE=1/0
+#   overrides `enabled`. When enabled, a background thread runs every
+#   `interval_seconds`. The HR Review page can also run it on demand, as can
+#   `python -m utils.auto_approve [--dry-run]`.
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from utils import sheets
+from utils.analytics import TREND_FREQS, split_notes
+
+AUTO_ENV = "HR_AUTO_APPROVE"
+DEFAULT_RULES = {
+    "enabled": False,
+    "departments": [],          # allowed departments; empty = all
+    "tasks": [],                # allowed task names; empty = every Tasks_Data task
+    "max_hours_per_day": 4.0,   # approved hours per member per day, 0 = no cap
+    "max_hours_per_week": 12.0,
+    "hr_name": "اعتماد تلقائي",
+    "interval_seconds": 300,
+}
+
+REASONS = {
+    "bad_date":      "تاريخ غير صالح",
+    "unknown":       "العضو غير موجود في Member_Data",
+    "member_dept":   "العضو ليس من هذا القسم",
+    "dept":          "القسم غير مشمول بالاعتماد التلقائي",
+    "task_unknown":  "المهمة ليست من Tasks_Data لهذا القسم",
+    "task":          "المهمة غير مشمولة بالاعتماد التلقائي",
+    "minutes":       "المدة تختلف عن المدة المقترحة للمهمة",
+    "duplicate":     "طلب مكرر (نفس العضو والتاريخ والمهمة)",
+    "day_cap":       "يتجاوز الحد اليومي للساعات",
+    "week_cap":      "يتجاوز الحد الأسبوعي للساعات",
+}
+
+def load_rules() -> dict:
+    rules = dict(DEFAULT_RULES)
+    try:
+        rules.update({k: v for k, v in st.secrets["auto_approve"].items() if k in DEFAULT_RULES})
+    except Exception:
+        pass
+    env = os.environ.get(AUTO_ENV)
+    if env is not None:
+        rules["enabled"] = env.strip().lower() in {"1", "true", "yes", "on"}
+    for key in ("departments", "tasks"):
+        raw = rules[key]
+        items = raw if isinstance(raw, (list, tuple)) else str(raw or "").split(",")
+        rules[key] = [str(x).strip() for x in items if str(x).strip()]
+    return rules
+
+# ---------------- Rules ----------------
+def evaluate(requests: pd.DataFrame, members: pd.DataFrame, tasks: pd.DataFrame,
+             rules: dict) -> tuple[list, pd.DataFrame]:
+    """(ids to approve, exceptions) for the pending rows of `requests` (all statuses).
+
+    Exceptions are the pending rows left for HR, with a `reason` column.
+    """
+    depts = set(rules["departments"])
+    allowed_tasks = set(rules["tasks"])
+    day_cap = float(rules["max_hours_per_day"] or 0)
+    week_cap = float(rules["max_hours_per_week"] or 0)
+
+    member_dept = {str(m): str(d) for m, d in zip(members[sheets.COL_STUD_ID], members[sheets.COL_DEPT])}
+    task_minutes = {(str(d), str(t)): float(m) for t, m, d in zip(
+        tasks[sheets.COL_TASK_NAME], tasks[sheets.COL_TASK_MINUTES], tasks[sheets.COL_TASK_DEPT])}
+
+    dept, task = split_notes(requests["notes"])
+    day = pd.to_datetime(requests["date"], errors="coerce").dt.normalize()
+    df = requests.assign(
+        dept=dept.fillna(""), task=task.fillna(""), day=day,
+        week=day.dt.to_period(TREND_FREQS["week"]).dt.start_time,
+        hours=pd.to_numeric(requests["hours"], errors="coerce").fillna(0.0),
+        member_id=requests["member_id"].astype(str),
+    )
+    approved = df[df["status"] == "approved"]
+    day_hours = approved.groupby(["member_id", "day"])["hours"].sum().to_dict()
+    week_hours = approved.groupby(["member_id", "week"])["hours"].sum().to_dict()
+    seen = set(zip(approved["member_id"], approved["day"], approved["task"]))
+
+    pending = df[df["status"] == "pending"].sort_values("id", kind="stable")
+    approve, reasons = [], {}
+    for r in pending.itertuples(index=False):
+        rid = int(r.id)
+        key = (r.member_id, r.day, r.task)
+        reason = _first_failure(r, key, seen, member_dept, task_minutes, depts, allowed_tasks)
+        if reason is None and day_cap and day_hours.get((r.member_id, r.day), 0.0) + r.hours > day_cap + 1e-9:
+            reason = "day_cap"
+        if reason is None and week_cap and week_hours.get((r.member_id, r.week), 0.0) + r.hours > week_cap + 1e-9:
+            reason = "week_cap"
+        if pd.notna(r.day):
+            seen.add(key)   # later pending duplicates of this one wait for HR
+        if reason:
+            reasons[rid] = REASONS[reason]
+            continue
+        approve.append(rid)
+        day_hours[(r.member_id, r.day)] = day_hours.get((r.member_id, r.day), 0.0) + r.hours
+        week_hours[(r.member_id, r.week)] = week_hours.get((r.member_id, r.week), 0.0) + r.hours
+
+    cols = ["id", "name", "member_id", "date", "hours", "notes"]
+    exceptions = pending[pending["id"].isin(list(reasons))][cols]
+    exceptions = exceptions.assign(reason=exceptions["id"].map(lambda i: reasons[int(i)]))
+    return approve, exceptions.reset_index(drop=True)
+
+def _first_failure(r, key, seen, member_dept, task_minutes, depts, allowed_tasks) -> str | None:
+    if pd.isna(r.day):
+        return "bad_date"
+    if r.member_id not in member_dept:
+        return "unknown"
+    if member_dept[r.member_id] != r.dept:
+        return "member_dept"
+    if depts and r.dept not in depts:
+        return "dept"
+    minutes = task_minutes.get((r.dept, r.task))
+    if minutes is None:
+        return "task_unknown"
+    if allowed_tasks and r.task not in allowed_tasks:
+        return "task"
+    if abs(round(minutes / 60.0, 2) - r.hours) > 1e-6:
+        return "minutes"
+    if key in seen:
+        return "duplicate"
+    return None
+
+# ---------------- Batch job ----------------
+@st.cache_resource
+def _last_run() -> dict:
+    return {"lock": threading.Lock(), "report": None}
+
+def run_once(dry_run: bool = False) -> dict:
+    """Evaluate every pending request and approve the matches in one batch."""
+    rules = load_rules()
+    state = _last_run()
+    with state["lock"]:   # one run at a time (scheduler vs. "run now")
+        started = time.monotonic()
+        approve, exceptions = evaluate(sheets.list_requests(), sheets.get_members_df(),
+                                       sheets.get_tasks_df(), rules)
+        if approve and not dry_run:
+            sheets.approve_requests(approve, rules["hr_name"])
+        report = {
+            "ran_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "checked": len(approve) + len(exceptions),
+            "approved": approve,
+            "exceptions": exceptions,
+            "dry_run": dry_run,
+            "seconds": round(time.monotonic() - started, 2),
+        }
+        if not dry_run:
+            state["report"] = report
+    return report
+
+def last_report() -> dict | None:
+    return _last_run()["report"]
+
+def _loop(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            run_once()
+        except Exception:
+            pass  # backend down: the next tick retries; pending rows stay for HR meanwhile
+
+@st.cache_resource
+def _scheduler(interval: float) -> threading.Thread:
+    t = threading.Thread(target=_loop, args=(interval,), name="hr-auto-approve", daemon=True)
+    t.start()
+    return t
+
+def ensure_scheduler() -> bool:
+    """Start the periodic job once per process if enabled; returns whether it runs."""
+    rules = load_rules()
+    if rules["enabled"]:
+        _scheduler(max(float(rules["interval_seconds"]), 30.0))
+    return rules["enabled"]
+
+# ---------------- CLI ----------------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Auto-approve routine pending requests.")
+    ap.add_argument("--dry-run", action="store_true", help="only report what would be approved")
+    args = ap.parse_args(argv)
+    report = run_once(dry_run=args.dry_run)
+    print(f"checked={report['checked']} approved={len(report['approved'])} "
+          f"left_for_hr={len(report['exceptions'])} seconds={report['seconds']}")
+    for reason, n in report["exceptions"]["reason"].value_counts().items():
+        print(f"  {n:6d}  {reason}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
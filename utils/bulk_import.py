@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+# Bulk import of historical hours (CSV / XLSX) into Requests (+ Approved).
+# - The file is streamed in chunks (pandas chunksize for CSV, openpyxl read-only rows
+#   for XLSX), so a 50k-row file never sits in memory as one frame.
+# - Each row is checked against Member_Data / Tasks_Data indexes built once from the
+#   shared cached readers: dict lookups, no Sheets calls per row.
+# - Valid rows are written in blocks of BLOCK_ROWS: ids are reserved per block and each
+#   block is one values_append per Requests shard (plus one to Approved), paced to
+#   stay under the Sheets write quota. Rollups are rebuilt once at the end.
+# - Rows already present (same member, date, department / task / minutes) are skipped,
+#   so a file can be re-run after a failure.
+#
+#   python -m utils.bulk_import hours.xlsx --status approved --hr-name "HR" [--dry-run]
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+from dateutil import parser
+
+from utils import sheets
+from utils.analytics import format_notes
+from utils.member_search import normalize
+
+CHUNK_ROWS = 5000
+BLOCK_ROWS = 2000
+WRITE_INTERVAL_SECONDS = 1.0   # <= 60 writes / minute
+STATUSES = ("approved", "pending")
+STATUS_ALIASES = {"معتمد": "approved", "معتمده": "approved", "قيد الانتظار": "pending"}  # normalized
+
+# Column -> accepted headers (compared after utils.member_search.normalize)
+COLUMNS = {
+    "member_id": ["الرقم الجامعي", "student_id", "member_id"],
+    "task":      ["المهمة", "task"],
+    "date":      ["التاريخ", "date"],
+    "dept":      ["القسم", "Department", "dept"],
+    "minutes":   ["الدقائق", "minutes"],
+    "status":    ["الحالة", "status"],
+    "hr_name":   ["المراجع", "hr_name"],
+    "hr_notes":  ["ملاحظات HR", "hr_notes"],
+    "approved_at": ["تاريخ الاعتماد", "approved_at"],
+}
+REQUIRED = ("member_id", "task", "date")
+
+# ---------------- Reading ----------------
+def iter_chunks(source, filename: str, chunk_rows: int = CHUNK_ROWS):
+    """Yield DataFrames (all str) of up to `chunk_rows` rows from a CSV / XLSX file or file object."""
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        yield from _iter_xlsx(source, chunk_rows)
+    else:
+        yield from pd.read_csv(source, dtype=str, keep_default_na=False,
+                               encoding="utf-8-sig", chunksize=chunk_rows)
+
+def _iter_xlsx(source, chunk_rows: int):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = [str(h or "").strip() for h in next(rows, [])]
+        width, buf = len(header), []
+        for row in rows:
+            row = ["" if v is None else v for v in row[:width]]
+            buf.append(row + [""] * (width - len(row)))
+            if len(buf) >= chunk_rows:
+                yield pd.DataFrame(buf, columns=header)
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf, columns=header)
+    finally:
+        wb.close()
+
+def _map_columns(columns) -> dict:
+    """Our column name -> the file's header."""
+    aliases = {normalize(a): key for key, names in COLUMNS.items() for a in names}
+    found = {}
+    for col in columns:
+        key = aliases.get(normalize(col))
+        if key and key not in found:
+            found[key] = col
+    missing = [COLUMNS[k][0] for k in REQUIRED if k not in found]
+    if missing:
+        raise ValueError("أعمدة مفقودة في الملف: " + "، ".join(missing))
+    return found
+
+# ---------------- Validation ----------------
+class ImportIndex:
+    """Member_Data / Tasks_Data lookups, plus the keys of every existing request."""
+
+    def __init__(self, members: pd.DataFrame, tasks: pd.DataFrame, existing: set):
+        self.members = {
+            sheets.normalize_member_id(mid): (name, str(dept))
+            for mid, name, dept in zip(members[sheets.COL_STUD_ID], members[sheets.COL_AR_NAME],
+                                       members[sheets.COL_DEPT])
+            if not pd.isna(mid) and mid
+        }
+        self.depts = {normalize(d): d for _, d in self.members.values()}
+        self.tasks = {
+            (normalize(dept), normalize(name)): (str(dept), name, float(minutes))
+            for name, minutes, dept in zip(tasks[sheets.COL_TASK_NAME], tasks[sheets.COL_TASK_MINUTES],
+                                           tasks[sheets.COL_TASK_DEPT])
+        }
+        self.seen = set(existing)
+
+    @classmethod
+    def load(cls) -> "ImportIndex":
+        return cls(sheets.get_members_df(), sheets.get_tasks_df(), sheets.request_keys())
+
+def _validate(rec: dict, index: ImportIndex, default_status: str, default_hr: str, now: str):
+    """(row, None) for a valid record, (None, error) otherwise; error "" = already imported."""
+    mid = sheets.normalize_member_id(normalize(rec.get("member_id")))
+    if mid not in index.members:
+        return None, "الرقم الجامعي غير موجود في Member_Data"
+    name, member_dept = index.members[mid]
+
+    dept = member_dept
+    if rec.get("dept"):
+        dept = index.depts.get(normalize(rec["dept"]))
+        if dept is None:
+            return None, "القسم غير معروف"
+    task = index.tasks.get((normalize(dept), normalize(rec.get("task"))))
+    if task is None:
+        return None, "المهمة غير موجودة في Tasks_Data لهذا القسم"
+    dept, task_name, minutes = task
+
+    if rec.get("minutes"):
+        minutes = pd.to_numeric(normalize(rec["minutes"]), errors="coerce")
+        if pd.isna(minutes) or minutes <= 0:
+            return None, "عدد الدقائق غير صالح"
+    try:
+        date = _parse_date(rec.get("date")).date().isoformat()
+    except (ValueError, OverflowError):
+        return None, "التاريخ غير صالح"
+
+    status = normalize(rec.get("status"))
+    status = STATUS_ALIASES.get(status, status) or default_status
+    if status not in STATUSES:
+        return None, "الحالة يجب أن تكون approved أو pending"
+
+    notes = format_notes(dept, task_name, minutes)
+    key = (mid, date, notes)
+    if key in index.seen:
+        return None, ""
+    index.seen.add(key)
+
+    approved = status == "approved"
+    approved_at = ""
+    if approved:
+        try:
+            approved_at = (_parse_date(rec["approved_at"]).isoformat(timespec="seconds")
+                           if rec.get("approved_at") else f"{date}T00:00:00")
+        except (ValueError, OverflowError):
+            return None, "تاريخ الاعتماد غير صالح"
+    return {
+        "name": name,
+        "member_id": mid,
+        "date": date,
+        "hours": round(float(minutes) / 60.0, 2),
+        "notes": notes,
+        "status": status,
+        "hr_name": (str(rec.get("hr_name") or "").strip() or default_hr) if approved else "",
+        "hr_notes": str(rec.get("hr_notes") or "").strip(),
+        "created_at": "" if approved else now,
+        "approved_at": approved_at,
+        "dept": dept,   # shard routing key, not a sheet column
+    }, None
+
+def _parse_date(v) -> datetime:
+    if isinstance(v, datetime):
+        return v
+    s = normalize(v)
+    if not s:
+        raise ValueError("empty date")
+    return parser.parse(s)
+
+# ---------------- Import ----------------
+def run_import(source, filename: str, *, status: str = "approved", hr_name: str = "",
+               dry_run: bool = False, progress=None,
+               write_interval: float = WRITE_INTERVAL_SECONDS) -> dict:
+    """Validate (and unless `dry_run`, write) every row of the file; returns a report.
+
+    `progress(report)` is called after each chunk.
+    """
+    started = time.monotonic()
+    index = ImportIndex.load()
+    now = datetime.utcnow().isoformat(timespec="seconds")
+    report = {"rows": 0, "imported": 0, "approved": 0, "duplicates": 0,
+              "errors": [], "api_calls": 0, "first_id": None, "last_id": None, "seconds": 0.0}
+    block = []
+    next_write = [0.0]   # paced per API call, not per block (a block may span shards)
+
+    def flush():
+        if not block:
+            return
+        if not dry_run:
+            first = sheets.reserve_request_ids(len(block))
+            for i, row in enumerate(block):
+                row["id"] = first + i
+            wait = next_write[0] - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            calls = sheets.append_imported_requests(block)
+            next_write[0] = time.monotonic() + calls * write_interval
+            report["api_calls"] += calls
+            report["first_id"] = report["first_id"] or first
+            report["last_id"] = first + len(block) - 1
+        report["imported"] += len(block)
+        report["approved"] += sum(r["status"] == "approved" for r in block)
+        block.clear()
+
+    line = 1   # header
+    cols = None
+    for chunk in iter_chunks(source, filename):
+        cols = cols or _map_columns(chunk.columns)
+        recs = chunk[list(cols.values())].rename(columns={v: k for k, v in cols.items()})
+        for rec in recs.to_dict("records"):
+            line += 1
+            report["rows"] += 1
+            row, err = _validate(rec, index, status, hr_name, now)
+            if row is not None:
+                block.append(row)
+                if len(block) >= BLOCK_ROWS:
+                    flush()
+            elif err:
+                report["errors"].append({"row": line, "member_id": rec.get("member_id"), "error": err})
+            else:
+                report["duplicates"] += 1
+        if progress:
+            progress(report)
+    flush()
+
+    if not dry_run and report["imported"]:
+        sheets.finish_import(rebuild_rollups=report["approved"] > 0)
+    report["seconds"] = round(time.monotonic() - started, 1)
+    return report
+
+# ---------------- CLI ----------------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Import historical hours (CSV / XLSX) into Requests.")
+    ap.add_argument("file")
+    ap.add_argument("--status", choices=STATUSES, default="approved",
+                    help="status for rows without a status column (default: approved)")
+    ap.add_argument("--hr-name", default="استيراد", help="reviewer recorded on approved rows")
+    ap.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    ap.add_argument("--errors", help="write rejected rows to this CSV")
+    args = ap.parse_args(argv)
+
+    def progress(r):
+        print(f"\r{r['rows']} rows, {r['imported']} valid, {len(r['errors'])} errors", end="", file=sys.stderr)
+
+    with open(args.file, "rb") as fh:
+        report = run_import(fh, os.path.basename(args.file), status=args.status,
+                            hr_name=args.hr_name, dry_run=args.dry_run, progress=progress)
+    print(file=sys.stderr)
+    if args.errors and report["errors"]:
+        pd.DataFrame(report["errors"]).to_csv(args.errors, index=False, encoding="utf-8-sig")
+    summary = {k: v for k, v in report.items() if k != "errors"}
+    print(", ".join(f"{k}={v}" for k, v in summary.items()) + f", errors={len(report['errors'])}")
+    return 1 if report["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# On-demand, chunked exports (CSV / XLSX / Parquet).
+# - Files are only built when the user asks for them (no work on ordinary reruns).
+# - Every format is produced chunk by chunk through a generator of bytes, so the
+#   builder never holds a second full copy of the frame as text.
+# - CSV keeps the UTF-8 BOM so Excel opens Arabic text correctly.
+# - XLSX needs openpyxl, Parquet needs pyarrow; formats whose library is missing
+#   are simply not offered.
+# - Files live in one managed directory (env HR_EXPORT_DIR, else [exports] dir in
+#   secrets, else <tmp>/hr_exports): a session's previous file is deleted when it
+#   prepares a new one, and files older than MAX_AGE_SECONDS (sessions that ended,
+#   abandoned downloads) are swept whenever a file is created.
+
+import os
+import tempfile
+import time
+from importlib.util import find_spec
+
+import pandas as pd
+import streamlit as st
+
+CHUNK_ROWS = 5000
+READ_BLOCK = 1024 * 1024
+EXPORT_DIR_ENV = "HR_EXPORT_DIR"
+MAX_AGE_SECONDS = 60 * 60
+
+# fmt -> (label, mime, extension, required module)
+FORMATS = {
+    "csv":     ("CSV (Excel عربي)", "text/csv", ".csv", None),
+    "xlsx":    ("Excel (XLSX)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx", "openpyxl"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", ".parquet", "pyarrow"),
+}
+
+def available_formats() -> list[str]:
+    return [f for f, (_, _, _, mod) in FORMATS.items() if mod is None or find_spec(mod) is not None]
+
+# ---------------- Export directory ----------------
+def export_dir() -> str:
+    path = os.environ.get(EXPORT_DIR_ENV)
+    if not path:
+        try:
+            path = st.secrets["exports"]["dir"]
+        except Exception:
+            path = os.path.join(tempfile.gettempdir(), "hr_exports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def sweep(max_age: float = MAX_AGE_SECONDS) -> int:
+    """Delete export files older than `max_age` seconds; returns how many."""
+    root, cutoff, n = export_dir(), time.time() - max_age, 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                n += 1
+        except OSError:
+            pass   # removed by another session meanwhile
+    return n
+
+def _new_file(ext: str) -> str:
+    sweep()
+    fd, path = tempfile.mkstemp(suffix=ext, dir=export_dir())
+    os.close(fd)
+    return path
+
+def _chunks(df: pd.DataFrame, chunk_rows: int):
+    for start in range(0, len(df), chunk_rows):
+        yield start, df.iloc[start:start + chunk_rows]
+
+def _plain_values(chunk: pd.DataFrame) -> pd.DataFrame:
+    """tz-aware datetimes -> naive UTC, categoricals/NA -> plain objects (for openpyxl)."""
+    out = {}
+    for c in chunk.columns:
+        s = chunk[c]
+        if isinstance(s.dtype, pd.DatetimeTZDtype):
+            s = s.dt.tz_convert("UTC").dt.tz_localize(None)
+        out[c] = s.astype(object).where(s.notna(), None)
+    return pd.DataFrame(out, index=chunk.index)
+
+def _iter_file(path: str):
+    with open(path, "rb") as fh:
+        while True:
+            block = fh.read(READ_BLOCK)
+            if not block:
+                break
+            yield block
+
+# ---------------- Chunk generators ----------------
+def iter_csv(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    yield "\ufeff".encode("utf-8")  # BOM for Arabic in Excel
+    if df.empty:
+        yield df.to_csv(index=False).encode("utf-8")
+        return
+    for start, chunk in _chunks(df, chunk_rows):
+        yield chunk.to_csv(index=False, header=(start == 0)).encode("utf-8")
+
+def iter_xlsx(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS, sheet_title: str = "data"):
+    from openpyxl import Workbook
+
+    # write_only streams rows to disk instead of building the cell tree in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+    ws.append([str(c) for c in df.columns])
+    for _, chunk in _chunks(df, chunk_rows):
+        for row in _plain_values(chunk).itertuples(index=False):
+            ws.append(list(row))
+    path = _new_file(".xlsx")
+    try:
+        wb.save(path)
+        yield from _iter_file(path)
+    finally:
+        os.remove(path)
+
+def iter_parquet(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def _arrow(chunk):
+        # fixed per-column types across row groups: text -> string, categories -> string
+        fixed = {}
+        for c in chunk.columns:
+            s = chunk[c]
+            if isinstance(s.dtype, pd.CategoricalDtype) or s.dtype == object:
+                s = s.astype("string")
+            fixed[str(c)] = s
+        return pa.Table.from_pandas(pd.DataFrame(fixed), preserve_index=False)
+
+    path = _new_file(".parquet")
+    try:
+        writer = None
+        for _, chunk in _chunks(df, chunk_rows):
+            table = _arrow(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        if writer is None:
+            pq.write_table(_arrow(df), path)
+        else:
+            writer.close()
+        yield from _iter_file(path)
+    finally:
+        os.remove(path)
+
+_ITERS = {"csv": iter_csv, "xlsx": iter_xlsx, "parquet": iter_parquet}
+
+def iter_export(df: pd.DataFrame, fmt: str = "csv", chunk_rows: int = CHUNK_ROWS):
+    """Yield the export of `df` in `fmt` as byte chunks."""
+    if fmt not in _ITERS:
+        raise ValueError(f"unknown export format: {fmt}")
+    yield from _ITERS[fmt](df, chunk_rows=chunk_rows)
+
+def write_export(df: pd.DataFrame, fmt: str, path: str, chunk_rows: int = CHUNK_ROWS) -> str:
+    """Stream the export straight to `path` (CLI / scheduled jobs)."""
+    with open(path, "wb") as fh:
+        for block in iter_export(df, fmt, chunk_rows):
+            fh.write(block)
+    return path
+
+# ---------------- Streamlit controls ----------------
+def export_controls(data, file_stem: str, key: str, version=None,
+                    label: str = "تنزيل", on_click=None, button_type: str = "secondary"):
+    """Format picker + "prepare" button + download button.
+
+    `data` may be a DataFrame or a zero-arg callable returning one; it is only
+    evaluated when the user clicks prepare. The prepared file lives on disk and is
+    reused until the format or `version` changes; `version` must cover both the
+    active filters and the data version (e.g. utils.sheets.approved_version()).
+    """
+    fmts = available_formats()
+    fmt = st.selectbox("صيغة الملف", options=fmts, key=f"{key}__fmt",
+                       format_func=lambda f: FORMATS[f][0])
+    slot = f"{key}__export"
+    prepared = st.session_state.get(slot)
+    if prepared and prepared["sig"] != (fmt, version):
+        _discard(prepared)
+        prepared = st.session_state[slot] = None
+
+    if st.button("تجهيز الملف", key=f"{key}__prepare"):
+        df = data() if callable(data) else data
+        path = _new_file(FORMATS[fmt][2])
+        write_export(df, fmt, path)
+        _discard(prepared)
+        prepared = st.session_state[slot] = {"sig": (fmt, version), "path": path, "rows": len(df)}
+
+    if prepared and os.path.exists(prepared["path"]):
+        _, mime, ext, _ = FORMATS[fmt]
+        with open(prepared["path"], "rb") as fh:
+            st.download_button(
+                label=f"{label} ({prepared['rows']} صف)",
+                data=fh,
+                file_name=f"{file_stem}{ext}",
+                mime=mime,
+                type=button_type,
+                on_click=on_click,
+                key=f"{key}__download",
+            )
+
+def _discard(prepared):
+    if prepared and os.path.exists(prepared["path"]):
+        os.remove(prepared["path"])
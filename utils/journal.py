@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# Durable local operation journal (write-ahead log) for Sheets mutations.
+# - Every submit / approve / reject / anchor lands here first (SQLite in WAL mode,
+#   synchronous=FULL, i.e. fsync'd on commit) and is acknowledged from here.
+# - utils.sheets.replay_journal applies pending ops to Sheets in batches; ops are
+#   idempotent (they carry their ids and timestamps), so a crash mid-way is
+#   repaired by simply replaying again.
+# - An op Sheets keeps refusing on its own (e.g. a cell over the size limit) is
+#   moved to the dead-letter state (dead_at set) so it stops blocking the queue;
+#   HR can retry or discard it from the review page.
+# - Location: env HR_JOURNAL_PATH, else st.secrets["journal"]["path"], else
+#   .hr_journal/journal.sqlite3 next to the app.
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import streamlit as st
+
+JOURNAL_ENV = "HR_JOURNAL_PATH"
+DEFAULT_PATH = os.path.join(".hr_journal", "journal.sqlite3")
+
+OP_SUBMIT = "submit"
+OP_APPROVE = "approve"
+OP_REJECT = "reject"
+OP_ANCHOR = "anchor"
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS ops (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind       TEXT    NOT NULL,
+    target_id  INTEGER,
+    payload    TEXT    NOT NULL,
+    created_at TEXT    NOT NULL,
+    applied_at TEXT,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    dead_at    TEXT
+);
+CREATE INDEX IF NOT EXISTS ops_pending ON ops (applied_at, seq);
+CREATE INDEX IF NOT EXISTS ops_target  ON ops (kind, target_id);
+"""
+
+_lock = threading.RLock()
+_conn = None
+_conn_path = None
+
+def journal_path() -> str:
+    path = os.environ.get(JOURNAL_ENV)
+    if not path:
+        try:
+            path = st.secrets["journal"]["path"]
+        except Exception:
+            path = DEFAULT_PATH
+    return path
+
+def _connect() -> sqlite3.Connection:
+    global _conn, _conn_path
+    path = journal_path()
+    if _conn is None or _conn_path != path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.executescript(_DDL)
+        # journals created before dead-lettering
+        if "dead_at" not in {r["name"] for r in conn.execute("PRAGMA table_info(ops)")}:
+            conn.execute("ALTER TABLE ops ADD COLUMN dead_at TEXT")
+        _conn, _conn_path = conn, path
+    return _conn
+
+def _now() -> str:
+    return datetime.utcnow().isoformat(timespec="seconds")
+
+def _row(r: sqlite3.Row) -> dict:
+    d = dict(r)
+    d["payload"] = json.loads(d["payload"])
+    return d
+
+# ---------------- Writes ----------------
+def append(kind: str, payload: dict, target_id: int | None = None) -> int:
+    """Durably record one operation; returns its sequence number."""
+    with _lock:
+        cur = _connect().execute(
+            "INSERT INTO ops (kind, target_id, payload, created_at) VALUES (?, ?, ?, ?)",
+            (kind, target_id, json.dumps(payload, ensure_ascii=False), _now()),
+        )
+        return int(cur.lastrowid)
+
+def mark_applied(seqs: list[int]):
+    if not seqs:
+        return
+    with _lock:
+        conn = _connect()
+        conn.executemany("UPDATE ops SET applied_at = ?, last_error = NULL WHERE seq = ?",
+                         [(_now(), s) for s in seqs])
+
+def mark_failed(seqs: list[int], error: str):
+    if not seqs:
+        return
+    with _lock:
+        _connect().executemany(
+            "UPDATE ops SET attempts = attempts + 1, last_error = ? WHERE seq = ?",
+            [(str(error)[:500], s) for s in seqs],
+        )
+
+def mark_dead(seqs: list[int], error: str):
+    """Take ops out of the queue (dead letters) until retried or discarded."""
+    if not seqs:
+        return
+    with _lock:
+        _connect().executemany(
+            "UPDATE ops SET dead_at = ?, last_error = ? WHERE seq = ? AND applied_at IS NULL",
+            [(_now(), str(error)[:500], s) for s in seqs],
+        )
+
+def retry(seqs: list[int]):
+    """Put dead letters back in the queue with a fresh attempt count."""
+    if not seqs:
+        return
+    with _lock:
+        _connect().executemany("UPDATE ops SET dead_at = NULL, attempts = 0 WHERE seq = ?",
+                               [(s,) for s in seqs])
+
+def discard(seqs: list[int]):
+    """Delete dead letters for good (they were never applied)."""
+    if not seqs:
+        return
+    with _lock:
+        _connect().executemany("DELETE FROM ops WHERE seq = ? AND dead_at IS NOT NULL",
+                               [(s,) for s in seqs])
+
+def retarget(seq: int, target_id: int, payload: dict):
+    """Rewrite an op's id (a submit whose id was taken by another process)."""
+    with _lock:
+        _connect().execute(
+            "UPDATE ops SET target_id = ?, payload = ? WHERE seq = ?",
+            (target_id, json.dumps(payload, ensure_ascii=False), seq),
+        )
+
+# ---------------- Reads ----------------
+def pending(limit: int | None = None) -> list[dict]:
+    """Unapplied ops in journal order (dead letters excluded)."""
+    sql = "SELECT * FROM ops WHERE applied_at IS NULL AND dead_at IS NULL ORDER BY seq"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    with _lock:
+        return [_row(r) for r in _connect().execute(sql)]
+
+def pending_count() -> int:
+    with _lock:
+        return int(_connect().execute("SELECT COUNT(*) FROM ops WHERE applied_at IS NULL AND dead_at IS NULL").fetchone()[0])
+
+def is_pending(kind: str, target_id: int) -> bool:
+    with _lock:
+        r = _connect().execute(
+            "SELECT 1 FROM ops WHERE applied_at IS NULL AND dead_at IS NULL AND kind = ? AND target_id = ? LIMIT 1",
+            (kind, int(target_id)),
+        ).fetchone()
+        return r is not None
+
+def dead_letters() -> list[dict]:
+    """Dead-lettered ops in journal order."""
+    with _lock:
+        return [_row(r) for r in _connect().execute(
+            "SELECT * FROM ops WHERE dead_at IS NOT NULL ORDER BY seq")]
+
+def max_target_id(kind: str) -> int:
+    with _lock:
+        r = _connect().execute("SELECT MAX(target_id) FROM ops WHERE kind = ?", (kind,)).fetchone()
+        return int(r[0] or 0)
+
+def iter_ops(batch: int = 500, after_seq: int = 0):
+    """All ops (applied or not, dead letters excluded) in journal order, in batches; used to rebuild sheets."""
+    last = after_seq
+    while True:
+        with _lock:
+            rows = [_row(r) for r in _connect().execute(
+                "SELECT * FROM ops WHERE seq > ? AND dead_at IS NULL ORDER BY seq LIMIT ?", (last, int(batch)))]
+        if not rows:
+            return
+        yield rows
+        last = rows[-1]["seq"]
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# Live leaderboards for the app process: global, one per department, and the current period.
+# - Each scope keeps its member totals and a rank index: a list of
+#   (-hours, -count, member_id) keys kept sorted with bisect. An approval moves one
+#   key, so top_k / rank_of never re-sort the scope or rescan Approved.
+# - Seeded from Approved + Member_Data + the period anchor, then updated by
+#   utils.sheets as each approval is applied. Approvals are keyed by request id, so
+#   journal replays never double count. utils.sheets seeds a fresh board whenever the
+#   synced Approved sheet changes (approvals from other processes, hand edits) and
+#   swaps it in with replace(). The state is dropped on a period close or a bulk
+#   import, and the next use re-seeds it.
+# - Ranks are competition ranks: members with equal hours and count share a rank
+#   (1, 2, 2, 4).
+# - A member's department comes from Member_Data, the same join the rollup sheets
+#   use. Members missing from Member_Data fall back to the request notes.
+
+import threading
+from bisect import bisect_left, insort
+
+import pandas as pd
+
+from utils.analytics import NOTES_SEP
+from utils.metrics import clean, to_ts
+
+SCOPE_GLOBAL = "global"
+SCOPE_PERIOD = "period"
+DEPT_PREFIX = "dept:"
+COLUMNS = ["rank", "member_id", "name", "Department", "total_hours", "count"]
+
+def dept_scope(dept) -> str:
+    return DEPT_PREFIX + clean(dept)
+
+def scope_dept(scope: str) -> str | None:
+    """Department of a department scope, None for the global / period scopes."""
+    return scope[len(DEPT_PREFIX):] if scope.startswith(DEPT_PREFIX) else None
+
+# ---------------- Rank index ----------------
+class RankIndex:
+    """Members of one scope, ordered by hours desc, then count desc, then member_id."""
+
+    def __init__(self):
+        self.totals = {}     # member_id -> (hours, count)
+        self._keys = []      # sorted (-hours, -count, member_id)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, member_id: str, hours: float, count: int = 1):
+        old = self.totals.get(member_id)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old[0], -old[1], member_id))]
+            hours, count = old[0] + hours, old[1] + count
+        hours = round(hours, 2)
+        self.totals[member_id] = (hours, count)
+        insort(self._keys, (-hours, -count, member_id))
+
+    def rank(self, member_id: str) -> int | None:
+        t = self.totals.get(member_id)
+        if t is None:
+            return None
+        # (-h, -c) sorts before every (-h, -c, id): position = members strictly ahead
+        return bisect_left(self._keys, (-t[0], -t[1])) + 1
+
+    def top(self, k: int | None = None) -> list:
+        """[(rank, member_id, hours, count)] for the first k members (all if k is None)."""
+        out, prev, rank = [], None, 0
+        for pos, (h, c, mid) in enumerate(self._keys[:k]):
+            if (h, c) != prev:
+                rank, prev = pos + 1, (h, c)
+            out.append((rank, mid, -h, -c))
+        return out
+
+# ---------------- Leaderboards ----------------
+class Leaderboard:
+    def __init__(self):
+        self.seeded = False
+        self.version = None          # Approved version the seed was read at
+        self.observed = 0            # approvals observed (a seed racing one is discarded)
+        self.anchor = None
+        self.scopes = {}             # scope -> RankIndex
+        self.names = {}              # member_id -> name
+        self.depts = {}              # member_id -> Department
+        self._seen = set()           # approved request ids already counted
+        self._dirty = set()          # departments changed since the last take_dirty()
+        self._lock = threading.Lock()
+
+    # ---------- updates ----------
+    def seed(self, approved: pd.DataFrame, members: pd.DataFrame, anchor=None,
+             id_col: str = "member_id", dept_col: str = "Department", version=None):
+        """Load every approval once. `members` maps member ids (`id_col`) to departments (`dept_col`)."""
+        with self._lock:
+            if self.seeded:
+                return
+            self.version = version
+            self.anchor = to_ts(anchor)
+            self.depts = {clean(m): clean(d) for m, d in zip(members[id_col], members[dept_col]) if clean(m)}
+            for r in approved.itertuples(index=False):
+                if pd.notna(r.id):
+                    self._add(int(r.id), r.member_id, r.name, r.hours, r.approved_at, r.notes)
+            self.seeded = True
+            self._dirty = {scope_dept(s) for s in self.scopes if scope_dept(s) is not None}
+
+    def observe_approval(self, rid: int, member_id, name, hours, approved_at, notes=None):
+        with self._lock:
+            self.observed += 1
+            if self.seeded:   # otherwise the seed reads it from Approved
+                self._add(int(rid), member_id, name, hours, approved_at, notes)
+
+    def _add(self, rid: int, member_id, name, hours, approved_at, notes):
+        mid = clean(member_id)
+        if rid in self._seen or not mid:
+            return
+        self._seen.add(rid)
+        hours = pd.to_numeric(hours, errors="coerce")
+        hours = 0.0 if pd.isna(hours) else float(hours)
+        if clean(name):
+            self.names[mid] = clean(name)
+        dept = self.depts.get(mid)
+        if dept is None:
+            dept = self.depts[mid] = clean(notes).split(NOTES_SEP)[0]
+        scopes = [SCOPE_GLOBAL]
+        if dept:
+            scopes.append(dept_scope(dept))
+            self._dirty.add(dept)
+        at = to_ts(approved_at)
+        if self.anchor is None or (at is not None and at >= self.anchor):
+            scopes.append(SCOPE_PERIOD)
+        for scope in scopes:
+            self.scopes.setdefault(scope, RankIndex()).add(mid, hours)
+
+    def take_dirty(self) -> set:
+        """Departments whose ranking changed since the last call."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def mark_dirty(self, depts):
+        with self._lock:
+            self._dirty |= set(depts)
+
+    # ---------- reads ----------
+    def size(self, scope: str = SCOPE_GLOBAL) -> int:
+        """Members ranked within `scope`."""
+        with self._lock:
+            idx = self.scopes.get(scope)
+            return len(idx) if idx else 0
+
+    def departments(self) -> list:
+        return sorted(d for d in map(scope_dept, list(self.scopes)) if d)
+
+    def top_k(self, scope: str = SCOPE_GLOBAL, k: int | None = 10) -> pd.DataFrame:
+        with self._lock:
+            idx = self.scopes.get(scope)
+            rows = [{
+                "rank": rank, "member_id": mid, "name": self.names.get(mid, ""),
+                "Department": self.depts.get(mid, ""), "total_hours": hours, "count": count,
+            } for rank, mid, hours, count in (idx.top(k) if idx else [])]
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def rank_of(self, member_id, scope: str = SCOPE_GLOBAL) -> int | None:
+        with self._lock:
+            idx = self.scopes.get(scope)
+            return idx.rank(clean(member_id)) if idx else None
+
+    def ranks(self, member_id) -> dict:
+        """scope -> (rank, members ranked) for the member's global, department and period scopes."""
+        mid = clean(member_id)
+        with self._lock:
+            scopes = [SCOPE_GLOBAL, SCOPE_PERIOD]
+            if self.depts.get(mid):
+                scopes.insert(1, dept_scope(self.depts[mid]))
+            out = {}
+            for scope in scopes:
+                idx = self.scopes.get(scope)
+                rank = idx.rank(mid) if idx else None
+                if rank is not None:
+                    out[scope] = (rank, len(idx))
+        return out
+
+_leaderboard = Leaderboard()
+
+def get() -> Leaderboard:
+    return _leaderboard
+
+def replace(board: Leaderboard):
+    """Serve `board` from now on (a fresh seed built off to the side)."""
+    global _leaderboard
+    _leaderboard = board
+
+def reset():
+    """Drop the running state (period close, bulk import); the next use re-seeds."""
+    global _leaderboard
+    _leaderboard = Leaderboard()
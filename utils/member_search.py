@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Prefix search over Member_Data (Arabic / English names, student ID, national ID).
+# - Text is normalized first: diacritics and tatweel dropped, alef forms -> ا,
+#   ة -> ه, ى -> ي, ؤ -> و, ئ -> ي, Arabic-Indic digits -> 0-9, Latin casefolded.
+# - Every name is indexed from each word onwards ("محمد احمد علي", "احمد علي",
+#   "علي"), so typing the start of any word finds it. Keys live in one sorted list
+#   searched with bisect; rows are positions in the members frame.
+# - Built once per members refresh (utils.sheets.get_member_index) and shared.
+# - Column names come from utils.sheets (imported lazily: sheets imports this module).
+
+import re
+from bisect import bisect_left
+
+import pandas as pd
+
+_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_SPACES = re.compile(r"\s+")
+_CHAR_MAP = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ة": "ه", "ى": "ي", "ؤ": "و", "ئ": "ي",
+    **{chr(0x0660 + d): str(d) for d in range(10)},   # ٠-٩
+    **{chr(0x06F0 + d): str(d) for d in range(10)},   # ۰-۹
+})
+
+def normalize(text) -> str:
+    """Search form of a name / id (see module notes)."""
+    if text is None or (isinstance(text, float) and text != text):
+        return ""
+    s = _DIACRITICS.sub("", str(text)).translate(_CHAR_MAP).casefold()
+    return _SPACES.sub(" ", s).strip()
+
+def _word_suffixes(name: str) -> list[str]:
+    words = name.split(" ")
+    return [" ".join(words[i:]) for i in range(len(words))] if name else []
+
+class MemberIndex:
+    """Sorted-key prefix index over a members frame (positions are frame rows)."""
+
+    def __init__(self, members: pd.DataFrame):
+        from utils.sheets import COL_AR_NAME, COL_DEPT, COL_EN_NAME, COL_NAT_ID, COL_STUD_ID
+
+        self.frame = members.reset_index(drop=True)
+        n = len(self.frame)
+
+        def column(col):
+            return self.frame[col].tolist() if col in self.frame.columns else [None] * n
+
+        self._names = ["" if _blank(v) else str(v).strip() for v in column(COL_AR_NAME)]
+        self._depts = ["" if _blank(v) else str(v).strip() for v in column(COL_DEPT)]
+        stud_ids = column(COL_STUD_ID)
+
+        entries = []
+        by_dept = {}
+        for pos, (ar, en, nat, stud) in enumerate(zip(self._names, column(COL_EN_NAME),
+                                                      column(COL_NAT_ID), stud_ids)):
+            for name in (ar, en):
+                for key in _word_suffixes(normalize(name)):
+                    entries.append((key, pos))
+            for ident in (stud, nat):
+                key = normalize(ident)
+                if key:
+                    entries.append((key, pos))
+            if self._depts[pos]:
+                by_dept.setdefault(self._depts[pos], []).append(pos)
+        entries.sort()
+        self._keys = [k for k, _ in entries]
+        self._rows = [p for _, p in entries]
+        self._stud_ids = ["" if _blank(v) else str(v) for v in stud_ids]
+        self._by_dept = {d: sorted(ps, key=lambda p: normalize(self._names[p]))
+                         for d, ps in by_dept.items()}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # ---------- lookups ----------
+    def search(self, query: str, dept: str | None = None, limit: int = 20) -> list[int]:
+        """Positions of members with a name word / id starting with `query` (key order)."""
+        q = normalize(query)
+        if not q:
+            return []
+        out, seen = [], set()
+        i = bisect_left(self._keys, q)
+        while i < len(self._keys) and self._keys[i].startswith(q):
+            pos = self._rows[i]
+            i += 1
+            if pos in seen or (dept and self._depts[pos] != dept):
+                continue
+            seen.add(pos)
+            out.append(pos)
+            if len(out) >= limit:
+                break
+        return out
+
+    def by_dept(self, dept: str) -> list[int]:
+        """Positions of a department's members, sorted by (normalized) Arabic name."""
+        return list(self._by_dept.get(str(dept).strip(), []))
+
+    def rows(self, positions: list[int]) -> pd.DataFrame:
+        return self.frame.iloc[list(positions)]
+
+    # ---------- labels (selectbox format_func) ----------
+    def name(self, pos: int) -> str:
+        return self._names[pos]
+
+    def label(self, pos: int) -> str:
+        parts = [self._names[pos], self._depts[pos], self._stud_ids[pos]]
+        return " — ".join(p for p in parts if p)
+
+def _blank(v) -> bool:
+    return v is None or v is pd.NA or (isinstance(v, float) and v != v) or (isinstance(v, str) and not v.strip())
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+# Running metrics for the HR review pipeline (per app process).
+# - Seeded once from the sheets, then updated by utils.sheets as each submit /
+#   approve / reject is applied: no full-sheet recomputation per view.
+# - Review latency (created_at -> approved_at / rejected_at) goes into streaming
+#   quantile sketches (relative-error log buckets, 1% by default), overall, per
+#   department and per reviewer; pending depth is kept per department.
+# - Observations are keyed by request id, so journal replays and rebuilds never
+#   double count.
+# - prometheus_text() renders the Prometheus text exposition format; write_textfile()
+#   drops it atomically at HR_METRICS_PATH / st.secrets["metrics"]["path"]
+#   (default .hr_metrics/hr_pipeline.prom) for a node_exporter-style textfile scraper.
+
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+import streamlit as st
+
+from utils.analytics import NOTES_SEP
+
+METRICS_ENV = "HR_METRICS_PATH"
+DEFAULT_PATH = os.path.join(".hr_metrics", "hr_pipeline.prom")
+QUANTILES = (0.5, 0.9, 0.99)
+DECISIONS = ("approved", "rejected")
+
+def metrics_path() -> str:
+    path = os.environ.get(METRICS_ENV)
+    if not path:
+        try:
+            path = st.secrets["metrics"]["path"]
+        except Exception:
+            path = DEFAULT_PATH
+    return path
+
+# ---------------- Quantile sketch ----------------
+class QuantileSketch:
+    """Log-bucketed streaming quantiles: estimates within `rel_err` of the true value."""
+
+    def __init__(self, rel_err: float = 0.01):
+        self.gamma = (1 + rel_err) / (1 - rel_err)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = Counter()
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, x: float):
+        x = float(x)
+        self.count += 1
+        self.sum += x
+        if x <= 1e-9:
+            self.zeros += 1
+        else:
+            self.buckets[math.ceil(math.log(x) / self._log_gamma)] += 1
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if rank < seen:
+                return 2 * self.gamma ** k / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+# ---------------- Pipeline metrics ----------------
+class PipelineMetrics:
+    def __init__(self):
+        self.seeded = False
+        self.updated_at = None
+        self.submitted = Counter()        # dept -> n
+        self.decided = Counter()          # (dept, decision) -> n
+        self.by_reviewer = Counter()      # (reviewer, decision) -> n
+        self.latency = QuantileSketch()
+        self.latency_by_dept = {}
+        self.latency_by_reviewer = {}
+        self._pending = {}                # id -> (dept, created_at)
+        self._decided_ids = set()
+        self._lock = threading.Lock()
+
+    # ---------- updates ----------
+    def seed(self, requests: pd.DataFrame, decided_at: dict | None = None):
+        """Load the current state once: pending requests, decision counts and latencies.
+
+        `requests` has the Requests columns; `decided_at` maps id -> decision time for
+        rows whose time is not in Requests (rejections).
+        """
+        decided_at = decided_at or {}
+        with self._lock:
+            if self.seeded:
+                return
+            for r in requests.itertuples(index=False):
+                if pd.isna(r.id):
+                    continue
+                rid = int(r.id)
+                dept = _dept(r.notes)
+                self._submit(rid, dept, r.created_at)
+                if r.status in DECISIONS:
+                    at = r.approved_at if r.status == "approved" else decided_at.get(rid)
+                    self._decide(rid, r.status, r.hr_name, at)
+            self.seeded = True
+            self.updated_at = time.time()
+
+    def observe_submit(self, rid: int, notes, created_at):
+        with self._lock:
+            self._submit(int(rid), _dept(notes), created_at)
+            self.updated_at = time.time()
+
+    def observe_decision(self, rid: int, decision: str, reviewer, decided_at, notes=None, created_at=None):
+        with self._lock:
+            if int(rid) not in self._pending and int(rid) not in self._decided_ids:
+                self._submit(int(rid), _dept(notes), created_at)
+            self._decide(int(rid), decision, reviewer, decided_at)
+            self.updated_at = time.time()
+
+    def _submit(self, rid: int, dept: str, created_at):
+        if rid in self._pending or rid in self._decided_ids:
+            return
+        self.submitted[dept] += 1
+        self._pending[rid] = (dept, to_ts(created_at))
+
+    def _decide(self, rid: int, decision: str, reviewer, decided_at):
+        if rid in self._decided_ids or rid not in self._pending:
+            return
+        dept, created = self._pending.pop(rid)
+        self._decided_ids.add(rid)
+        reviewer = clean(reviewer) or "unknown"
+        self.decided[(dept, decision)] += 1
+        self.by_reviewer[(reviewer, decision)] += 1
+        decided = to_ts(decided_at)
+        if created is not None and decided is not None and decided >= created:
+            secs = (decided - created).total_seconds()
+            self.latency.add(secs)
+            self.latency_by_dept.setdefault(dept, QuantileSketch()).add(secs)
+            self.latency_by_reviewer.setdefault(reviewer, QuantileSketch()).add(secs)
+
+    # ---------- reads ----------
+    def pending_by_dept(self) -> Counter:
+        return Counter(dept for dept, _ in self._pending.values())
+
+    def oldest_pending(self) -> pd.Timestamp | None:
+        created = [c for _, c in self._pending.values() if c is not None]
+        return min(created) if created else None
+
+    def snapshot(self) -> dict:
+        """Plain tables for display (latencies in hours)."""
+        with self._lock:
+            pending = self.pending_by_dept()
+            depts = sorted(set(pending) | set(self.submitted))
+            by_dept = pd.DataFrame([{
+                "dept": d,
+                "pending": pending.get(d, 0),
+                "submitted": self.submitted.get(d, 0),
+                "approved": self.decided.get((d, "approved"), 0),
+                "rejected": self.decided.get((d, "rejected"), 0),
+                **_hours_quantiles(self.latency_by_dept.get(d)),
+            } for d in depts])
+            reviewers = sorted({r for r, _ in self.by_reviewer})
+            by_reviewer = pd.DataFrame([{
+                "reviewer": r,
+                "approved": self.by_reviewer.get((r, "approved"), 0),
+                "rejected": self.by_reviewer.get((r, "rejected"), 0),
+                **_hours_quantiles(self.latency_by_reviewer.get(r)),
+            } for r in reviewers])
+            oldest = self.oldest_pending()
+            age = None if oldest is None else (pd.Timestamp.now(tz="UTC") - oldest).total_seconds()
+            return {
+                "pending": sum(pending.values()),
+                "oldest_pending_hours": None if age is None else max(age, 0.0) / 3600,
+                "latency_hours": _hours_quantiles(self.latency),
+                "by_dept": by_dept,
+                "by_reviewer": by_reviewer,
+            }
+
+    # ---------- Prometheus text format ----------
+    def prometheus_text(self) -> str:
+        out = []
+
+        def family(name, kind, help_text):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        def sample(name, value, **labels):
+            lbl = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            out.append(f"{name}{{{lbl}}} {_fmt(value)}" if lbl else f"{name} {_fmt(value)}")
+
+        def summary(name, sketch, **labels):
+            for q in QUANTILES:
+                v = sketch.quantile(q)
+                if v is not None:
+                    sample(name, v, **labels, quantile=str(q))
+            sample(f"{name}_sum", sketch.sum, **labels)
+            sample(f"{name}_count", sketch.count, **labels)
+
+        with self._lock:
+            family("hr_requests_submitted_total", "counter", "Requests submitted, by department.")
+            for d, n in sorted(self.submitted.items()):
+                sample("hr_requests_submitted_total", n, department=d)
+            family("hr_requests_decided_total", "counter", "Requests approved / rejected, by department.")
+            for (d, dec), n in sorted(self.decided.items()):
+                sample("hr_requests_decided_total", n, department=d, decision=dec)
+            family("hr_reviewer_decisions_total", "counter", "Decisions per reviewer (hr_name).")
+            for (r, dec), n in sorted(self.by_reviewer.items()):
+                sample("hr_reviewer_decisions_total", n, reviewer=r, decision=dec)
+            family("hr_pending_requests", "gauge", "Requests waiting for review, by department.")
+            for d, n in sorted(self.pending_by_dept().items()):
+                sample("hr_pending_requests", n, department=d)
+            # a timestamp rather than an age, so the file never goes stale between writes
+            oldest = self.oldest_pending()
+            family("hr_pending_oldest_created_timestamp_seconds", "gauge",
+                   "Submission time of the oldest pending request (unix time; 0 = none).")
+            sample("hr_pending_oldest_created_timestamp_seconds", oldest.timestamp() if oldest is not None else 0.0)
+            family("hr_review_latency_seconds", "summary", "Time from submission to decision.")
+            summary("hr_review_latency_seconds", self.latency)
+            family("hr_review_latency_by_department_seconds", "summary", "Review latency per department.")
+            for d, sk in sorted(self.latency_by_dept.items()):
+                summary("hr_review_latency_by_department_seconds", sk, department=d)
+            family("hr_review_latency_by_reviewer_seconds", "summary", "Review latency per reviewer.")
+            for r, sk in sorted(self.latency_by_reviewer.items()):
+                summary("hr_review_latency_by_reviewer_seconds", sk, reviewer=r)
+            family("hr_metrics_updated_timestamp_seconds", "gauge", "Last metrics update (unix time).")
+            sample("hr_metrics_updated_timestamp_seconds", self.updated_at or 0.0)
+        return "\n".join(out) + "\n"
+
+    def write_textfile(self, path: str | None = None) -> str:
+        """Atomically (re)write the Prometheus text file; returns its path."""
+        path = path or metrics_path()
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(self.prometheus_text())
+        os.replace(tmp, path)
+        return path
+
+_metrics = PipelineMetrics()
+
+def get() -> PipelineMetrics:
+    return _metrics
+
+def reset():
+    """Drop the running state (e.g. after a bulk import); the next use re-seeds."""
+    global _metrics
+    _metrics = PipelineMetrics()
+
+# ---------------- helpers ----------------
+def clean(v) -> str:
+    """Stripped string form of a cell; blanks (None / NaN / NA) become ""."""
+    return "" if v is None or (isinstance(v, float) and v != v) or v is pd.NA else str(v).strip()
+
+def _dept(notes) -> str:
+    return clean(notes).split(NOTES_SEP)[0] or "unknown"
+
+def to_ts(v) -> pd.Timestamp | None:
+    """UTC timestamp of a cell, or None when blank / unparseable."""
+    if v is None or v is pd.NaT or (isinstance(v, float) and v != v) or v == "":
+        return None
+    ts = pd.to_datetime(v, errors="coerce", utc=True)
+    return None if pd.isna(ts) else ts
+
+def _hours_quantiles(sketch: QuantileSketch | None) -> dict:
+    vals = {f"p{int(q * 100)}_h": None for q in QUANTILES}
+    if sketch is not None:
+        for q in QUANTILES:
+            v = sketch.quantile(q)
+            vals[f"p{int(q * 100)}_h"] = None if v is None else round(v / 3600, 2)
+    return vals
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt(v) -> str:
+    return repr(int(v)) if isinstance(v, int) else f"{float(v):.6g}"
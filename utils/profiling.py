@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# Opt-in profiling for utils.sheets and the page scripts.
+# - Off unless env HR_PROFILE=1 or st.secrets["profiling"]["enabled"] is true; when
+#   off nothing is wrapped and the page hooks return immediately.
+# - Spans nest: page -> section -> utils.sheets function -> ... -> Sheets HTTP call.
+#   Every page run is written to HR_PROFILE_DIR / st.secrets["profiling"]["dir"]
+#   (default .hr_profiles/) as folded stacks, one "page;section;fn self_us" line per
+#   path, which flamegraph.pl, inferno and speedscope read as-is.
+# - ?profile=1 on a page URL also samples that run: pyinstrument when installed
+#   (.speedscope.json), cProfile otherwise (.pstats); ?profile=cprofile forces cProfile.
+# - A run cut short by st.stop() / st.rerun() is written (spans only) when the
+#   session's next run starts.
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from importlib.util import find_spec
+
+import streamlit as st
+
+PROFILE_ENV = "HR_PROFILE"
+PROFILE_DIR_ENV = "HR_PROFILE_DIR"
+DEFAULT_DIR = ".hr_profiles"
+_OPEN_KEY = "_profile_open"
+
+_local = threading.local()
+_enabled = None
+
+def _setting(key: str):
+    try:
+        return st.secrets["profiling"][key]
+    except Exception:
+        return None
+
+def enabled() -> bool:
+    global _enabled
+    if _enabled is None:
+        flag = os.environ.get(PROFILE_ENV)
+        if flag is None:
+            flag = _setting("enabled")
+        _enabled = str(flag).strip().lower() in ("1", "true", "yes", "on")
+    return _enabled
+
+def profile_dir() -> str:
+    return os.environ.get(PROFILE_DIR_ENV) or _setting("dir") or DEFAULT_DIR
+
+# ---------------- Per-run profile ----------------
+class _PageProfile:
+    def __init__(self, name: str, sampler: str | None):
+        self.name = name
+        self.started = datetime.now()
+        self.totals = {}      # stack path (tuple) -> [total_s, child_s, calls]
+        self.stack = []       # open spans: [name, t0, child_s]
+        self.last_t = time.perf_counter()
+        self.sampler = self._start_sampler(sampler)
+        self.open(name)
+
+    def open(self, name: str):
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def close(self, until: float | None = None):
+        name, t0, child = self.stack.pop()
+        t1 = until if until is not None else time.perf_counter()
+        path = tuple(s[0] for s in self.stack) + (name,)
+        rec = self.totals.setdefault(path, [0.0, 0.0, 0])
+        rec[0] += t1 - t0
+        rec[1] += child
+        rec[2] += 1
+        if self.stack:
+            self.stack[-1][2] += t1 - t0
+        self.last_t = t1
+
+    def finish(self, stopped: bool = False):
+        sampler, self.sampler = self.sampler, None
+        until = self.last_t if stopped else None
+        while self.stack:
+            self.close(until)
+        # a sampler can only be stopped from the thread that started it
+        self._write(None if stopped else sampler, stopped)
+
+    # ---------- samplers ----------
+    @staticmethod
+    def _start_sampler(kind: str | None):
+        if not kind:
+            return None
+        if kind != "cprofile" and find_spec("pyinstrument") is not None:
+            from pyinstrument import Profiler
+
+            prof = Profiler()
+            prof.start()
+            return ("pyinstrument", prof)
+        import cProfile
+
+        prof = cProfile.Profile()
+        prof.enable()
+        return ("cprofile", prof)
+
+    # ---------- output ----------
+    def _write(self, sampler, stopped: bool):
+        out = profile_dir()
+        os.makedirs(out, exist_ok=True)
+        stem = os.path.join(out, f"{self.name}_{self.started:%Y%m%d_%H%M%S_%f}")
+        lines = []
+        for path, (total, child, _) in sorted(self.totals.items()):
+            self_us = int(round(max(total - child, 0.0) * 1e6))
+            if self_us:
+                lines.append(";".join(p.replace(";", ",").replace(" ", "_") for p in path) + f" {self_us}")
+        with open(stem + (".stopped" if stopped else "") + ".folded", "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+        if sampler is None:
+            return
+        kind, prof = sampler
+        if kind == "pyinstrument":
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            prof.stop()
+            with open(stem + ".speedscope.json", "w", encoding="utf-8") as fh:
+                fh.write(prof.output(renderer=SpeedscopeRenderer()))
+        else:
+            prof.disable()
+            prof.dump_stats(stem + ".pstats")
+
+def _current() -> _PageProfile | None:
+    return getattr(_local, "page", None)
+
+# ---------------- Page hooks ----------------
+def page(name: str):
+    """Start profiling this run of a page script (call once, near the top)."""
+    if not enabled():
+        return
+    sample = None
+    try:
+        stale = st.session_state.get(_OPEN_KEY)
+        if stale is not None:
+            stale.finish(stopped=True)
+        sample = st.query_params.get("profile")
+    except Exception:
+        pass
+    prof = _PageProfile(name, "cprofile" if sample == "cprofile" else ("auto" if sample else None))
+    _local.page = prof
+    try:
+        st.session_state[_OPEN_KEY] = prof
+    except Exception:
+        pass
+
+def section(name: str):
+    """Close the previous top-level section of the page and open `name`."""
+    prof = _current()
+    if prof is None:
+        return
+    while len(prof.stack) > 1:
+        prof.close()
+    prof.open(name)
+
+def finish():
+    """End of the page script: write the profile."""
+    prof = _current()
+    if prof is None:
+        return
+    _local.page = None
+    try:
+        st.session_state.pop(_OPEN_KEY, None)
+    except Exception:
+        pass
+    prof.finish()
+
+@contextmanager
+def span(name: str):
+    prof = _current()
+    if prof is None:
+        yield
+        return
+    prof.open(name)
+    try:
+        yield
+    finally:
+        if _current() is prof and prof.stack:
+            prof.close()
+
+# ---------------- Instrumentation ----------------
+def profiled(fn, name: str | None = None):
+    """Wrap `fn` in a span (keeps st.cache_* .clear())."""
+    label = name or getattr(fn, "__name__", repr(fn))
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        prof = _current()
+        if prof is None:
+            return fn(*args, **kwargs)
+        prof.open(label)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if _current() is prof and prof.stack:
+                prof.close()
+
+    if hasattr(fn, "clear"):
+        wrapper.clear = fn.clear
+    return wrapper
+
+def instrument(namespace: dict, extra: tuple = ()):
+    """Wrap the public functions of a module (plus `extra` private ones) in place.
+
+    Call at the bottom of the module; internal calls go through the module globals,
+    so nested spans show up too. No-op unless profiling is enabled.
+    """
+    if not enabled():
+        return
+    module = namespace.get("__name__")
+    for attr, obj in list(namespace.items()):
+        if not callable(obj) or isinstance(obj, type) or getattr(obj, "__module__", None) != module:
+            continue
+        if attr.startswith("_") and attr not in extra:
+            continue
+        namespace[attr] = profiled(obj, attr)
+
+def instrument_method(cls, attr: str, name: str):
+    if enabled():
+        setattr(cls, attr, profiled(getattr(cls, attr), name))
@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+# Consistency checker / reconciler for the derived sheets.
+# - Requests is the record. Approved / Rejected hold one row per decided request,
+#   with the same fields. Members_Leaderboard / Members_Period match the Approved
+#   totals per member: all-time, and since the period anchor.
+# - Every sheet is hashed in blocks of BLOCK_ROWS rows. The hashes, with the request
+#   ids / member ids of each block, are kept between runs: in memory and in
+#   HR_RECONCILE_STATE (or [reconcile] state_path; default .hr_reconcile/state.json).
+#   A run reads each spreadsheet once (one batchGet) but re-checks only the requests
+#   and members of blocks whose hash changed. Blocks with open issues, or with
+#   requests still in the journal, are re-checked on every run until they settle.
+# - Repairs are targeted writes:
+#     * a missing Approved / Rejected row is appended;
+#     * a drifted cell is rewritten on its own;
+#     * a Requests row still pending is marked decided from its decision row;
+#     * a rollup row gets its totals rewritten (or is appended / blanked).
+#   Ambiguous cases are only reported: both decisions, a decision sheet that
+#   contradicts Requests, duplicate ids, decisions for unknown requests.
+# - Settings in st.secrets["reconcile"] (see DEFAULT_SETTINGS); HR_RECONCILE=1/0
+#   overrides `enabled`. When enabled, a background thread runs every
+#   `interval_seconds`. A run can also be started from Period Admin, or with
+#   `python -m utils.reconcile [--repair] [--full]`.
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from utils import sheets
+
+BLOCK_ROWS = 500
+RECONCILE_ENV = "HR_RECONCILE"
+STATE_ENV = "HR_RECONCILE_STATE"
+DEFAULT_STATE_PATH = os.path.join(".hr_reconcile", "state.json")
+DEFAULT_SETTINGS = {
+    "enabled": False,
+    "repair": False,            # scheduled runs: report only unless true
+    "interval_seconds": 3600,
+}
+
+ROLLUPS = {sheets.SHEET_LEADERBOARD: None, sheets.SHEET_PERIOD: "anchor"}
+DECISIONS = {"approved": (sheets.SHEET_APPROVED, "approved_at"),
+             "rejected": (sheets.SHEET_REJECTED, "rejected_at")}
+FIELDS = ("name", "member_id", "date", "hours", "notes", "hr_name", "hr_notes")
+
+ISSUES = {
+    "missing_decision": "القرار غير موجود في ورقة القرارات",
+    "mismatch":         "بيانات ورقة القرارات تختلف عن Requests",
+    "status_behind":    "الطلب قيد الانتظار في Requests رغم وجود قرار",
+    "both_decisions":   "الطلب موجود في Approved وRejected معًا",
+    "conflict":         "حالة الطلب في Requests تعارض ورقة القرارات",
+    "duplicate":        "رقم طلب مكرر",
+    "orphan":           "قرار لطلب غير موجود في Requests",
+    "rollup":           "مجموع الساعات لا يطابق Approved",
+}
+
+def load_settings() -> dict:
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        settings.update({k: v for k, v in st.secrets["reconcile"].items() if k in DEFAULT_SETTINGS})
+    except Exception:
+        pass
+    env = os.environ.get(RECONCILE_ENV)
+    if env is not None:
+        settings["enabled"] = env.strip().lower() in {"1", "true", "yes", "on"}
+    return settings
+
+def state_path() -> str:
+    path = os.environ.get(STATE_ENV)
+    if not path:
+        try:
+            path = st.secrets["reconcile"]["state_path"]
+        except Exception:
+            path = DEFAULT_STATE_PATH
+    return path
+
+# ---------------- Sheet views ----------------
+class SheetRows:
+    """Raw rows of one sheet (row 2 onwards), with lazy per-row dicts and key indexes."""
+
+    def __init__(self, title: str, headers: list, rows: list):
+        self.title, self.headers, self.rows = title, headers, rows
+        self.col = {h: i for i, h in enumerate(headers) if h}
+
+    def value(self, pos: int, header: str):
+        row, i = self.rows[pos], self.col.get(header)
+        return row[i] if i is not None and i < len(row) else ""
+
+    def record(self, pos: int) -> dict:
+        return {h: self.value(pos, h) for h in self.col}
+
+    def sheet_row(self, pos: int) -> int:
+        return pos + 2
+
+    def block(self, pos: int) -> int:
+        return pos // BLOCK_ROWS
+
+    def index(self, header: str, norm) -> dict:
+        """normalized value of `header` -> row positions."""
+        out = {}
+        for pos in range(len(self.rows)):
+            key = norm(self.value(pos, header))
+            if key not in (None, ""):
+                out.setdefault(key, []).append(pos)
+        return out
+
+def _request_id(v) -> int | None:
+    n = pd.to_numeric(sheets.normalize_member_id(v), errors="coerce")
+    return int(n) if pd.notna(n) else None
+
+def _block_hash(rows: list) -> str:
+    return hashlib.sha1(json.dumps(rows, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+def _norm(field: str, v):
+    if v is None or (isinstance(v, float) and v != v) or str(v).strip() == "":
+        return ""
+    if field == "member_id":
+        return sheets.normalize_member_id(v)
+    if field == "hours":
+        x = pd.to_numeric(v, errors="coerce")
+        return round(float(x), 2) if pd.notna(x) else str(v).strip()
+    if field in ("date", "approved_at", "rejected_at"):
+        ts = pd.to_datetime(str(v).strip(), errors="coerce", utc=True)
+        return ts if pd.notna(ts) else str(v).strip()
+    return str(v).strip()
+
+# ---------------- Check ----------------
+def check(snapshot: dict, state: dict, members: pd.DataFrame, repair: bool = True) -> dict:
+    """Compare the sheets of `snapshot` (utils.sheets.reconcile_snapshot) where blocks changed.
+
+    `state` is the previous run's {"sheets": {title: {"hashes", "keys"}}, "anchor"} ({} = check
+    everything). With `repair` False the repairs are still listed but their blocks stay
+    due for a re-check. Returns {"issues": [...], "updates": [...], "appends": {...}, "state": {...},
+    "blocks": (changed, total), "requests": n, "members": n}.
+    """
+    views = {t: SheetRows(t, s["headers"], s["rows"]) for t, s in snapshot["sheets"].items()}
+    req_titles = snapshot["requests"]
+    anchor = snapshot["anchor"]
+    anchor_key = anchor.isoformat() if anchor is not None else None
+    old_sheets = state.get("sheets", {})
+
+    # 1) hash blocks; the ids / members of changed blocks (before and after) are dirty
+    dirty_ids, dirty_members = set(), set()
+    new_state = {"sheets": {}, "anchor": anchor_key}
+    changed = total = 0
+    for title, v in views.items():
+        rollup = title in ROLLUPS
+        hashes, keys = [], []
+        for start in range(0, len(v.rows), BLOCK_ROWS):
+            hashes.append(_block_hash(v.rows[start:start + BLOCK_ROWS]))
+            if rollup:
+                keys.append([_norm("member_id", v.value(p, "member_id"))
+                             for p in range(start, min(start + BLOCK_ROWS, len(v.rows)))])
+            else:
+                keys.append([[_request_id(v.value(p, "id")), _norm("member_id", v.value(p, "member_id"))]
+                             for p in range(start, min(start + BLOCK_ROWS, len(v.rows)))])
+        old = old_sheets.get(title, {"hashes": [], "keys": []})
+        for b in range(max(len(hashes), len(old["hashes"]))):
+            total += b < len(hashes)
+            if b < len(hashes) and b < len(old["hashes"]) and old["hashes"][b] == hashes[b]:
+                continue
+            changed += b < len(hashes)
+            for ks in (keys[b] if b < len(hashes) else [], old["keys"][b] if b < len(old["keys"]) else []):
+                for k in ks:
+                    if rollup:
+                        dirty_members.add(k)
+                    else:
+                        dirty_ids.add(k[0])
+                        dirty_members.add(k[1])
+        new_state["sheets"][title] = {"hashes": hashes, "keys": keys}
+    dirty_ids.discard(None)
+    dirty_members.discard("")
+    period_all = "anchor" not in state or state.get("anchor") != anchor_key
+
+    # 2) requests vs. Approved / Rejected
+    by_id = {t: views[t].index("id", _request_id) for t in req_titles + [s for s, _ in DECISIONS.values()]}
+    issues, updates, appends = [], [], {}
+    recheck = set()   # (title, block) re-checked next run whatever their hash
+
+    def where(title, positions):
+        return [(title, views[title].block(p)) for p in positions]
+
+    def issue(kind, sheet, key, detail, locs, repairable):
+        repaired = repairable and repair
+        issues.append({"sheet": sheet, "key": key, "issue": ISSUES[kind], "detail": detail,
+                       "repaired": repaired})
+        if not repaired:
+            recheck.update(locs)
+
+    in_flight = snapshot["in_flight"]
+    added = {}   # member -> Approved rows appended by this run (counted in the rollups below)
+    fixed = {}   # Approved position -> cells rewritten by this run
+    for rid in sorted(dirty_ids):
+        reqs = [(t, p) for t in req_titles for p in by_id[t].get(rid, [])]
+        dec = {status: by_id[title].get(rid, []) for status, (title, _) in DECISIONS.items()}
+        locs = [loc for t, p in reqs for loc in where(t, [p])] + [
+            loc for status, (title, _) in DECISIONS.items() for loc in where(title, dec[status])]
+        if rid in in_flight:
+            recheck.update(locs)   # the journal still owes writes for it
+            continue
+        for status, (title, _) in DECISIONS.items():
+            if len(dec[status]) > 1:
+                issue("duplicate", title, rid, f"{len(dec[status])} صفوف", locs, False)
+        if len(reqs) > 1:
+            issue("duplicate", sheets.SHEET_REQUESTS, rid, ", ".join(t for t, _ in reqs), locs, False)
+        if not reqs:
+            if dec["approved"] or dec["rejected"]:
+                issue("orphan", sheets.SHEET_REQUESTS, rid, "", locs, False)
+            continue
+        if dec["approved"] and dec["rejected"]:
+            issue("both_decisions", sheets.SHEET_REQUESTS, rid, "", locs, False)
+            continue
+
+        req_title, req_pos = reqs[0]
+        req = views[req_title].record(req_pos)
+        status = _norm("status", req.get("status"))
+        decided = next((s for s in DECISIONS if dec[s]), None)
+        if status in DECISIONS:
+            title, ts_col = DECISIONS[status]
+            if decided not in (None, status):
+                issue("conflict", title, rid, f"{status} / {decided}", locs, False)
+                continue
+            if decided is None:
+                row = {f: req.get(f, "") for f in ("id",) + FIELDS}
+                row[ts_col] = req.get("approved_at", "") if status == "approved" else ""
+                appends.setdefault(title, []).append(row)
+                if status == "approved" and repair:
+                    added.setdefault(_norm("member_id", row["member_id"]), []).append(row)
+                issue("missing_decision", title, rid, status, locs, True)
+                continue
+            pos = dec[status][0]
+            fields = FIELDS + ((ts_col,) if status == "approved" else ())
+            got = views[title].record(pos)
+            want = {f: req.get("approved_at" if f == ts_col else f, "") for f in fields}
+            diff = {f: want[f] for f in fields if f in views[title].col and _norm(f, want[f]) != _norm(f, got.get(f))}
+            if diff:
+                updates.append((title, views[title].sheet_row(pos), diff))
+                if status == "approved" and repair:
+                    fixed[pos] = diff
+                issue("mismatch", title, rid, ", ".join(diff), locs, True)
+        elif status == "pending" and decided is not None:
+            title, ts_col = DECISIONS[decided]
+            got = views[title].record(dec[decided][0])
+            cells = {"status": decided, "hr_name": got.get("hr_name", ""), "hr_notes": got.get("hr_notes", ""),
+                     "approved_at": got.get(ts_col, "") if decided == "approved" else ""}
+            updates.append((req_title, views[req_title].sheet_row(req_pos), cells))
+            issue("status_behind", req_title, rid, decided, locs, True)
+
+    # 3) rollups vs. Approved totals
+    # expected totals come from Approved as this run leaves it
+    approved = views[sheets.SHEET_APPROVED]
+
+    def app(pos, header):
+        return fixed[pos][header] if header in fixed.get(pos, {}) else approved.value(pos, header)
+
+    app_by_member = {}
+    for pos in range(len(approved.rows)):
+        mid = _norm("member_id", app(pos, "member_id"))
+        if mid:
+            app_by_member.setdefault(mid, []).append(pos)
+    dirty_members |= {_norm("member_id", approved.value(p, "member_id")) for p in fixed} | set(added)
+    member_info = {sheets.normalize_member_id(m): (n, nid, d) for m, n, nid, d in zip(
+        members[sheets.COL_STUD_ID], members[sheets.COL_AR_NAME], members[sheets.COL_NAT_ID], members[sheets.COL_DEPT])}
+    for title, window in ROLLUPS.items():
+        view = views[title]
+        roll_by_member = view.index("member_id", lambda v: _norm("member_id", v))
+        check_members = dirty_members
+        if window == "anchor" and period_all:
+            check_members = set(app_by_member) | set(roll_by_member)
+        for mid in sorted(check_members):
+            rows = [p for p in app_by_member.get(mid, [])
+                    if window is None or anchor is None
+                    or _at_or_after(app(p, "approved_at"), anchor)]
+            extra = [r for r in added.get(mid, [])
+                     if window is None or anchor is None or _at_or_after(r["approved_at"], anchor)]
+            # one rollup row per (member_id, name), the key _build_rollup_df groups by
+            by_name = {}
+            for p in rows:
+                by_name.setdefault(_norm("name", app(p, "name")), ([], [], []))[0].append(p)
+            for r in extra:
+                by_name.setdefault(_norm("name", r["name"]), ([], [], []))[1].append(r)
+            for p in roll_by_member.get(mid, []):
+                by_name.setdefault(_norm("name", view.value(p, "name")), ([], [], []))[2].append(p)
+            for name, (n_rows, n_extra, have) in sorted(by_name.items()):
+                hours = round(sum(_num(app(p, "hours")) for p in n_rows)
+                              + sum(_num(r["hours"]) for r in n_extra), 2)
+                count = sum(_request_id(approved.value(p, "id")) is not None for p in n_rows) + len(n_extra)
+                got_hours = round(sum(_num(view.value(p, "total_hours")) for p in have), 2)
+                got_count = int(sum(_num(view.value(p, "count")) for p in have))
+                if abs(got_hours - hours) < 0.005 and got_count == count and len(have) <= 1:
+                    continue
+                last = max([str(app(p, "approved_at")) for p in n_rows]
+                           + [str(r["approved_at"]) for r in n_extra], default="")
+                blank = {h: "" for h in view.col}
+                if count == 0:
+                    updates += [(title, view.sheet_row(p), blank) for p in have]
+                elif not have:
+                    # Member_Data fills national_id / Department only when the name matches too
+                    m_name, nid, dept = member_info.get(mid, ("", "", ""))
+                    if _norm("name", m_name) != name:
+                        nid, dept = "", ""
+                    appends.setdefault(title, []).append({
+                        "member_id": mid, "national_id": nid, "name": name, "Department": dept,
+                        "total_hours": hours, "count": count, "last_approved_at": last})
+                else:
+                    updates.append((title, view.sheet_row(have[0]),
+                                    {"total_hours": hours, "count": count, "last_approved_at": last}))
+                    updates += [(title, view.sheet_row(p), blank) for p in have[1:]]
+                issue("rollup", title, mid, f"{name}: {got_hours:g}/{got_count} ≠ {hours:g}/{count}",
+                      where(title, have) or where(approved.title, n_rows[:1]), True)
+
+    for title, b in recheck:
+        if b < len(new_state["sheets"][title]["hashes"]):
+            new_state["sheets"][title]["hashes"][b] = None
+    return {"issues": issues, "updates": updates, "appends": appends, "state": new_state,
+            "blocks": (changed, total), "requests": len(dirty_ids), "members": len(dirty_members)}
+
+def _num(v) -> float:
+    x = pd.to_numeric(v, errors="coerce")
+    return float(x) if pd.notna(x) else 0.0
+
+def _at_or_after(v, anchor: pd.Timestamp) -> bool:
+    ts = _norm("approved_at", v)
+    return isinstance(ts, pd.Timestamp) and ts >= anchor
+
+# ---------------- State ----------------
+@st.cache_resource
+def _state() -> dict:
+    return {"lock": threading.Lock(), "data": None, "report": None}
+
+def _load_state() -> dict:
+    try:
+        with open(state_path(), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(data: dict):
+    path = state_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+# ---------------- Job ----------------
+def run_once(repair: bool | None = None, full: bool = False) -> dict:
+    """Check the blocks changed since the last run (all with `full`); repair if asked."""
+    settings = load_settings()
+    repair = settings["repair"] if repair is None else repair
+    state = _state()
+    with state["lock"]:
+        started = time.monotonic()
+        if state["data"] is None:
+            state["data"] = _load_state()
+        members = sheets.get_members_df()
+        with sheets.exclusive_writes():
+            snapshot = sheets.reconcile_snapshot()
+            res = check(snapshot, {} if full else state["data"], members, repair)
+            writes = sheets.apply_reconcile_repairs(res["updates"], res["appends"]) if repair else 0
+        issues = pd.DataFrame(res["issues"], columns=["sheet", "key", "issue", "detail", "repaired"])
+        state["data"] = res["state"]
+        try:
+            _save_state(state["data"])
+        except OSError:
+            pass  # in-memory state still makes the next run incremental
+        report = {
+            "ran_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "blocks_changed": res["blocks"][0],
+            "blocks": res["blocks"][1],
+            "requests_checked": res["requests"],
+            "members_checked": res["members"],
+            "issues": issues,
+            "writes": writes,
+            "repair": repair,
+            "seconds": round(time.monotonic() - started, 2),
+        }
+        state["report"] = report
+    return report
+
+def last_report() -> dict | None:
+    return _state()["report"]
+
+def _loop(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            run_once()
+        except Exception:
+            pass  # backend down: the next tick retries
+
+@st.cache_resource
+def _scheduler(interval: float) -> threading.Thread:
+    t = threading.Thread(target=_loop, args=(interval,), name="hr-reconcile", daemon=True)
+    t.start()
+    return t
+
+def ensure_scheduler() -> bool:
+    """Start the periodic check once per process if enabled; returns whether it runs."""
+    settings = load_settings()
+    if settings["enabled"]:
+        _scheduler(max(float(settings["interval_seconds"]), 60.0))
+    return settings["enabled"]
+
+# ---------------- CLI ----------------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Check (and repair) Approved / Rejected / rollups against Requests.")
+    ap.add_argument("--repair", action="store_true", help="write the targeted repairs")
+    ap.add_argument("--full", action="store_true", help="ignore the saved block hashes and check everything")
+    args = ap.parse_args(argv)
+    report = run_once(repair=args.repair, full=args.full)
+    print(f"blocks_changed={report['blocks_changed']}/{report['blocks']} "
+          f"requests_checked={report['requests_checked']} members_checked={report['members_checked']} "
+          f"issues={len(report['issues'])} writes={report['writes']} seconds={report['seconds']}")
+    for r in report["issues"].itertuples(index=False):
+        print(f"  {r.sheet}\t{r.key}\t{r.issue}\t{r.detail}\t{'repaired' if r.repaired else ''}")
+    return 1 if len(report["issues"]) and not report["repair"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,23 @@
 # -*- coding: utf-8 -*-
-import gspread
-from google.oauth2.service_account import Credentials
-from gspread_dataframe import get_as_dataframe, set_with_dataframe
+# gspread, google-auth and gspread_dataframe are imported inside the functions that
+# talk to Sheets, on first data access, so importing this module (every page does)
+# costs no Sheets-client startup.
 import pandas as pd
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import time
 from datetime import datetime
 from dateutil import parser
 import streamlit as st
 
+from utils import journal, leaderboard, metrics, profiling
+from utils.analytics import NOTES_SEP, TREND_FREQS, AnalyticsEngine, TrendBuckets, format_notes
+from utils.member_search import MemberIndex, normalize as _normalize_text
+
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive",
@@ -22,6 +33,8 @@ SHEET_REJECTED  = "Rejected"   # NEW
 SHEET_LEADERBOARD = "Members_Leaderboard"   # مدى الحياة
 SHEET_PERIOD      = "Members_Period"        # من نقطة مرجعية
 SHEET_META        = "Meta"                  # لتخزين period_anchor
+SHEET_PERIODS     = "Periods"               # فهرس الفترات المغلقة
+PERIOD_SNAPSHOT_PREFIX = "Period_"          # Period_<period_id>: لقطة مجمّدة لكل فترة
 
 # Columns (do NOT change Arabic labels)
 COL_AR_NAME = "الاسم باللغة العربي"
@@ -36,6 +49,12 @@ COL_TASK_NAME    = "المهمة"
 COL_TASK_MINUTES = "المدة المقترحة ( بالدقائق)"
 COL_TASK_DEPT    = "القسم"
 
+# Requests headers (exact)
+REQUEST_HEADERS = [
+    "id", "name", "member_id", "date", "hours", "notes", "status",
+    "hr_name", "hr_notes", "created_at", "approved_at",
+]
+
 # Approved / Rejected headers (exact)
 APPROVED_HEADERS = [
     "id", "name", "member_id", "date", "hours", "notes",
@@ -54,32 +73,175 @@ LEADER_HEADERS = [
 ]
 PERIOD_HEADERS = LEADER_HEADERS[:]  # نفس الهيكل
 
+META_HEADERS = ["key", "value"]
+
+# One row per closed period; `sheet` holds its frozen per-member rollup (PERIOD_HEADERS)
+PERIODS_HEADERS = [
+    "period_id", "start", "end", "sheet",
+    "members", "total_hours", "count", "closed_at",
+]
+
+# Managed sheets: title -> (headers, initial rows, rewrite header row if it drifted)
+# Member_Data / Tasks_Data are owned by HR and are never created or rewritten here.
+SCHEMA = {
+    SHEET_REQUESTS:    (REQUEST_HEADERS,  1000, False),
+    SHEET_APPROVED:    (APPROVED_HEADERS, 1000, False),
+    SHEET_REJECTED:    (REJECTED_HEADERS, 1000, False),
+    SHEET_LEADERBOARD: (LEADER_HEADERS,   2000, True),
+    SHEET_PERIOD:      (PERIOD_HEADERS,   2000, True),
+    SHEET_META:        (META_HEADERS,       10, False),
+    SHEET_PERIODS:     (PERIODS_HEADERS,   200, True),
+}
+
+# (connect, read) seconds: fail fast instead of hanging the page when Google is slow
+SHEETS_TIMEOUT = (5, 30)
+
 # ---------------- Core gspread helpers ----------------
 def _client():
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     sa = st.secrets["gcp_service_account"]
     creds = Credentials.from_service_account_info(sa, scopes=SCOPES)
-    return gspread.authorize(creds)
-
+    gc = gspread.authorize(creds)
+    gc.set_timeout(SHEETS_TIMEOUT)
+    # one keep-alive connection per overlapping call (see _concurrently)
+    from requests.adapters import HTTPAdapter
+    gc.http_client.session.mount("https://", HTTPAdapter(pool_maxsize=max(_concurrency(), 10)))
+    return gc
+
+@st.cache_resource
 def _open_spreadsheet():
+    """Open the spreadsheet once per process (auth + Drive lookup are not free)."""
     gc = _client()
     name = st.secrets["sheets"]["spreadsheet_name"]
     return gc.open(name)
 
+def _clean_col(c):
+    # remove NBSP and extra spaces
+    return str(c).replace("\u00a0", " ").strip()
+
+def _a1(title, rng=None):
+    from gspread.utils import absolute_range_name
+    return absolute_range_name(title, rng)
+
+def _col_letter(n: int) -> str:
+    # rowcol_to_a1 handles wide schemas (AA, AB, ...) unlike chr(64+n)
+    from gspread.utils import rowcol_to_a1
+    return rowcol_to_a1(1, n)[:-1]
+
+def _header_range(title, n_cols):
+    return _a1(title, f"A1:{_col_letter(n_cols)}1")
+
+def _bootstrap_schema(sh) -> dict:
+    """One-time schema migration.
+
+    Fetches the spreadsheet metadata once, adds missing sheets (and columns) in a
+    single batch, fixes header rows in a single batch and returns the layout:
+    {title: {"props": sheet properties, "headers": [...], "col": {header: index}}}.
+    """
+    meta = sh.fetch_sheet_metadata()
+    props = {s["properties"]["title"]: s["properties"] for s in meta.get("sheets", [])}
+
+    # 1) structural changes: new sheets, too-narrow managed sheets
+    requests = []
+    for title, (headers, rows, _) in SCHEMA.items():
+        if title not in props:
+            requests.append({"addSheet": {"properties": {
+                "title": title,
+                "gridProperties": {"rowCount": rows, "columnCount": len(headers)},
+            }}})
+            continue
+        grid = props[title].setdefault("gridProperties", {})
+        missing = len(headers) - int(grid.get("columnCount", 0))
+        if missing > 0:
+            requests.append({"appendDimension": {
+                "sheetId": props[title]["sheetId"], "dimension": "COLUMNS", "length": missing,
+            }})
+            grid["columnCount"] = len(headers)
+    if requests:
+        res = sh.batch_update({"requests": requests})
+        for reply in res.get("replies", []):
+            if "addSheet" in reply:
+                p = reply["addSheet"]["properties"]
+                props[p["title"]] = p
+
+    # 2) current header rows of every sheet, one call
+    titles = list(props)
+    got = sh.values_batch_get([_a1(t, "1:1") for t in titles]).get("valueRanges", [])
+    headers_now = {}
+    for title, vr in zip(titles, got):
+        values = vr.get("values") or [[]]
+        headers_now[title] = [_clean_col(c) for c in values[0]]
+
+    # 3) write missing / drifted headers, one call
+    data = []
+    for title, (headers, _, fix) in SCHEMA.items():
+        current = headers_now.get(title) or []
+        if not any(current) or (fix and current != headers):
+            data.append({"range": _header_range(title, len(headers)), "values": [headers]})
+            headers_now[title] = list(headers)
+    if data:
+        sh.values_batch_update({"valueInputOption": "RAW", "data": data})
+
+    return {t: _layout_entry(props[t], headers_now.get(t, [])) for t in titles}
+
+@st.cache_resource
+def _schema_layout() -> dict:
+    """Sheet IDs and header->column index, bootstrapped once for the process."""
+    return _bootstrap_schema(_open_spreadsheet())
+
+def _layout_entry(props: dict, headers: list) -> dict:
+    return {"props": props, "headers": headers, "col": {c: i for i, c in enumerate(headers) if c}}
+
+def _layout_for(sh, title) -> dict:
+    """Layout of `title`; sheets created after bootstrap (e.g. period snapshots) are looked up once."""
+    layout = _schema_layout()
+    lay = layout.get(title)
+    if lay is None:
+        ws = sh.worksheet(title)  # raises WorksheetNotFound
+        props = {
+            "sheetId": ws.id, "title": ws.title, "index": ws.index,
+            "gridProperties": {"rowCount": ws.row_count, "columnCount": ws.col_count},
+        }
+        lay = layout[title] = _layout_entry(props, [_clean_col(c) for c in ws.row_values(1)])
+    return lay
+
+def _add_sheet(sh, title, headers, rows=1000) -> dict:
+    """Create a sheet outside SCHEMA and register it in the cached layout."""
+    res = sh.batch_update({"requests": [{"addSheet": {"properties": {
+        "title": title,
+        "gridProperties": {"rowCount": rows, "columnCount": len(headers)},
+    }}}]})
+    props = res["replies"][0]["addSheet"]["properties"]
+    lay = _schema_layout()[title] = _layout_entry(props, list(headers))
+    return lay
+
 def _ws(sh, title):
-    return sh.worksheet(title)
+    """Worksheet handle from the cached layout (no metadata round-trip)."""
+    import gspread
+
+    lay = _layout_for(sh, title)
+    return gspread.Worksheet(sh, lay["props"], sh.id, sh.client)
 
 def _read_df(ws) -> pd.DataFrame:
     """Read worksheet to DataFrame, drop fully empty rows, and clean column names."""
+    from gspread_dataframe import get_as_dataframe
+
     df = get_as_dataframe(ws, evaluate_formulas=True, header=0).dropna(how="all")
-    def _clean_col(c):
-        # remove NBSP and extra spaces
-        return str(c).replace("\u00a0", " ").strip()
     df.columns = [_clean_col(c) for c in df.columns]
     return df
 
 def _write_df(ws, df: pd.DataFrame):
-    ws.clear()
+    """Overwrite the sheet with `df`, then clear whatever was below it.
+
+    Writing before clearing means a refused write leaves the old rows in place.
+    """
+    from gspread_dataframe import set_with_dataframe
+
     set_with_dataframe(ws, df, include_index=False, include_column_header=True)
+    width = max(ws.col_count, len(df.columns))
+    ws.batch_clear([f"A{len(df) + 2}:{_col_letter(width)}"])
 
 def _ensure_cols(df: pd.DataFrame, cols):
     """Ensure required columns exist; add if missing."""
@@ -94,63 +256,439 @@ def _new_id(df: pd.DataFrame) -> int:
     ids = pd.to_numeric(df["id"], errors="coerce")
     return int(pd.Series(ids).fillna(0).max()) + 1
 
-def _ensure_requests_sheet(sh):
+# ---------------- Concurrent calls ----------------
+# gspread is blocking, so independent calls inside one operation (shard reads, the
+# Requests / Approved / Rejected writes of a replay batch, the two rollup sheets)
+# run side by side instead of one after another; callers still get plain return
+# values. At most HR_SHEETS_CONCURRENCY (or [sheets] concurrency, default 8) extra
+# calls are in flight per process, and the HTTP session keeps as many connections.
+CONCURRENCY_ENV = "HR_SHEETS_CONCURRENCY"
+DEFAULT_CONCURRENCY = 8
+
+def _concurrency() -> int:
+    n = os.environ.get(CONCURRENCY_ENV)
+    if n is None:
+        try:
+            n = st.secrets["sheets"].get("concurrency", DEFAULT_CONCURRENCY)
+        except Exception:
+            n = DEFAULT_CONCURRENCY
     try:
-        return _ws(sh, SHEET_REQUESTS)
-    except Exception:
-        ws = sh.add_worksheet(title=SHEET_REQUESTS, rows=1000, cols=11)
-        headers = ["id","name","member_id","date","hours","notes","status",
-                   "hr_name","hr_notes","created_at","approved_at"]
-        ws.update('A1:K1', [headers])
-        return ws
-
-def _ensure_approved_sheet(sh):
-    """Ensure Approved sheet exists with exact headers."""
-    try:
-        return _ws(sh, SHEET_APPROVED)
-    except Exception:
-        ws = sh.add_worksheet(title=SHEET_APPROVED, rows=1000, cols=len(APPROVED_HEADERS))
-        ws.update('A1:I1', [APPROVED_HEADERS])
-        return ws
+        return max(1, int(n))
+    except (TypeError, ValueError):
+        return DEFAULT_CONCURRENCY
 
-def _ensure_rejected_sheet(sh):
-    """Ensure Rejected sheet exists with exact headers."""
-    try:
-        return _ws(sh, SHEET_REJECTED)
-    except Exception:
-        ws = sh.add_worksheet(title=SHEET_REJECTED, rows=1000, cols=len(REJECTED_HEADERS))
-        ws.update('A1:I1', [REJECTED_HEADERS])
-        return ws
+@st.cache_resource
+def _call_slots() -> threading.BoundedSemaphore:
+    return threading.BoundedSemaphore(_concurrency())
 
-# --- generic create sheet with headers ---
-def _ensure_sheet_with_headers(sh, title, headers):
+def _concurrently(*calls) -> list:
+    """Run zero-argument callables side by side; their results, in call order.
+
+    The first call runs on the caller's thread (so nesting never waits on a slot),
+    the others on helper threads that keep the caller's script context and strict
+    mode. All calls finish before the first error, in call order, is re-raised.
+    """
+    if len(calls) <= 1 or _concurrency() == 1:
+        return [c() for c in calls]
+    from streamlit.runtime.scriptrunner import add_script_run_ctx
+
+    slots, strict = _call_slots(), getattr(_strict, "on", False)
+    results = [None] * len(calls)
+    errors = [None] * len(calls)
+
+    def run(i):
+        with slots:
+            _strict.on = strict
+            try:
+                results[i] = calls[i]()
+            except BaseException as e:
+                errors[i] = e
+
+    threads = [add_script_run_ctx(threading.Thread(target=run, args=(i,), name=f"hr-sheets-{i}", daemon=True))
+               for i in range(1, len(calls))]
+    for t in threads:
+        t.start()
     try:
-        ws = _ws(sh, title)
+        results[0] = calls[0]()
+    except BaseException as e:
+        errors[0] = e
+    for t in threads:
+        t.join()
+    for e in errors:
+        if e is not None:
+            raise e
+    return results
+
+# ---------------- Department shards (Requests) ----------------
+# Off by default: every request lives in the single Requests sheet. With
+# [sheets] shard_by_department = "worksheet" (or env HR_REQUEST_SHARDS) each
+# department's requests go to their own "Requests - <dept>" worksheet; with
+# "spreadsheet" a department listed under [sheets.shard_spreadsheets] gets that
+# worksheet in its own spreadsheet (own quota), unlisted ones stay in the main one.
+# - A shard worksheet has the same title wherever it lives, so layouts stay keyed
+#   by title; shards are created (with headers) on the first write to them. Reads
+#   only list the shards that exist (worksheet titles, re-listed every few minutes
+#   so shards created by another process show up).
+# - The main Requests sheet stays a shard too (rows written before sharding).
+# - Ids stay global; reads fan out over all shards in parallel and are merged.
+# Approved / Rejected / rollups stay central (append-only, tail-synced).
+SHARD_ENV = "HR_REQUEST_SHARDS"
+SHARD_TITLE = SHEET_REQUESTS + " - {dept}"
+SHARD_LIST_TTL_SECONDS = 300
+_BAD_TITLE_CHARS = re.compile(r"[\[\]*?/\\:]")
+
+def _shard_mode() -> str:
+    mode = os.environ.get(SHARD_ENV)
+    if mode is None:
+        try:
+            mode = st.secrets["sheets"].get("shard_by_department", "")
+        except Exception:
+            mode = ""
+    mode = str(mode).strip().lower()
+    return mode if mode in ("worksheet", "spreadsheet") else ""
+
+def _shard_spreadsheet_names() -> dict:
+    """Department -> spreadsheet name ("spreadsheet" mode)."""
+    try:
+        return {_clean_str(k): str(v) for k, v in st.secrets["sheets"]["shard_spreadsheets"].items()}
     except Exception:
-        ws = sh.add_worksheet(title=title, rows=2000, cols=len(headers))
-        ws.update(f"A1:{chr(64+len(headers))}1", [headers])
-        return ws
-    first = ws.row_values(1)
-    if first != headers:
-        ws.update(f"A1:{chr(64+len(headers))}1", [headers])
-    return ws
+        return {}
+
+@st.cache_resource
+def _open_named_spreadsheet(name: str):
+    return _client().open(name)
+
+@st.cache_resource
+def _shard_registry() -> dict:
+    return {"lock": threading.Lock(), "ready": {}}   # title -> spreadsheet
+
+def _request_shard(dept) -> tuple:
+    """(spreadsheet, worksheet title) holding `dept`'s requests."""
+    from gspread.exceptions import WorksheetNotFound
+
+    mode = _shard_mode()
+    dept = _clean_str(dept)
+    if not mode or not dept:
+        return _open_spreadsheet(), SHEET_REQUESTS
+    title = SHARD_TITLE.format(dept=_BAD_TITLE_CHARS.sub("-", dept))[:100]
+    reg = _shard_registry()
+    with reg["lock"]:
+        sh = reg["ready"].get(title)
+        if sh is None:
+            name = _shard_spreadsheet_names().get(dept) if mode == "spreadsheet" else None
+            sh = _open_named_spreadsheet(name) if name else _open_spreadsheet()
+            try:
+                _layout_for(sh, title)
+            except WorksheetNotFound:
+                _add_sheet(sh, title, REQUEST_HEADERS)
+                sh.values_update(_header_range(title, len(REQUEST_HEADERS)),
+                                 params={"valueInputOption": "RAW"}, body={"values": [REQUEST_HEADERS]})
+            reg["ready"][title] = sh
+    return sh, title
+
+@st.cache_resource(ttl=SHARD_LIST_TTL_SECONDS)
+def _shard_titles(name: str | None) -> frozenset:
+    """Requests shard titles in the main (None) or a named spreadsheet (one metadata call)."""
+    sh = _open_named_spreadsheet(name) if name else _open_spreadsheet()
+    prefix = SHARD_TITLE.format(dept="")
+    return frozenset(ws.title for ws in sh.worksheets() if ws.title.startswith(prefix))
+
+def _request_shards() -> list:
+    """Every existing Requests shard: the main sheet plus the department shards created so far."""
+    main = _open_spreadsheet()
+    shards = {}
+    mode = _shard_mode()
+    if mode:
+        shards.update((t, main) for t in _shard_titles(None))
+        if mode == "spreadsheet":
+            for name in sorted(set(_shard_spreadsheet_names().values())):
+                sh = _open_named_spreadsheet(name)
+                shards.update((t, sh) for t in _shard_titles(name))
+        shards.update(_shard_registry()["ready"])   # created here since the last listing
+    return [(main, SHEET_REQUESTS)] + [(shards[t], t) for t in sorted(shards)]
+
+def _op_dept(row: dict) -> str:
+    """Department of a submit payload (older journal entries: from the notes)."""
+    return _clean_str(row.get("dept")) or _clean_str(row.get("notes")).split(NOTES_SEP)[0]
+
+def _read_shards(shards: list, spec: dict) -> list:
+    """_read_cols of every shard (in shard order): one batchGet per spreadsheet,
+    spreadsheets in parallel."""
+    groups = {}
+    for pos, (sh, title) in enumerate(shards):
+        groups.setdefault(sh.id, (sh, []))[1].append((pos, title))
+
+    def read(group):
+        sh, items = group
+        return list(zip([p for p, _ in items], _read_cols_multi(sh, [t for _, t in items], spec)))
+
+    results = _concurrently(*(functools.partial(read, g) for g in groups.values()))
+    out = [None] * len(shards)
+    for pairs in results:
+        for pos, df in pairs:
+            out[pos] = df
+    return out
+
+def _read_requests(spec: dict) -> pd.DataFrame:
+    """Typed Requests columns merged across shards."""
+    frames = _read_shards(_request_shards(), spec)
+    return pd.concat([f for f in frames if len(f)] or frames[:1], ignore_index=True)
+
+def _locate_request_ids() -> dict:
+    """id -> (spreadsheet, title) of the shard holding it."""
+    shards = _request_shards()
+    ids = _read_shards(shards, {"id": "int"})
+    return {int(i): shard for shard, df in zip(shards, ids) for i in df["id"].dropna()}
+
+# ---------------- Typed, column-projected reads ----------------
+# Declared dtypes for _read_cols:
+#   "int" -> Int32, "float" -> float64, "datetime" -> UTC datetime64, "date" -> naive datetime64,
+#   "category" -> categorical, "str" -> stripped Arrow string ("" when empty),
+#   "member_id" -> normalize_member_id as Arrow string
+# Only declared columns are read, so cached frames carry nothing else.
+MEMBER_SPEC = {
+    COL_AR_NAME: "str",
+    COL_EN_NAME: "str",
+    COL_NAT_ID:  "member_id",
+    COL_STUD_ID: "member_id",
+    COL_DEPT:    "category",
+}
+TASK_SPEC = {
+    COL_TASK_NAME:    "str",
+    COL_TASK_MINUTES: "float",
+    COL_TASK_DEPT:    "category",
+}
+REQUEST_SPEC = {
+    "id": "int", "name": "str", "member_id": "member_id", "date": "str",
+    "hours": "float", "notes": "str", "status": "category",
+    "hr_name": "category", "hr_notes": "str",
+    "created_at": "datetime", "approved_at": "datetime",
+}
+APPROVED_SPEC = {
+    "id": "int", "name": "str", "member_id": "member_id", "date": "date",
+    "hours": "float", "notes": "str", "hr_name": "category", "hr_notes": "str",
+    "approved_at": "datetime",
+}
+REJECTED_SPEC = {
+    "id": "int", "name": "str", "member_id": "member_id", "date": "date",
+    "hours": "float", "notes": "str", "hr_name": "category", "hr_notes": "str",
+    "rejected_at": "datetime",
+}
+META_SPEC = {"key": "str", "value": "str"}
+PERIODS_SPEC = {
+    "period_id": "str", "start": "datetime", "end": "datetime", "sheet": "str",
+    "members": "int", "total_hours": "float", "count": "int", "closed_at": "datetime",
+}
+ROLLUP_SPEC = {
+    "member_id": "member_id", "national_id": "member_id", "name": "str", "Department": "str",
+    "total_hours": "float", "count": "int", "last_approved_at": "str",
+}
+
+_READ_PARAMS = {
+    "valueRenderOption": "UNFORMATTED_VALUE",
+    "dateTimeRenderOption": "FORMATTED_STRING",
+    "majorDimension": "COLUMNS",
+}
+
+def _is_blank(v) -> bool:
+    return v is None or (isinstance(v, str) and not v.strip()) or (isinstance(v, float) and v != v)
+
+def _clean_str(v) -> str:
+    return "" if _is_blank(v) else str(v).replace("\u00a0", " ").strip()
+
+_STR = pd.StringDtype("pyarrow")
+
+def _typed_series(values: list, dtype: str) -> pd.Series:
+    raw = pd.Series([None if _is_blank(v) else v for v in values], dtype=object)
+    if dtype == "int":
+        return pd.to_numeric(raw, errors="coerce").round().astype("Int32")
+    if dtype == "float":
+        return pd.to_numeric(raw, errors="coerce").astype(float)
+    if dtype == "datetime":
+        return pd.to_datetime(raw, errors="coerce", utc=True)
+    if dtype == "date":
+        return pd.to_datetime(raw, errors="coerce")
+    if dtype == "category":
+        return raw.map(lambda v: None if v is None else _clean_str(v) or None).astype("category")
+    if dtype == "member_id":
+        return raw.map(normalize_member_id).astype(_STR)
+    return raw.map(_clean_str).astype(_STR)
+
+def _frame_from_columns(columns: dict, spec: dict) -> pd.DataFrame:
+    """Build a typed frame from {header: [values...]} (missing headers -> empty column)."""
+    n = max((len(v) for v in columns.values()), default=0)
+    padded = {c: list(columns.get(c, [])) + [None] * (n - len(columns.get(c, []))) for c in spec}
+    keep = [i for i in range(n) if any(not _is_blank(padded[c][i]) for c in spec)]
+    df = pd.DataFrame({c: _typed_series([padded[c][i] for i in keep], dt) for c, dt in spec.items()})
+    return df.reset_index(drop=True)
 
-def _ensure_leaderboard_sheet(sh):
-    return _ensure_sheet_with_headers(sh, SHEET_LEADERBOARD, LEADER_HEADERS)
+def _read_cols(sh, title, spec: dict) -> pd.DataFrame:
+    """Fetch only the declared columns of `title` (one batchGet) as a typed frame."""
+    return _read_cols_multi(sh, [title], spec)[0]
 
-def _ensure_period_sheet(sh):
-    return _ensure_sheet_with_headers(sh, SHEET_PERIOD, PERIOD_HEADERS)
+def _read_cols_multi(sh, titles: list, spec: dict) -> list:
+    """_read_cols for several sheets of one spreadsheet, still in a single batchGet.
 
-def _ensure_meta_sheet(sh):
-    try:
-        return _ws(sh, SHEET_META)
-    except Exception:
-        ws = sh.add_worksheet(title=SHEET_META, rows=10, cols=2)
-        ws.update("A1:B1", [["key","value"]])
-        return ws
+    Each sheet's header row comes back in the same call. Member_Data / Tasks_Data
+    are edited by hand, so a header that no longer matches the cached layout
+    (column inserted, moved, renamed) refreshes the layout and re-reads that sheet.
+    """
+    layouts = [_layout_for(sh, t) for t in titles]
+    frames, drifted = _read_cols_batch(sh, titles, layouts, spec)
+    if drifted:
+        layout = _schema_layout()
+        for i, headers in drifted.items():
+            layouts[i] = layout[titles[i]] = _layout_entry(layouts[i]["props"], headers)
+        again, _ = _read_cols_batch(sh, [titles[i] for i in drifted], [layouts[i] for i in drifted], spec)
+        for i, df in zip(drifted, again):
+            frames[i] = df
+    return frames
+
+def _read_cols_batch(sh, titles: list, layouts: list, spec: dict) -> tuple:
+    """(frames, {position: current headers} of sheets whose header row drifted)."""
+    present, ranges = [], []
+    for title, lay in zip(titles, layouts):
+        cols = [c for c in spec if c in lay["col"]]
+        present.append(cols)
+        ranges.append(_a1(title, "1:1"))
+        for c in cols:
+            letter = _col_letter(lay["col"][c] + 1)
+            ranges.append(_a1(title, f"{letter}2:{letter}"))
+    # gspread writes "ranges" into the params dict it is given: never share it
+    got = sh.values_batch_get(ranges, params=dict(_READ_PARAMS)).get("valueRanges", [])
+    frames, drifted, k = [], {}, 0
+    for pos, (lay, cols) in enumerate(zip(layouts, present)):
+        # majorDimension=COLUMNS: the header row comes back as one 1-cell column per header
+        header = got[k].get("values") if k < len(got) else None
+        headers = [_clean_col(v[0]) if v else "" for v in (header or [])]
+        k += 1
+        if _trim(headers) != _trim(lay["headers"]):
+            drifted[pos] = headers
+        columns = {}
+        for c in cols:
+            values = got[k].get("values") if k < len(got) else None
+            columns[c] = (values or [[]])[0]
+            k += 1
+        frames.append(_frame_from_columns(columns, spec))
+    return frames, drifted
+
+def _trim(headers: list) -> list:
+    headers = list(headers)
+    while headers and not headers[-1]:
+        headers.pop()
+    return headers
+
+# ---------------- Incremental tail sync (append-only sheets) ----------------
+# Approved / Rejected only grow at the bottom. We keep the synced frame per sheet,
+# the raw row count and a checksum of the last TAIL_WINDOW rows; a refresh re-reads
+# just that window plus anything below it. A changed checksum (in-place edit, rows
+# removed) or an old full sync falls back to a full reload.
+TAIL_WINDOW = 20
+FULL_RESYNC_SECONDS = 15 * 60
+
+_ROW_PARAMS = {
+    "valueRenderOption": "UNFORMATTED_VALUE",
+    "dateTimeRenderOption": "FORMATTED_STRING",
+}
+
+@st.cache_resource
+def _tail_state() -> dict:
+    return {"lock": threading.Lock(), "sheets": {}, "versions": {}}   # versions: title -> changes seen
+
+def _reset_tail(title):
+    """Forget the synced state of `title` (next read does a full reload)."""
+    state = _tail_state()
+    with state["lock"]:
+        state["sheets"].pop(title, None)
+
+def _rows_checksum(rows: list) -> str:
+    return hashlib.sha1(json.dumps(rows, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+def _rows_to_frame(rows: list, title, spec: dict) -> pd.DataFrame:
+    col = _schema_layout()[title]["col"]
+    columns = {c: [r[col[c]] if col[c] < len(r) else None for r in rows] for c in spec if c in col}
+    return _frame_from_columns(columns, spec)
+
+def _sync_tail(sh, title, spec: dict) -> pd.DataFrame:
+    """Return the typed frame of an append-only sheet, fetching only new rows when possible."""
+    width = len(_schema_layout()[title]["headers"])
+    last_col = _col_letter(width)
+    state = _tail_state()
+    with state["lock"]:
+        cur = state["sheets"].get(title)
+        fresh = cur is not None and time.monotonic() - cur["full_at"] < FULL_RESYNC_SECONDS
+        if fresh:
+            n, tail = cur["rows"], cur["tail"]
+            first = 2 + n - len(tail)  # sheet row of the first remembered tail row
+            got = sh.values_get(_a1(title, f"A{first}:{last_col}"), params=_ROW_PARAMS)
+            rows = got.get("values", [])
+            if _rows_checksum(rows[:len(tail)]) == cur["tail_sum"]:
+                new_rows = rows[len(tail):]
+                if new_rows:
+                    cur["df"] = pd.concat([cur["df"], _rows_to_frame(new_rows, title, spec)],
+                                          ignore_index=True)
+                    cur["rows"] = n + len(new_rows)
+                    cur["tail"] = (tail + new_rows)[-TAIL_WINDOW:]
+                    cur["tail_sum"] = _rows_checksum(cur["tail"])
+                    state["versions"][title] = state["versions"].get(title, 0) + 1
+                return cur["df"].copy(deep=False)
+
+        # full reload
+        got = sh.values_get(_a1(title, f"A2:{last_col}"), params=_ROW_PARAMS)
+        rows = got.get("values", [])
+        tail = rows[-TAIL_WINDOW:]
+        cur = {
+            "df": _rows_to_frame(rows, title, spec),
+            "rows": len(rows),
+            "tail": tail,
+            "tail_sum": _rows_checksum(tail),
+            "full_at": time.monotonic(),
+        }
+        state["sheets"][title] = cur
+        state["versions"][title] = state["versions"].get(title, 0) + 1
+        return cur["df"].copy(deep=False)
+
+def _append_rows(sh, title, rows: list):
+    """Append dict rows (by the sheet's header order) in one values_append."""
+    headers = _layout_for(sh, title)["headers"]
+    sh.values_append(
+        _a1(title, "A1"),
+        params={"valueInputOption": "USER_ENTERED", "insertDataOption": "INSERT_ROWS"},
+        body={"values": [[r.get(h, "") for h in headers] for r in rows]},
+    )
+
+def _upsert_rows(sh, title, rows: list):
+    """Upsert by id into an append-only sheet.
+
+    New ids are appended in one values_append (keeps the tail sync incremental);
+    ids already present fall back to one read-modify-write and reset the sync.
+    """
+    rows = list({int(r["id"]): r for r in rows}.values())  # last write per id wins
+    if not rows:
+        return
+    ids = set(int(i) for i in _read_cols(sh, title, {"id": "int"})["id"].dropna())
+    new = [r for r in rows if int(r["id"]) not in ids]
+    existing = [r for r in rows if int(r["id"]) in ids]
+
+    if new:
+        _append_rows(sh, title, new)
+    if existing:
+        ws = _ws(sh, title)
+        df = _read_df(ws)
+        df = _ensure_cols(df, list(existing[0]))
+        df["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64")
+        for k in existing[0]:
+            if k != "id":
+                df[k] = df[k].astype(object)
+        for row in existing:
+            exist_mask = df["id"] == int(row["id"])
+            for k, v in row.items():
+                df.loc[exist_mask, k] = v
+        _write_df(ws, df)
+        _reset_tail(title)
 
 # ---------------- Normalizers ----------------
-def _normalize_member_id(v):
+def normalize_member_id(v):
     """Return member_id as clean string (no .0, no spaces)."""
     s = str(v).replace("\u00a0", " ").strip()
     if not s or s.lower() in {"nan", "none"}:
@@ -163,124 +701,412 @@ def _normalize_member_id(v):
     except Exception:
         return s
 
+# ---------------- Degraded mode ----------------
+# When Sheets fails (quota, outage, timeouts) readers serve their last good result
+# and mutations stay queued in the journal. A background drainer replays the queue
+# with exponential backoff once the backend answers again.
+BACKOFF_BASE_SECONDS = 5
+BACKOFF_MAX_SECONDS = 300
+DRAIN_INTERVAL_SECONDS = 5
+
+@st.cache_resource
+def _backend_health() -> dict:
+    return {"lock": threading.Lock(), "failures": 0, "down_until": 0.0,
+            "last_error": None, "snapshots": {}}
+
+# set while replaying: no stale fallbacks may feed a write
+_strict = threading.local()
+
+def _backend_available() -> bool:
+    return time.monotonic() >= _backend_health()["down_until"]
+
+def _note_failure(err):
+    h = _backend_health()
+    with h["lock"]:
+        h["failures"] += 1
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (h["failures"] - 1))
+        h["down_until"] = time.monotonic() + delay
+        h["last_error"] = f"{type(err).__name__}: {err}"[:300]
+
+def _note_success():
+    h = _backend_health()
+    if h["failures"]:
+        with h["lock"]:
+            h["failures"], h["down_until"], h["last_error"] = 0, 0.0, None
+
+def _last_good(fn):
+    """Serve the last good result of a reader (per call args) while Sheets is failing.
+
+    Goes under @st.cache_resource (or @st.cache_data) so it only runs on real
+    fetches; while the backoff window is open the fetch is skipped entirely.
+    Results are treated as read-only, so the snapshot is the result itself.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+        snaps = _backend_health()["snapshots"]
+        strict = getattr(_strict, "on", False)
+        if not strict and not _backend_available() and key in snaps:
+            return snaps[key]
+        try:
+            res = fn(*args, **kwargs)
+        except Exception as e:
+            _note_failure(e)
+            if strict or key not in snaps:
+                raise
+            return snaps[key]
+        _note_success()
+        snaps[key] = res
+        return res
+    return wrapper
+
+def _sheet_request_ids() -> pd.Series | None:
+    """Requests ids straight from Sheets, or None while the backend is unavailable."""
+    if _backend_available():
+        try:
+            ids = _read_requests({"id": "int"})["id"]
+            _note_success()
+            return ids
+        except Exception as e:
+            _note_failure(e)
+    return None
+
+def _snapshot_request_ids() -> pd.Series:
+    """Request ids known from the last good list_requests results."""
+    frames = [df["id"] for (name, _, _), df in list(_backend_health()["snapshots"].items())
+              if name == "_fetch_requests"]
+    return pd.concat(frames, ignore_index=True) if frames else pd.Series([], dtype="Int32")
+
+def _submit_or_queue(limit: int | None = None):
+    """Replay the journal now if the backend looks healthy; otherwise leave it to the drainer."""
+    _drainer()
+    if not _backend_available():
+        return
+    try:
+        replay_journal(limit or JOURNAL_BATCH)
+    except Exception as e:
+        _note_failure(e)
+
+def _drain_loop():
+    while True:
+        time.sleep(DRAIN_INTERVAL_SECONDS)
+        try:
+            if _backend_available() and journal.pending_count():
+                replay_journal()
+        except Exception as e:
+            _note_failure(e)
+
+@st.cache_resource
+def _drainer() -> threading.Thread:
+    t = threading.Thread(target=_drain_loop, name="hr-journal-drainer", daemon=True)
+    t.start()
+    return t
+
+def backend_status() -> dict:
+    """Health of the Sheets backend and size of the local queue (for UI banners)."""
+    _drainer()
+    h = _backend_health()
+    return {
+        "healthy": _backend_available() and not h["failures"],
+        "queued": journal.pending_count(),
+        "last_error": h["last_error"],
+        "retry_in": max(0.0, h["down_until"] - time.monotonic()),
+    }
+
+def is_queued(kind: str, target_id: int) -> bool:
+    """True while a "submit" / "approve" / "reject" for `target_id` waits in the local queue."""
+    return journal.is_pending(kind, target_id)
+
 # ---------------- Cached readers ----------------
-@st.cache_data(ttl=60)
+# The big readers are st.cache_resource frames shared by every session. Callers get
+# a shallow copy (_shared_frame): setting or adding columns only touches the copy,
+# but in-place writes (.loc / .iloc / inplace=True) would reach the shared data, so
+# take .copy() first when a caller has to write into the rows.
+def _shared_frame(reader):
+    """Go above @st.cache_resource: return a shallow copy of the cached frame (keeps .clear())."""
+    @functools.wraps(reader)
+    def wrapper(*args, **kwargs):
+        return reader(*args, **kwargs).copy(deep=False)
+    wrapper.clear = reader.clear
+    return wrapper
+
+@_shared_frame
+@st.cache_resource(ttl=60)
+@_last_good
 def get_members_df() -> pd.DataFrame:
     """Read Member_Data & return cleaned dataframe with normalized member_id."""
     sh = _open_spreadsheet()
-    df = _read_df(_ws(sh, SHEET_MEMBERS))
-    req = [COL_AR_NAME, COL_STUD_ID, COL_DEPT]
-    df = _ensure_cols(df, req)
-
-    df[COL_DEPT]    = df[COL_DEPT].astype(str).str.replace("\u00a0"," ").str.strip()
-    df[COL_AR_NAME] = df[COL_AR_NAME].astype(str).str.replace("\u00a0"," ").str.strip()
-    df[COL_STUD_ID] = df[COL_STUD_ID].apply(_normalize_member_id)
-
-    df = df.dropna(subset=[COL_AR_NAME, COL_DEPT], how="any")
-    return df
+    df = _read_cols(sh, SHEET_MEMBERS, MEMBER_SPEC)
+    df = df[(df[COL_AR_NAME] != "") & df[COL_DEPT].notna()]
+    return df.reset_index(drop=True)
 
-@st.cache_data(ttl=60)
+@_shared_frame
+@st.cache_resource(ttl=60)
+@_last_good
 def get_tasks_df() -> pd.DataFrame:
     sh = _open_spreadsheet()
-    df = _read_df(_ws(sh, SHEET_TASKS))
-    req = [COL_TASK_NAME, COL_TASK_MINUTES, COL_TASK_DEPT]
-    df = _ensure_cols(df, req)
-    df[COL_TASK_DEPT] = df[COL_TASK_DEPT].astype(str).str.strip()
-    df[COL_TASK_NAME] = df[COL_TASK_NAME].astype(str).str.strip()
-    df[COL_TASK_MINUTES] = pd.to_numeric(df[COL_TASK_MINUTES], errors="coerce")
-    df = df.dropna(subset=[COL_TASK_DEPT, COL_TASK_NAME, COL_TASK_MINUTES], how="any")
-    return df
+    df = _read_cols(sh, SHEET_TASKS, TASK_SPEC)
+    df = df[(df[COL_TASK_NAME] != "") & df[COL_TASK_DEPT].notna()]
+    df = df.dropna(subset=[COL_TASK_MINUTES])
+    return df.reset_index(drop=True)
 
 # ---------------- Dropdown helpers ----------------
+# Readers hand out shallow copies of the shared frames: never write into their rows.
 def list_departments():
     members = get_members_df()
     return sorted(members[COL_DEPT].dropna().unique().tolist())
 
 def list_members_by_dept(dept: str) -> pd.DataFrame:
     members = get_members_df()
-    return members[members[COL_DEPT] == str(dept).strip()].copy()
+    return members[members[COL_DEPT] == str(dept).strip()]
 
 def list_tasks_by_dept(dept: str) -> pd.DataFrame:
     tasks = get_tasks_df()
-    return tasks[tasks[COL_TASK_DEPT] == str(dept).strip()].copy()
+    return tasks[tasks[COL_TASK_DEPT] == str(dept).strip()]
+
+@st.cache_resource(ttl=60)
+def get_member_index() -> MemberIndex:
+    """Shared search index over Member_Data (name / student ID / national ID prefixes)."""
+    return MemberIndex(get_members_df())
+
+# ---------------- Read-your-writes overlay ----------------
+# Each session keeps the submits / decisions it made itself in st.session_state.
+# list_requests, summary_by_member and member_hours merge them over the shared
+# snapshot, so the page after an action renders from memory instead of refetching.
+# An entry is dropped once the snapshot shows it, or after OVERLAY_MAX_AGE_SECONDS
+# (e.g. an op the journal could not apply).
+OVERLAY_KEY = "_hr_write_overlay"
+OVERLAY_MAX_AGE_SECONDS = 10 * 60
+_DECISION_COLS = ["status", "hr_name", "hr_notes", "approved_at"]
+
+def _session_overlay() -> dict | None:
+    """This session's overlay; None outside a page run (background threads, CLI)."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    if get_script_run_ctx() is None:
+        return None
+    return st.session_state.setdefault(OVERLAY_KEY, {"rows": {}, "decisions": {}})
+
+def _overlay_submit(row: dict):
+    ov = _session_overlay()
+    if ov is not None:
+        ov["rows"][int(row["id"])] = {**row, "_at": time.monotonic()}
+
+def _overlay_decision(status: str, payload: dict):
+    ov = _session_overlay()
+    if ov is not None:
+        ov["decisions"][int(payload["id"])] = {
+            "status": status,
+            "hr_name": payload["hr_name"],
+            "hr_notes": payload["hr_notes"],
+            "approved_at": payload.get("approved_at"),
+            "only_pending": bool(payload.get("only_pending")),
+            "_at": time.monotonic(),
+        }
+
+def _prune_overlay(ov: dict, df: pd.DataFrame):
+    """Drop entries the snapshot `df` already shows (or that are too old)."""
+    oldest = time.monotonic() - OVERLAY_MAX_AGE_SECONDS
+    ids = set(ov["rows"]) | set(ov["decisions"])
+    seen = df.loc[df["id"].isin(list(ids)), ["id", "status"]]
+    status = {int(i): _clean_str(s) for i, s in zip(seen["id"], seen["status"].astype(object))}
+    for rid, row in list(ov["rows"].items()):
+        if rid in status or row["_at"] < oldest:
+            del ov["rows"][rid]
+    for rid, d in list(ov["decisions"].items()):
+        now = status.get(rid)
+        if now == d["status"] or (d["only_pending"] and now not in (None, "pending")) or d["_at"] < oldest:
+            del ov["decisions"][rid]
+
+def _with_overlay(df: pd.DataFrame, member_id: str | None = None,
+                  snapshot: pd.DataFrame | None = None) -> pd.DataFrame:
+    """`df` (REQUEST_SPEC rows) with this session's pending writes applied; new rows first.
+
+    For a per-member slice pass `member_id` (only that member's new rows are added)
+    and the full `snapshot` the overlay is pruned against.
+    """
+    ov = _session_overlay()
+    if not ov or not (ov["rows"] or ov["decisions"]):
+        return df
+    _prune_overlay(ov, df if snapshot is None else snapshot)
+    present = set(df.loc[df["id"].isin(list(ov["rows"])), "id"].astype(int))
+    rows = [r for rid, r in sorted(ov["rows"].items(), reverse=True)
+            if rid not in present and (member_id is None or r["member_id"] == member_id)]
+    decided = df["id"].isin(list(ov["decisions"]))
+    if not rows and not decided.any():
+        return df
+    cats = [c for c in _DECISION_COLS if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if rows:
+        new = _frame_from_columns({c: [r.get(c) for r in rows] for c in REQUEST_SPEC}, REQUEST_SPEC)
+        df = pd.concat([new.astype({c: object for c in cats}), df.astype({c: object for c in cats})],
+                       ignore_index=True)
+    else:
+        df = df.astype({c: object for c in cats})
+    for pos in df.index[df["id"].isin(list(ov["decisions"]))]:
+        d = ov["decisions"][int(df.at[pos, "id"])]
+        if d["only_pending"] and _clean_str(df.at[pos, "status"]) != "pending":
+            continue
+        approved_at = pd.to_datetime(d["approved_at"], utc=True) if d["status"] == "approved" else pd.NaT
+        df.loc[pos, _DECISION_COLS] = [d["status"], d["hr_name"], d["hr_notes"] or None, approved_at]
+    return df.astype({c: "category" for c in cats})
 
 # ---------------- Requests ops ----------------
-@st.cache_data(ttl=60)
+@_last_good
+def _fetch_requests() -> pd.DataFrame:
+    df = _read_requests(REQUEST_SPEC)
+    # newest first by created_at then id
+    df = df.sort_values(by=["created_at", "id"], ascending=[False, False], na_position="last")
+    return df.reset_index(drop=True)
+
+@st.cache_resource(ttl=60, max_entries=2)
+def _cached_requests(version: int) -> pd.DataFrame:
+    return _fetch_requests()
+
+@st.cache_resource
+def _requests_version() -> dict:
+    return {"v": 0, "lock": threading.Lock(), "dirty": False, "running": False}
+
+def _requests_snapshot() -> pd.DataFrame:
+    """Every request across shards, newest first (shared snapshot, no session overlay)."""
+    return _cached_requests(_requests_version()["v"]).copy(deep=False)
+
+def _refresh_requests_async():
+    """Fetch the next Requests snapshot off the request path, then switch readers to it.
+
+    The writing session keeps rendering from the current snapshot + its overlay;
+    other sessions see the write as soon as the fetch lands. Bursts coalesce.
+    """
+    state = _requests_version()
+    with state["lock"]:
+        state["dirty"] = True
+        if state["running"]:
+            return
+        state["running"] = True
+
+    def run():
+        while True:
+            with state["lock"]:
+                if not state["dirty"]:
+                    state["running"] = False
+                    return
+                state["dirty"] = False
+                v = state["v"] + 1
+            try:
+                _cached_requests(v)
+            except Exception as e:
+                _note_failure(e)
+                with state["lock"]:
+                    state["running"] = False
+                return
+            with state["lock"]:
+                state["v"] = max(state["v"], v)
+
+    threading.Thread(target=run, name="hr-requests-refresh", daemon=True).start()
+
 def list_requests(status: str = None) -> pd.DataFrame:
-    sh = _open_spreadsheet()
-    ws = _ensure_requests_sheet(sh)
-    df = _read_df(ws)
-    cols = ["id","name","member_id","date","hours","notes","status",
-            "hr_name","hr_notes","created_at","approved_at"]
-    df = _ensure_cols(df, cols)
-    df["hours"] = pd.to_numeric(df["hours"], errors="coerce")
-
-    # robust sorting by created_at then id
-    df["__created_at_dt__"] = pd.to_datetime(df["created_at"], errors="coerce", utc=True)
+    """Requests (optionally of one status), with this session's own recent writes on top."""
+    df = _with_overlay(_requests_snapshot())
     if status:
-        df = df[df["status"] == status]
-    df = df.sort_values(by=["__created_at_dt__", "id"], ascending=[False, False], na_position="last")
-    df = df.drop(columns=["__created_at_dt__"])
-    return df.reset_index(drop=True)
+        df = df[df["status"] == status].reset_index(drop=True)
+    return df
 
-def append_request_from_selection(dept: str, member_row: pd.Series, task_row: pd.Series, date_str: str) -> int:
-    sh = _open_spreadsheet()
-    ws = _ensure_requests_sheet(sh)
-    df = _read_df(ws)
-    cols = ["id","name","member_id","date","hours","notes","status",
-            "hr_name","hr_notes","created_at","approved_at"]
-    df = _ensure_cols(df, cols)
+def _next_request_id() -> int:
+    """Next id: above the sheet (or its last good snapshot) and anything still in the journal."""
+    ids = _sheet_request_ids()
+    if ids is None:
+        ids = _snapshot_request_ids()
+    sheet_next = _new_id(pd.DataFrame({"id": ids}))
+    return max(sheet_next, journal.max_target_id(journal.OP_SUBMIT) + 1, _id_reservations()["top"] + 1)
 
+def _request_exists(target_id: int) -> bool:
+    ids = _sheet_request_ids()
+    if ids is None:
+        ids = _snapshot_request_ids()
+    return bool((ids == int(target_id)).any()) or journal.is_pending(journal.OP_SUBMIT, target_id)
+
+def append_request_from_selection(dept: str, member_row: pd.Series, task_row: pd.Series, date_str: str) -> int:
+    """Journal a new pending request, replay it to Requests and return its id."""
     name_ar    = str(member_row.get(COL_AR_NAME) or "").strip()
-    student_id = _normalize_member_id(member_row.get(COL_STUD_ID))  # ensure normalized
+    student_id = normalize_member_id(member_row.get(COL_STUD_ID))  # ensure normalized
     task_name  = str(task_row.get(COL_TASK_NAME) or "").strip()
     minutes    = float(task_row.get(COL_TASK_MINUTES) or 0.0)
     hours      = round(minutes / 60.0, 2)
 
-    new_row = {
-        "id": _new_id(df),
-        "name": name_ar,
-        "member_id": student_id,
-        "date": parser.parse(date_str).date().isoformat() if date_str else None,
-        "hours": hours,
-        "notes": f"{dept} - {task_name} - {int(minutes)} دقيقة",
-        "status": "pending",
-        "hr_name": None,
-        "hr_notes": None,
-        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
-        "approved_at": None,
-    }
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    _write_df(ws, df)
-
-    st.cache_data.clear()
-    return new_row["id"]
+    with _ID_LOCK:
+        new_id = _next_request_id()
+        new_row = {
+            "id": new_id,
+            "name": name_ar,
+            "member_id": student_id,
+            "date": parser.parse(date_str).date().isoformat() if date_str else None,
+            "hours": hours,
+            "notes": format_notes(dept, task_name, minutes),
+            "status": "pending",
+            "hr_name": None,
+            "hr_notes": None,
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "approved_at": None,
+            "dept": dept,   # shard routing key, not a sheet column
+        }
+        journal.append(journal.OP_SUBMIT, new_row, target_id=new_id)
+
+    _overlay_submit(new_row)
+    _submit_or_queue()
+    return new_id
 
 # ---------------- Approved readers (for analytics/rollups) ----------------
-@st.cache_data(ttl=60)
+@_shared_frame
+@st.cache_resource(ttl=60)
+@_last_good
 def list_approved() -> pd.DataFrame:
     sh = _open_spreadsheet()
-    ws = _ensure_approved_sheet(sh)
-    df = _read_df(ws)
-    df = _ensure_cols(df, APPROVED_HEADERS)
-
-    # Normalize types
-    df["hours"] = pd.to_numeric(df["hours"], errors="coerce").fillna(0.0)
-    df["approved_at_dt"] = pd.to_datetime(df["approved_at"], errors="coerce", utc=True)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = _sync_tail(sh, SHEET_APPROVED, APPROVED_SPEC)
+    df["hours"] = df["hours"].fillna(0.0)
+    return df
 
-    # 👇 normalize keys for grouping/merge
-    df["member_id"] = df["member_id"].apply(_normalize_member_id)
-    df["name"] = df["name"].astype(str).str.strip()
+def approved_version() -> int:
+    """Bumped whenever the synced Approved frame changes (new rows or a full reload)."""
+    return _tail_state()["versions"].get(SHEET_APPROVED, 0)
 
+@_shared_frame
+@st.cache_resource(ttl=60)
+@_last_good
+def list_rejected() -> pd.DataFrame:
+    sh = _open_spreadsheet()
+    df = _sync_tail(sh, SHEET_REJECTED, REJECTED_SPEC)
+    df["hours"] = df["hours"].fillna(0.0)
     return df
 
+_SHARED_READERS = (get_members_df, get_tasks_df, _cached_requests, list_approved, list_rejected)
+
+@st.cache_resource
+def _trend_buckets() -> dict:
+    # lives across engine rebuilds: each rebuild only folds the newly appended rows
+    return {g: TrendBuckets(g) for g in TREND_FREQS}
+
+@st.cache_resource(max_entries=2)
+@_last_good
+def _analytics_engine(version: int) -> AnalyticsEngine:
+    approved = list_approved()
+    for buckets in _trend_buckets().values():
+        buckets.update(approved)
+    return AnalyticsEngine(approved, data_version=version)
+
+def get_analytics_engine() -> AnalyticsEngine:
+    """Shared date-sorted Approved engine, built once per Approved snapshot."""
+    list_approved()   # syncs the tail (cached), bumping approved_version() on change
+    return _analytics_engine(approved_version())
+
+def get_trends(granularity: str) -> TrendBuckets:
+    """Weekly / monthly Approved buckets, current as of the shared analytics engine."""
+    get_analytics_engine()
+    return _trend_buckets()[granularity]
+
 # ---------------- Meta utilities (period anchor) ----------------
+@_last_good
 def get_period_anchor() -> pd.Timestamp | None:
     sh = _open_spreadsheet()
-    ws = _ensure_meta_sheet(sh)
-    df = _read_df(ws)
-    df = _ensure_cols(df, ["key","value"])
+    df = _read_cols(sh, SHEET_META, META_SPEC)
     row = df.loc[df["key"] == "period_anchor"]
     if row.empty:
         return None
@@ -288,49 +1114,133 @@ def get_period_anchor() -> pd.Timestamp | None:
     return ts if pd.notna(ts) else None
 
 def set_period_anchor_now() -> str:
-    """Set anchor to now (UTC ISO seconds) and rebuild period rollup."""
-    sh = _open_spreadsheet()
-    ws = _ensure_meta_sheet(sh)
-    df = _read_df(ws)
-    df = _ensure_cols(df, ["key","value"])
+    """Close the current period (frozen snapshot), set anchor to now and rebuild period rollup."""
     now_iso = datetime.utcnow().isoformat(timespec="seconds")
+    journal.append(journal.OP_ANCHOR, {"anchor": now_iso})
+    _submit_or_queue()
+    return now_iso
+
+def _apply_anchor(sh, anchor_iso: str):
+    end = pd.Timestamp(anchor_iso, tz="UTC")
+    start = get_period_anchor()
+    if start is not None and start >= end:
+        return  # already applied (replay)
+    list_approved.clear()
+    ws = _ws(sh, SHEET_META)
+    # Meta is only rewritten after the snapshot is in place (a replay skips closed periods)
+    _, df = _concurrently(functools.partial(_close_period, sh, start, end), functools.partial(_read_df, ws))
+    df = _ensure_cols(df, META_HEADERS)
     if (df["key"] == "period_anchor").any():
-        df.loc[df["key"] == "period_anchor", "value"] = now_iso
+        df.loc[df["key"] == "period_anchor", "value"] = anchor_iso
     else:
-        df = pd.concat([df, pd.DataFrame([{"key":"period_anchor", "value": now_iso}])], ignore_index=True)
+        df = pd.concat([df, pd.DataFrame([{"key":"period_anchor", "value": anchor_iso}])], ignore_index=True)
     _write_df(ws, df)
-    st.cache_data.clear()
-    _rebuild_rollups()  # rebuild after setting anchor
-    return now_iso
+
+# ---------------- Period snapshots & history ----------------
+def _df_to_values(df: pd.DataFrame) -> list:
+    """Frame -> JSON-safe row lists for the values API (NaN/NaT -> "")."""
+    out = []
+    for row in df.astype(object).itertuples(index=False):
+        out.append(["" if pd.isna(v) else (v.item() if hasattr(v, "item") else v) for v in row])
+    return out
+
+def _close_period(sh, start: pd.Timestamp | None, end: pd.Timestamp) -> str:
+    """Freeze the rollup of [start, end) into its own sheet and index it in Periods."""
+    from gspread.exceptions import WorksheetNotFound
+
+    period_id = end.strftime("%Y%m%d_%H%M%S")
+    title = PERIOD_SNAPSHOT_PREFIX + period_id
+    snap = _build_rollup_df(since_ts_utc=start, until_ts_utc=end)
+
+    # idempotent under journal replay: sheet and index row are each written once
+    def write_snapshot():
+        try:
+            _layout_for(sh, title)
+        except WorksheetNotFound:
+            _add_sheet(sh, title, PERIOD_HEADERS, rows=len(snap) + 1)
+            sh.values_update(
+                _a1(title, "A1"),
+                params={"valueInputOption": "USER_ENTERED"},
+                body={"values": [PERIOD_HEADERS] + _df_to_values(snap)},
+            )
+
+    _, indexed = _concurrently(
+        write_snapshot, lambda: _read_cols(sh, SHEET_PERIODS, {"period_id": "str"})["period_id"])
+    if (indexed == period_id).any():
+        return period_id
+    index_row = {
+        "period_id": period_id,
+        "start": start.strftime("%Y-%m-%d %H:%M:%S") if start is not None else "",
+        "end": end.strftime("%Y-%m-%d %H:%M:%S"),
+        "sheet": title,
+        "members": int(len(snap)),
+        "total_hours": round(float(snap["total_hours"].sum()), 2) if not snap.empty else 0.0,
+        "count": int(snap["count"].sum()) if not snap.empty else 0,
+        "closed_at": end.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    headers = _layout_for(sh, SHEET_PERIODS)["headers"]
+    sh.values_append(
+        _a1(SHEET_PERIODS, "A1"),
+        params={"valueInputOption": "USER_ENTERED", "insertDataOption": "INSERT_ROWS"},
+        body={"values": [[index_row.get(h, "") for h in headers]]},
+    )
+    return period_id
+
+@st.cache_data(ttl=60)
+@_last_good
+def list_periods() -> pd.DataFrame:
+    """Closed periods, newest first."""
+    sh = _open_spreadsheet()
+    df = _read_cols(sh, SHEET_PERIODS, PERIODS_SPEC)
+    df = df[df["period_id"] != ""]
+    return df.sort_values("end", ascending=False, na_position="last").reset_index(drop=True)
+
+@st.cache_data(ttl=3600)
+@_last_good
+def get_period_snapshot(period_id: str) -> pd.DataFrame:
+    """Frozen per-member rollup of a closed period (snapshots never change)."""
+    sh = _open_spreadsheet()
+    df = _read_cols(sh, PERIOD_SNAPSHOT_PREFIX + str(period_id), ROLLUP_SPEC)
+    return df[PERIOD_HEADERS]
+
+def compare_periods(period_id: str, base_period_id: str) -> pd.DataFrame:
+    """Per-member hours of `period_id` vs `base_period_id` (delta = current - base)."""
+    cur = get_period_snapshot(period_id)[["member_id", "name", "Department", "total_hours", "count"]]
+    base = get_period_snapshot(base_period_id)[["member_id", "name", "total_hours", "count"]]
+    res = cur.merge(base, on=["member_id", "name"], how="outer", suffixes=("", "_base"))
+    for c in ("total_hours", "count", "total_hours_base", "count_base"):
+        res[c] = pd.to_numeric(res[c], errors="coerce").fillna(0)
+    res["Department"] = res["Department"].fillna("")
+    res["delta_hours"] = (res["total_hours"] - res["total_hours_base"]).round(2)
+    return res.sort_values("total_hours", ascending=False).reset_index(drop=True)
 
 # ---------------- Rollup builders ----------------
-def _build_rollup_df(since_ts_utc: pd.Timestamp | None) -> pd.DataFrame:
-    """Aggregate Approved -> per member with join to Member_Data for national_id & dept."""
-    app = list_approved()
+def _build_rollup_df(since_ts_utc: pd.Timestamp | None,
+                     until_ts_utc: pd.Timestamp | None = None) -> pd.DataFrame:
+    """Aggregate Approved -> per member with join to Member_Data for national_id & dept.
+
+    Window is [since, until) on approved_at; either bound may be None.
+    """
+    app, members = _concurrently(list_approved, get_members_df)
     if app.empty:
         return pd.DataFrame(columns=LEADER_HEADERS)
 
     if since_ts_utc is not None:
-        app = app[ app["approved_at_dt"] >= since_ts_utc ]
-        if app.empty:
-            return pd.DataFrame(columns=LEADER_HEADERS)
-
-    # 👇 ensure normalized keys here too (safety)
-    app["member_id"] = app["member_id"].apply(_normalize_member_id)
-    app["name"] = app["name"].astype(str).str.strip()
+        app = app[ app["approved_at"] >= since_ts_utc ]
+    if until_ts_utc is not None:
+        app = app[ app["approved_at"] < until_ts_utc ]
+    if app.empty:
+        return pd.DataFrame(columns=LEADER_HEADERS)
 
     # group per member
     g = (app.groupby(["member_id","name"], dropna=False)
              .agg(total_hours=("hours","sum"),
                   count=("id","count"),
-                  last_approved_at=("approved_at_dt","max"))
+                  last_approved_at=("approved_at","max"))
              .reset_index())
     g["total_hours"] = g["total_hours"].round(2)
 
     # enrich from Member_Data
-    members = get_members_df().copy()
-    if COL_NAT_ID not in members.columns:
-        members[COL_NAT_ID] = ""
     members_renamed = members.rename(columns={
         COL_AR_NAME: "name",
         COL_STUD_ID: "member_id",
@@ -338,17 +1248,13 @@ def _build_rollup_df(since_ts_utc: pd.Timestamp | None) -> pd.DataFrame:
         COL_NAT_ID: "national_id",
     })
 
-    # 👇 normalize merge keys on members side
-    members_renamed["member_id"] = members_renamed["member_id"].apply(_normalize_member_id)
-    members_renamed["name"] = members_renamed["name"].astype(str).str.strip()
-
     res = g.merge(
         members_renamed[["member_id","name","Department","national_id"]],
         on=["member_id","name"],
         how="left"
     )
 
-    res["Department"] = res["Department"].fillna("")
+    res["Department"] = res["Department"].astype(object).fillna("")
     res["national_id"] = res["national_id"].fillna("")
     # safe datetime formatting
     res["last_approved_at"] = (
@@ -363,133 +1269,575 @@ def _build_rollup_df(since_ts_utc: pd.Timestamp | None) -> pd.DataFrame:
     res = res.sort_values(["total_hours","count"], ascending=[False, False]).reset_index(drop=True)
     return res
 
+def current_period_rollup() -> pd.DataFrame:
+    """Per-member rollup of the open period (since the anchor); same engine as Members_Period."""
+    return _build_rollup_df(since_ts_utc=get_period_anchor())
+
 def _rebuild_rollups():
     """Recompute both rollup sheets: all-time & period (since anchor)."""
     sh = _open_spreadsheet()
-    # all-time
-    lb_ws = _ensure_leaderboard_sheet(sh)
-    lb_df = _build_rollup_df(since_ts_utc=None)
-    _write_df(lb_ws, lb_df)
+    list_approved.clear()  # pick up the approval that triggered the rebuild
+    # independent reads side by side; the builders below then hit the caches
+    _, _, anchor = _concurrently(list_approved, get_members_df, get_period_anchor)
+    lb_df = _build_rollup_df(since_ts_utc=None)      # all-time
+    pr_df = _build_rollup_df(since_ts_utc=anchor)    # period (since anchor)
+
+    writes = [functools.partial(_write_df, _ws(sh, SHEET_LEADERBOARD), lb_df),
+              functools.partial(_write_df, _ws(sh, SHEET_PERIOD), pr_df)]
+    if _dept_leaderboards_enabled():
+        writes.append(functools.partial(_write_dept_leaderboards, sh, anchor))
+    _concurrently(*writes)
+
+# ---------------- Per-member hours (self-service) ----------------
+# One shared index per data version: member_id -> rollup totals and the positions
+# of the member's requests, so a lookup is a few dict gets instead of a scan of
+# Requests / Approved per view. Dropped together with the data caches after writes.
+def _rollup_totals(sh, title) -> dict:
+    df = _read_cols(sh, title, ROLLUP_SPEC)
+    df = df[df["member_id"] != ""]
+    df = df.assign(last=pd.to_datetime(df["last_approved_at"], utc=True, errors="coerce"))
+    g = df.groupby("member_id", sort=False).agg(
+        total_hours=("total_hours", "sum"), count=("count", "sum"), name=("name", "first"),
+        last=("last", "max"))
+    return {mid: (round(float(h), 2), int(c), n, last)
+            for mid, h, c, n, last in zip(g.index, g["total_hours"], g["count"], g["name"], g["last"])}
+
+@_last_good
+def _fetch_member_hours_index() -> dict:
+    sh = _open_spreadsheet()
+    reqs = _requests_snapshot()
+    reqs = reqs[reqs["member_id"] != ""].reset_index(drop=True)
+    return {
+        "lifetime": _rollup_totals(sh, SHEET_LEADERBOARD),
+        "period":   _rollup_totals(sh, SHEET_PERIOD),
+        "requests": reqs,
+        "by_member": reqs.groupby("member_id", sort=False).indices,
+    }
 
-    # period (since anchor)
-    pr_ws = _ensure_period_sheet(sh)
-    anchor = get_period_anchor()
-    pr_df = _build_rollup_df(since_ts_utc=anchor)
-    _write_df(pr_ws, pr_df)
+@st.cache_resource(ttl=60, max_entries=2)
+def _member_hours_index(version: int) -> dict:
+    """Keyed like _cached_requests: never older than the snapshot list_requests prunes against."""
+    return _fetch_member_hours_index()
 
+def _invalidate_reads():
     st.cache_data.clear()
+    for reader in _SHARED_READERS:
+        reader.clear()
+    _member_hours_index.clear()
+
+def member_hours(member_id) -> dict | None:
+    """Totals and requests of one member (student ID; Arabic digits accepted), or None."""
+    mid = normalize_member_id(_normalize_text(member_id))
+    if not mid:
+        return None
+    idx = _member_hours_index(_requests_version()["v"])
+    lifetime = idx["lifetime"].get(mid)
+    period = idx["period"].get(mid)
+    positions = idx["by_member"].get(mid)
+    base = idx["requests"].iloc[positions if positions is not None else []]
+    reqs = _with_overlay(base, member_id=mid, snapshot=idx["requests"])
+    if lifetime is None and period is None and reqs.empty:
+        return None
+    name = next((t[2] for t in (lifetime, period) if t and t[2]), None)
+    if name is None and not reqs.empty:
+        name = reqs["name"].iloc[0]
+    # this session's approvals the snapshot does not show yet; the rollup sheets may
+    # already count them (rebuilt before the snapshot refresh): compare with their
+    # last_approved_at
+    was_approved = base.loc[base["status"] == "approved", "id"]
+    new = reqs[(reqs["status"] == "approved") & ~reqs["id"].isin(was_approved)]
+
+    def total(rollup) -> tuple:
+        hours, count = (rollup[0], rollup[1]) if rollup else (0.0, 0)
+        ahead = new if rollup is None or pd.isna(rollup[3]) else new[~(new["approved_at"] <= rollup[3])]
+        return hours + float(ahead["hours"].sum()), count + len(ahead)
+
+    lifetime_hours, lifetime_count = total(lifetime)
+    period_hours, period_count = total(period)
+    return {
+        "member_id": mid,
+        "name": name or "",
+        "lifetime_hours": lifetime_hours,
+        "lifetime_count": lifetime_count,
+        "period_hours": period_hours,
+        "period_count": period_count,
+        "pending": reqs[reqs["status"] == "pending"],
+        "approved": reqs[reqs["status"] == "approved"],
+        "rejected": reqs[reqs["status"] == "rejected"],
+    }
 
 # ---------------- Approve/Reject with rollups ----------------
 def approve_request(target_id: int, hr_name: str, hr_notes: str = "") -> bool:
-    """Approve request + upsert into Approved sheet by id, then rebuild rollups."""
-    sh = _open_spreadsheet()
-    ws_req = _ensure_requests_sheet(sh)
-    ws_app = _ensure_approved_sheet(sh)
-
-    # read request row
-    req_df = _read_df(ws_req)
-    req_df = _ensure_cols(req_df, ["id","name","member_id","date","hours","notes",
-                                   "status","hr_name","hr_notes","created_at","approved_at"])
-    mask = pd.to_numeric(req_df["id"], errors="coerce").astype("Int64") == int(target_id)
-    if not mask.any():
+    """Approve request + upsert into Approved sheet by id, then rebuild rollups (via the journal)."""
+    if not _request_exists(target_id):
         return False
-
-    approved_at = datetime.utcnow().isoformat(timespec="seconds")
-    req_df.loc[mask, "status"]      = "approved"
-    req_df.loc[mask, "hr_name"]     = (hr_name or "").strip()
-    req_df.loc[mask, "hr_notes"]    = (hr_notes or "").strip()
-    req_df.loc[mask, "approved_at"] = approved_at
-
-    # build approved row dict
-    row = req_df.loc[mask].iloc[0]
-    approved_row = {
-        "id":          int(pd.to_numeric(row["id"], errors="coerce")),
-        "name":        str(row["name"] or "").strip(),
-        "member_id":   str(row["member_id"] or "").strip(),
-        "date":        str(row["date"] or "").strip(),
-        "hours":       float(pd.to_numeric(row["hours"], errors="coerce") or 0.0),
-        "notes":       str(row["notes"] or "").strip(),
-        "hr_name":     str(row["hr_name"] or "").strip(),
-        "hr_notes":    str(row["hr_notes"] or "").strip(),
-        "approved_at": approved_at,
+    payload = {
+        "id": int(target_id),
+        "hr_name": (hr_name or "").strip(),
+        "hr_notes": (hr_notes or "").strip(),
+        "approved_at": datetime.utcnow().isoformat(timespec="seconds"),
     }
-
-    # upsert Approved
-    app_df = _read_df(ws_app)
-    app_df = _ensure_cols(app_df, APPROVED_HEADERS)
-    app_df["id"] = pd.to_numeric(app_df["id"], errors="coerce").astype("Int64")
-    exist_mask = app_df["id"] == int(target_id)
-    if exist_mask.any():
-        for k, v in approved_row.items():
-            app_df.loc[exist_mask, k] = v
-    else:
-        app_df = pd.concat([app_df, pd.DataFrame([approved_row])], ignore_index=True)
-
-    # write & rebuild rollups
-    _write_df(ws_req, req_df)
-    _write_df(ws_app, app_df)
-    _rebuild_rollups()
+    journal.append(journal.OP_APPROVE, payload, target_id=int(target_id))
+    _overlay_decision("approved", payload)
+    _submit_or_queue()
     return True
 
+def approve_requests(target_ids: list, hr_name: str, hr_notes: str = "") -> int:
+    """Approve many pending requests in one replay batch (one Requests write, one Approved
+    append, one rollup rebuild). Requests no longer pending when applied are left alone."""
+    approved_at = datetime.utcnow().isoformat(timespec="seconds")
+    for rid in target_ids:
+        payload = {
+            "id": int(rid),
+            "hr_name": (hr_name or "").strip(),
+            "hr_notes": (hr_notes or "").strip(),
+            "approved_at": approved_at,
+            "only_pending": True,
+        }
+        journal.append(journal.OP_APPROVE, payload, target_id=int(rid))
+        _overlay_decision("approved", payload)
+    if target_ids:
+        _submit_or_queue(max(JOURNAL_BATCH, len(target_ids)))
+        if _session_overlay() is None:
+            _invalidate_reads()  # batch job: no session overlay shows these approvals
+    return len(target_ids)
+
 def reject_request(target_id: int, hr_name: str, hr_notes: str = "") -> bool:
     """Reject request + upsert into Rejected sheet by id (does NOT touch Approved)."""
-    sh = _open_spreadsheet()
-    ws_req = _ensure_requests_sheet(sh)
-    ws_rej = _ensure_rejected_sheet(sh)
-
-    req_df = _read_df(ws_req)
-    req_df = _ensure_cols(req_df, ["id","name","member_id","date","hours","notes",
-                                   "status","hr_name","hr_notes","created_at","approved_at"])
-    mask = pd.to_numeric(req_df["id"], errors="coerce").astype("Int64") == int(target_id)
-    if not mask.any():
+    if not _request_exists(target_id):
         return False
+    payload = {
+        "id": int(target_id),
+        "hr_name": (hr_name or "").strip(),
+        "hr_notes": (hr_notes or "").strip(),
+        "rejected_at": datetime.utcnow().isoformat(timespec="seconds"),
+    }
+    journal.append(journal.OP_REJECT, payload, target_id=int(target_id))
+    _overlay_decision("rejected", payload)
+    _submit_or_queue()
+    return True
 
-    # update request row
-    req_df.loc[mask, "status"] = "rejected"
-    req_df.loc[mask, "hr_name"] = (hr_name or "").strip()
-    req_df.loc[mask, "hr_notes"] = (hr_notes or "").strip()
-    req_df.loc[mask, "approved_at"] = None
-
-    # build rejected row dict
-    rejected_at = datetime.utcnow().isoformat(timespec="seconds")
-    row = req_df.loc[mask].iloc[0]
-    rejected_row = {
-        "id":          int(pd.to_numeric(row["id"], errors="coerce")),
-        "name":        str(row["name"] or "").strip(),
-        "member_id":   str(row["member_id"] or "").strip(),
-        "date":        str(row["date"] or "").strip(),
-        "hours":       float(pd.to_numeric(row["hours"], errors="coerce") or 0.0),
-        "notes":       str(row["notes"] or "").strip(),
-        "hr_name":     (hr_name or "").strip(),
-        "hr_notes":    (hr_notes or "").strip(),
-        "rejected_at": rejected_at,
+# ---------------- Journal replay ----------------
+# Mutations are journaled first (utils/journal.py) and applied here in batches:
+# one Requests rewrite, one Approved append, one Rejected append and one rollup
+# rebuild per batch, whatever the number of ops. Every op is idempotent.
+# A batch Sheets refuses (as opposed to an outage) is retried one op at a time so
+# one bad op cannot hold the rest back; an op refused JOURNAL_MAX_ATTEMPTS times
+# on its own, or holding a cell Sheets can never accept, becomes a dead letter.
+JOURNAL_BATCH = 200
+JOURNAL_MAX_ATTEMPTS = 3
+SHEETS_CELL_LIMIT = 50_000   # characters per cell
+
+_REPLAY_LOCK = threading.Lock()
+_ID_LOCK = threading.Lock()
+
+_ROW_OPS = (journal.OP_SUBMIT, journal.OP_APPROVE, journal.OP_REJECT)
+
+def _num(v) -> float:
+    x = pd.to_numeric(v, errors="coerce")
+    return 0.0 if pd.isna(x) else float(x)
+
+def _decision_row(row: pd.Series, p: dict, ts_key: str) -> dict:
+    """Approved/Rejected row for a request row + the decision payload."""
+    return {
+        "id":        int(p["id"]),
+        "name":      _clean_str(row["name"]),
+        "member_id": normalize_member_id(row["member_id"]),
+        "date":      _clean_str(row["date"]),
+        "hours":     _num(row["hours"]),
+        "notes":     _clean_str(row["notes"]),
+        "hr_name":   p["hr_name"],
+        "hr_notes":  p["hr_notes"],
+        ts_key:      p[ts_key],
     }
 
-    # upsert Rejected
-    rej_ws = ws_rej
-    rej_df = _read_df(rej_ws)
-    rej_df = _ensure_cols(rej_df, REJECTED_HEADERS)
-    rej_df["id"] = pd.to_numeric(rej_df["id"], errors="coerce").astype("Int64")
-    exist_mask = rej_df["id"] == int(target_id)
-    if exist_mask.any():
-        for k, v in rejected_row.items():
-            rej_df.loc[exist_mask, k] = v
-    else:
-        rej_df = pd.concat([rej_df, pd.DataFrame([rejected_row])], ignore_index=True)
+def _same_submission(existing: pd.Series, row: dict) -> bool:
+    return (_clean_str(existing["created_at"]) == _clean_str(row["created_at"])
+            and normalize_member_id(existing["member_id"]) == normalize_member_id(row["member_id"]))
 
-    _write_df(ws_req, req_df)
-    _write_df(rej_ws, rej_df)
-    st.cache_data.clear()
-    return True
+def _apply_row_ops(sh, ops: list) -> bool:
+    """Apply submit/approve/reject ops; returns True when Approved changed.
+
+    Submits go to their department's shard, decisions to the shard holding the id;
+    only the shards touched are read and rewritten.
+    """
+    if not metrics.get().seeded:
+        _seed_metrics(sh)  # from the state before this batch
+    shards = {}
+
+    def load(shard_sh, title) -> dict:
+        ws = _ws(shard_sh, title)
+        df = _ensure_cols(_read_df(ws), REQUEST_HEADERS).reset_index(drop=True)
+        for c in ("status", "hr_name", "hr_notes", "approved_at"):
+            df[c] = df[c].astype(object)
+        ids = pd.to_numeric(df["id"], errors="coerce")
+        return {"ws": ws, "df": df, "new": [], "dirty": False,
+                "by_id": {int(i): pos for pos, i in enumerate(ids) if pd.notna(i)}}
+
+    def shard(shard_sh, title) -> dict:
+        if title not in shards:
+            shards[title] = load(shard_sh, title)
+        return shards[title]
+
+    if _shard_mode():
+        where = _locate_request_ids()
+        # read every shard this batch touches side by side
+        targets = {}
+        for op in ops:
+            t = (_request_shard(_op_dept(op["payload"])) if op["kind"] == journal.OP_SUBMIT
+                 else where.get(int(op["payload"]["id"])))
+            if t is not None:
+                targets[t[1]] = t
+        loaded = _concurrently(*(functools.partial(load, *t) for t in targets.values()))
+        shards.update(zip(targets, loaded))
+    else:
+        where = {i: (sh, SHEET_REQUESTS) for i in shard(sh, SHEET_REQUESTS)["by_id"]}
+    top = max(where, default=0)
+
+    # 1) submits (skip ones already written; move id collisions to a fresh id)
+    for op in ops:
+        if op["kind"] != journal.OP_SUBMIT:
+            continue
+        row = op["payload"]
+        rid = int(row["id"])
+        target = _request_shard(_op_dept(row)) if _shard_mode() else (sh, SHEET_REQUESTS)
+        s = shard(*target)
+        if rid in where:
+            pos = s["by_id"].get(rid)
+            if (where[rid][1] == target[1] and pos is not None and pos < len(s["df"])
+                    and _same_submission(s["df"].loc[pos], row)):
+                continue
+            rid = max(top + 1, journal.max_target_id(journal.OP_SUBMIT) + 1)
+            row = {**row, "id": rid}
+            journal.retarget(op["seq"], rid, row)
+        top = max(top, rid)
+        where[rid] = target
+        s["by_id"][rid] = len(s["df"]) + len(s["new"])
+        s["new"].append(row)
+        metrics.get().observe_submit(rid, row["notes"], row["created_at"])
+    for s in shards.values():
+        if s["new"]:
+            s["df"] = pd.concat([s["df"], pd.DataFrame(s["new"], columns=REQUEST_HEADERS)],
+                                ignore_index=True)
+
+    # 2) decisions, in journal order
+    approved_rows, rejected_rows = [], []
+    for op in ops:
+        p = op["payload"]
+        if op["kind"] == journal.OP_SUBMIT or int(p["id"]) not in where:
+            continue
+        s = shard(*where[int(p["id"])])
+        if int(p["id"]) not in s["by_id"]:
+            continue
+        req_df, i = s["df"], s["by_id"][int(p["id"])]
+        if p.get("only_pending") and _clean_str(req_df.loc[i, "status"]) != "pending":
+            continue  # decided meanwhile (e.g. by HR): a batch approval never overrides it
+        s["dirty"] = True
+        decision = "approved" if op["kind"] == journal.OP_APPROVE else "rejected"
+        metrics.get().observe_decision(
+            int(p["id"]), decision, p["hr_name"],
+            p["approved_at"] if op["kind"] == journal.OP_APPROVE else p["rejected_at"],
+            notes=req_df.loc[i, "notes"], created_at=req_df.loc[i, "created_at"])
+        if op["kind"] == journal.OP_APPROVE:
+            leaderboard.get().observe_approval(
+                int(p["id"]), normalize_member_id(req_df.loc[i, "member_id"]), req_df.loc[i, "name"],
+                req_df.loc[i, "hours"], p["approved_at"], notes=req_df.loc[i, "notes"])
+            req_df.loc[i, ["status", "hr_name", "hr_notes", "approved_at"]] = [
+                "approved", p["hr_name"], p["hr_notes"], p["approved_at"]]
+            approved_rows.append(_decision_row(req_df.loc[i], p, "approved_at"))
+        else:
+            req_df.loc[i, ["status", "hr_name", "hr_notes", "approved_at"]] = [
+                "rejected", p["hr_name"], p["hr_notes"], None]
+            rejected_rows.append(_decision_row(req_df.loc[i], p, "rejected_at"))
+
+    # the shard rewrites and the Approved / Rejected upserts are independent
+    _concurrently(
+        *(functools.partial(_write_df, s["ws"], s["df"]) for s in shards.values() if s["new"] or s["dirty"]),
+        *(functools.partial(_upsert_rows, sh, title, rows)
+          for title, rows in ((SHEET_APPROVED, approved_rows), (SHEET_REJECTED, rejected_rows)) if rows),
+    )
+    return bool(approved_rows)
+
+def _apply_ops(sh, ops: list):
+    rollups = False
+    row_ops = [op for op in ops if op["kind"] in _ROW_OPS]
+    if row_ops:
+        rollups = _apply_row_ops(sh, row_ops)
+    for op in ops:
+        if op["kind"] == journal.OP_ANCHOR:
+            _apply_anchor(sh, op["payload"]["anchor"])
+            leaderboard.reset()  # new period scope: re-seeded with the new anchor
+            rollups = True
+    if rollups:
+        _rebuild_rollups()
+
+def _is_rejection(err) -> bool:
+    """True when Sheets refused the request itself (retrying the same op cannot help)."""
+    import requests
+    from gspread.exceptions import APIError
+
+    if isinstance(err, APIError):
+        return err.code == 400
+    return not isinstance(err, (requests.RequestException, OSError))
+
+def _oversized(op: dict) -> bool:
+    return any(isinstance(v, str) and len(v) > SHEETS_CELL_LIMIT for v in op["payload"].values())
+
+def _dead_letter(ops: list, error: str):
+    journal.mark_dead([op["seq"] for op in ops], error)
+    # they may have been counted before the write failed: re-seed from Sheets
+    metrics.reset()
+    leaderboard.reset()
+
+def _replay_one_by_one(sh, ops: list) -> list:
+    """Apply `ops` singly after their batch was refused; returns the ops applied.
+
+    Refused ops stay queued (or become dead letters); an outage stops the pass.
+    """
+    done = []
+    for op in ops:
+        try:
+            _apply_ops(sh, [op])
+        except Exception as e:
+            journal.mark_failed([op["seq"]], repr(e))
+            if not _is_rejection(e):
+                raise
+            if op["attempts"] + 1 >= JOURNAL_MAX_ATTEMPTS:
+                _dead_letter([op], repr(e))
+            continue
+        journal.mark_applied([op["seq"]])
+        done.append(op)
+    return done
+
+def replay_journal(limit: int = JOURNAL_BATCH) -> int:
+    """Apply pending journal ops to Sheets in batches; returns how many were applied.
+
+    On an outage the ops stay pending (attempts/last_error recorded) and the error
+    propagates; the next replay picks them up again. A refused batch is split (see
+    _replay_one_by_one) and does not count as a backend failure.
+    """
+    applied, structural = 0, False
+    with _REPLAY_LOCK:
+        _strict.on = True
+        try:
+            while True:
+                ops = journal.pending(limit)
+                if not ops:
+                    break
+                oversized = [op for op in ops if _oversized(op)]
+                if oversized:
+                    _dead_letter(oversized, f"cell over {SHEETS_CELL_LIMIT} characters")
+                    continue
+                sh = _open_spreadsheet()
+                try:
+                    _apply_ops(sh, ops)
+                    journal.mark_applied([op["seq"] for op in ops])
+                    done = ops
+                except Exception as e:
+                    if len(ops) == 1 or not _is_rejection(e):
+                        journal.mark_failed([op["seq"] for op in ops], repr(e))
+                        if len(ops) == 1 and _is_rejection(e):
+                            if ops[0]["attempts"] + 1 >= JOURNAL_MAX_ATTEMPTS:
+                                _dead_letter(ops, repr(e))
+                            break
+                        raise
+                    done = _replay_one_by_one(sh, ops)
+                    ops = []   # refused ops are retried by the next replay, not this one
+                applied += len(done)
+                structural = structural or any(op["kind"] not in _ROW_OPS for op in done)
+                if len(ops) < limit:
+                    break
+        finally:
+            _strict.on = False
+    if applied:
+        _note_success()
+        # Submits / decisions keep the shared snapshots: the writing session sees them
+        # through its overlay, other sessions once the background refresh lands (the
+        # other readers on their TTL). A period close changes too much to overlay.
+        if structural:
+            _invalidate_reads()
+        else:
+            _refresh_requests_async()
+        _publish_metrics()
+    return applied
+
+def dead_letters() -> pd.DataFrame:
+    """Journal ops taken out of the queue after Sheets kept refusing them (for the HR page)."""
+    rows = [{
+        "seq": op["seq"], "kind": op["kind"], "id": op["target_id"],
+        "name": op["payload"].get("name") or op["payload"].get("hr_name") or "",
+        "attempts": op["attempts"], "error": op["last_error"] or "",
+        "created_at": op["created_at"], "dead_at": op["dead_at"],
+    } for op in journal.dead_letters()]
+    return pd.DataFrame(rows, columns=["seq", "kind", "id", "name", "attempts", "error", "created_at", "dead_at"])
+
+def retry_dead_letters(seqs: list):
+    journal.retry(seqs)
+    _submit_or_queue()
+
+def discard_dead_letters(seqs: list):
+    journal.discard(seqs)
+
+def rebuild_from_journal(batch: int = JOURNAL_BATCH) -> int:
+    """Re-apply every journaled op (applied or not) to repair Requests/Approved/Rejected/rollups."""
+    n = 0
+    with _REPLAY_LOCK:
+        _strict.on = True
+        try:
+            sh = _open_spreadsheet()
+            for ops in journal.iter_ops(batch):
+                _apply_ops(sh, ops)
+                journal.mark_applied([op["seq"] for op in ops if op["applied_at"] is None])
+                n += len(ops)
+        finally:
+            _strict.on = False
+    _invalidate_reads()
+    leaderboard.reset()
+    return n
+
+# ---------------- Bulk import (utils.bulk_import) ----------------
+# Imports bypass the journal: the input file is the record, and rows already in
+# Requests (same member, date and notes) are skipped, so re-running a file after a
+# failure is safe. Each block is one append per Requests shard plus one to Approved.
+@st.cache_resource
+def _id_reservations() -> dict:
+    return {"top": 0}
+
+def reserve_request_ids(n: int) -> int:
+    """Reserve `n` consecutive request ids (no submit can take them); returns the first."""
+    with _ID_LOCK:
+        first = _next_request_id()
+        _id_reservations()["top"] = first + n - 1
+    return first
+
+def request_keys() -> set:
+    """(member_id, ISO date, notes) of every request, across shards."""
+    df = _read_requests({"member_id": "member_id", "date": "str", "notes": "str"})
+    dates = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    return set(zip(df["member_id"], dates.fillna(df["date"]), df["notes"]))
+
+def append_imported_requests(rows: list) -> int:
+    """Write a block of validated import rows (REQUEST_HEADERS + "dept"); returns API calls made.
+
+    Rows with status "approved" also go to Approved.
+    """
+    by_shard = {}
+    for r in rows:
+        by_shard.setdefault(_request_shard(r["dept"]), []).append(r)
+    approved = [r for r in rows if r["status"] == "approved"]
+    with _REPLAY_LOCK:  # a journal replay rewrites Requests wholesale
+        for (sh, title), block in by_shard.items():
+            _append_rows(sh, title, block)
+        if approved:
+            _append_rows(_open_spreadsheet(), SHEET_APPROVED, approved)
+    return len(by_shard) + bool(approved)
+
+def finish_import(rebuild_rollups: bool = True):
+    """After the last block: rebuild rollups once (if Approved grew), drop caches and metrics."""
+    leaderboard.reset()  # before the rebuild, which may re-seed it for the department sheets
+    if rebuild_rollups:
+        _rebuild_rollups()
+    _invalidate_reads()
+    metrics.reset()  # re-seeded from the sheets on next use
+
+# ---------------- Reconciler (utils.reconcile) ----------------
+# Raw rows of the sheets the reconciler compares, and its targeted repairs. Both run
+# inside exclusive_writes(), so no journal replay lands between the read and a repair.
+RECONCILE_SHEETS = (SHEET_APPROVED, SHEET_REJECTED, SHEET_LEADERBOARD, SHEET_PERIOD)
+
+def exclusive_writes():
+    """Hold off journal replays and bulk imports (a context manager)."""
+    return _REPLAY_LOCK
+
+def reconcile_snapshot() -> dict:
+    """Raw rows (from row 2) of every Requests shard and RECONCILE_SHEETS, plus the anchor.
+
+    One batchGet per spreadsheet; spreadsheets in parallel. Returns
+    {"sheets": {title: {"headers": [...], "rows": [[...]]}}, "requests": [shard titles],
+     "anchor": Timestamp | None, "in_flight": {request ids with pending journal ops}}.
+    """
+    shards = _request_shards()
+    groups = {}
+    for sh, title in shards:
+        groups.setdefault(sh.id, (sh, []))[1].append(title)
+    main = _open_spreadsheet()
+    groups.setdefault(main.id, (main, []))[1].extend(RECONCILE_SHEETS + (SHEET_META,))
+
+    def read(group):
+        sh, titles = group
+        headers = [_layout_for(sh, t)["headers"] for t in titles]
+        ranges = [_a1(t, f"A2:{_col_letter(max(len(h), 1))}") for t, h in zip(titles, headers)]
+        got = sh.values_batch_get(ranges, params=dict(_ROW_PARAMS)).get("valueRanges", [])
+        return {t: {"headers": h, "rows": vr.get("values", [])} for t, h, vr in zip(titles, headers, got)}
+
+    sheets = {}
+    for part in _concurrently(*(functools.partial(read, g) for g in groups.values())):
+        sheets.update(part)
+    meta = sheets.pop(SHEET_META)
+    anchor = next((r[1] for r in meta["rows"] if len(r) > 1 and _clean_str(r[0]) == "period_anchor"), None)
+    anchor = pd.to_datetime(str(anchor), errors="coerce", utc=True) if anchor is not None else None
+    in_flight = {int(op["payload"]["id"]) for op in journal.pending()
+                 if op["kind"] in _ROW_OPS and "id" in op["payload"]}
+    return {"sheets": sheets, "requests": [t for _, t in shards],
+            "anchor": anchor if anchor is not None and pd.notna(anchor) else None,
+            "in_flight": in_flight}
+
+def apply_reconcile_repairs(updates: list, appends: dict) -> int:
+    """Targeted writes; returns the number of API calls.
+
+    `updates` are (title, sheet row, {header: value}) cell edits (one values
+    batchUpdate per spreadsheet); `appends` maps title -> dict rows (one append each).
+    """
+    where = {title: sh for sh, title in _request_shards()}
+    main = _open_spreadsheet()
+    by_sh, calls = {}, []
+    for title, row, values in updates:
+        sh = where.get(title, main)
+        col = _layout_for(sh, title)["col"]
+        data = by_sh.setdefault(sh.id, (sh, []))[1]
+        for h, v in values.items():
+            data.append({"range": _a1(title, f"{_col_letter(col[h] + 1)}{row}"), "values": [[v]]})
+    for sh, data in by_sh.values():
+        calls.append(functools.partial(sh.values_batch_update, {"valueInputOption": "USER_ENTERED", "data": data}))
+    for title, rows in appends.items():
+        if rows:
+            calls.append(functools.partial(_append_rows, where.get(title, main), title, rows))
+    _concurrently(*calls)
+    if calls:
+        for title in RECONCILE_SHEETS:
+            _reset_tail(title)
+        _invalidate_reads()
+        metrics.reset()
+        leaderboard.reset()
+    return len(calls)
+
+# ---------------- Pipeline metrics ----------------
+def _seed_metrics(sh):
+    """Load utils.metrics from the sheets once per process (then kept incrementally)."""
+    reqs = _read_requests(REQUEST_SPEC)
+    rej = _read_cols(sh, SHEET_REJECTED, {"id": "int", "rejected_at": "datetime"}).dropna(subset=["id"])
+    metrics.get().seed(reqs, dict(zip(rej["id"].astype(int), rej["rejected_at"])))
+
+def _publish_metrics():
+    try:
+        metrics.get().write_textfile()
+    except OSError:
+        pass  # the text file is best effort; the in-app view is unaffected
+
+def pipeline_metrics() -> metrics.PipelineMetrics:
+    """Queue depth / review latency / reviewer throughput (seeded from Sheets on first use)."""
+    m = metrics.get()
+    if not m.seeded:
+        try:
+            _seed_metrics(_open_spreadsheet())
+            _publish_metrics()
+        except Exception:
+            pass  # Sheets unavailable: show what this process has observed so far
+    return m
 
 def summary_by_member(status_filter: str = "approved") -> pd.DataFrame:
-    sh = _open_spreadsheet()
-    ws = _ensure_requests_sheet(sh)
-    df = _read_df(ws)
-    df = _ensure_cols(df, ["member_id", "name", "hours", "status", "id"])
-    if status_filter:
-        df = df[df["status"] == status_filter]
-    df["hours"] = pd.to_numeric(df["hours"], errors="coerce")
+    """Hours / request count per member, from the shared snapshot plus this session's writes."""
+    df = list_requests(status_filter)
     df = df[df["hours"].notnull()]
     if df.empty:
         return pd.DataFrame(columns=["member_id","name","total_hours","count"])
@@ -501,6 +1849,82 @@ def summary_by_member(status_filter: str = "approved") -> pd.DataFrame:
     )
     return agg
 
+# ---------------- Leaderboards ----------------
+# Global / per-department / current-period rankings kept in memory (utils.leaderboard).
+# With [leaderboard] department_sheets = true (or env HR_DEPT_LEADERBOARDS=1) each
+# department's ranking is also written to its own "Leaderboard - <dept>" sheet on
+# every rollup rebuild, for the departments whose ranking changed.
+DEPT_LEADERBOARD_ENV = "HR_DEPT_LEADERBOARDS"
+DEPT_LEADERBOARD_TITLE = "Leaderboard - {dept}"
+DEPT_LEADERBOARD_HEADERS = ["rank", "member_id", "name", "total_hours", "count"]
+
+def _dept_leaderboards_enabled() -> bool:
+    flag = os.environ.get(DEPT_LEADERBOARD_ENV)
+    if flag is None:
+        try:
+            flag = st.secrets["leaderboard"].get("department_sheets", False)
+        except Exception:
+            flag = False
+    return str(flag).strip().lower() in {"1", "true", "yes", "on"}
+
+def _seed_leaderboard(lb: leaderboard.Leaderboard, approved: pd.DataFrame, anchor, version=None):
+    members = get_members_df()
+    members = members.assign(**{COL_STUD_ID: members[COL_STUD_ID].map(normalize_member_id)})
+    lb.seed(approved, members, anchor, id_col=COL_STUD_ID, dept_col=COL_DEPT, version=version)
+
+def _write_dept_leaderboards(sh, anchor):
+    """Rewrite the department sheets whose ranking changed (seeding the rankings if needed)."""
+    from gspread.exceptions import WorksheetNotFound
+
+    lb = leaderboard.get()
+    if not lb.seeded:
+        _seed_leaderboard(lb, list_approved(), anchor, approved_version())  # fresh: cleared by _rebuild_rollups
+    dirty = lb.take_dirty()
+    try:
+        for dept in sorted(dirty):
+            df = lb.top_k(leaderboard.dept_scope(dept), None)[DEPT_LEADERBOARD_HEADERS]
+            title = DEPT_LEADERBOARD_TITLE.format(dept=_BAD_TITLE_CHARS.sub("-", dept))[:100]
+            try:
+                _layout_for(sh, title)
+            except WorksheetNotFound:
+                _add_sheet(sh, title, DEPT_LEADERBOARD_HEADERS, rows=max(len(df) + 1, 100))
+            _write_df(_ws(sh, title), df)
+            dirty = dirty - {dept}
+    finally:
+        lb.mark_dirty(dirty)  # unwritten ones go out with the next rebuild
+
+def leaderboard_service() -> leaderboard.Leaderboard:
+    """Rankings (top_k / rank_of / ranks), re-seeded whenever the synced Approved changes.
+
+    The seed is read and built without holding the replay lock; it is swapped in
+    under the lock unless an approval was applied meanwhile or a replay is running
+    (the next call retries), so renders never wait on a replay.
+    """
+    lb = leaderboard.get()
+    observed = lb.observed
+    try:
+        approved = list_approved()   # syncs the tail (cached), bumping approved_version() on change
+        version = approved_version()
+        if lb.seeded and lb.version == version:
+            return lb
+        fresh = leaderboard.Leaderboard()
+        _seed_leaderboard(fresh, approved, get_period_anchor(), version)
+    except Exception:
+        return lb  # Sheets unavailable: current rankings (empty until a seed succeeds)
+    if _REPLAY_LOCK.acquire(blocking=False):
+        try:
+            if leaderboard.get() is lb and lb.observed == observed:
+                leaderboard.replace(fresh)
+                return fresh
+        finally:
+            _REPLAY_LOCK.release()
+    current = leaderboard.get()
+    return current if current.seeded else fresh
+
+def member_rank(member_id, scope: str = leaderboard.SCOPE_GLOBAL) -> int | None:
+    """Rank of a member (student ID as typed; Arabic digits accepted) within `scope`."""
+    return leaderboard_service().rank_of(normalize_member_id(_normalize_text(member_id)), scope)
+
 # ---------------- HR committee helpers ----------------
 @st.cache_data(ttl=60)
 def list_hr_names() -> list[str]:
@@ -544,3 +1968,15 @@ def list_hr_names() -> list[str]:
         pass
 
     return []
+
+# ---------------- Profiling (opt-in) ----------------
+# Spans around every public function above plus the private hot spots; nothing is
+# wrapped unless profiling is enabled (see utils/profiling.py).
+profiling.instrument(globals(), extra=(
+    "_client", "_open_spreadsheet", "_bootstrap_schema", "_read_df", "_write_df",
+    "_read_cols", "_sync_tail", "_upsert_rows",
+    "_build_rollup_df", "_rebuild_rollups", "_close_period", "_apply_ops",
+))
+if profiling.enabled():
+    from gspread.http_client import HTTPClient
+    profiling.instrument_method(HTTPClient, "request", "sheets_http")
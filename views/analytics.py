@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# Analytics view (pages/3_Analytics.py and app.py): APPROVED only.
+# - Reads approved records through the shared analytics engine (utils.analytics, built
+#   from list_approved).
+# - Arabic UI labels, robust parsing, and on-demand CSV/XLSX/Parquet export of the filtered view.
+
+import streamlit as st
+
+from utils import profiling
+
+TREND_TOP = 10
+LEADERBOARD_TOP = 10
+LEADERBOARD_COLS = {
+    "rank": "الترتيب", "member_id": "الرقم الجامعي", "name": "الاسم", "Department": "القسم",
+    "total_hours": "الساعات", "count": "عدد الطلبات",
+}
+
+def _scope_label(scope: str) -> str:
+    from utils import leaderboard
+
+    dept = leaderboard.scope_dept(scope)
+    if dept is not None:
+        return f"القسم: {dept}"
+    return {leaderboard.SCOPE_GLOBAL: "الكل", leaderboard.SCOPE_PERIOD: "الفترة الحالية"}[scope]
+
+def render():
+    st.title(" Analytics")
+    profiling.page("analytics")
+
+    import pandas as pd
+    from utils.sheets import get_analytics_engine, get_trends, leaderboard_service, member_rank
+    from utils import leaderboard
+    from utils.analytics import TREND_FREQS
+    from utils.exports import export_controls
+
+    # -------- Data load (Approved only) --------
+    # The engine is built once per Approved version and shared: rows sorted by date,
+    # department/task parsed from notes, aggregates memoized per date range.
+    profiling.section("load")
+    engine = get_analytics_engine()
+
+    # Guard: empty
+    if engine is None or len(engine) == 0:
+        st.info("لا توجد بيانات معتمدة بعد.")
+        st.stop()
+
+    # Filter widgets
+    profiling.section("filters")
+    c1, c2 = st.columns(2)
+    with c1:
+        min_d, max_d = engine.min_date, engine.max_date
+        default_start = min_d.date() if min_d is not None else None
+        default_end   = max_d.date() if max_d is not None else None
+        date_range = st.date_input("الفترة", value=(default_start, default_end))
+    with c2:
+        # Since we use Approved only, status is fixed. Show a disabled pill for clarity.
+        st.text_input("الحالة", value="approved", disabled=True)
+
+    # Apply date filter (binary search on the sorted dates)
+    start = end = None
+    if isinstance(date_range, (list, tuple)) and len(date_range) == 2 and all(date_range):
+        start, end = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
+    kpis = engine.kpis(start, end)
+
+    # Guard after filter
+    if kpis["total_requests"] == 0:
+        st.info("لا توجد بيانات ضمن الفترة المحددة.")
+        st.stop()
+
+    # -------- KPIs --------
+    profiling.section("kpis")
+    k1, k2, k3 = st.columns(3)
+    k1.metric("إجمالي الساعات (معتمدة)", f"{kpis['total_hours']:.2f}")
+    k2.metric("عدد الطلبات (معتمدة)", f"{kpis['total_requests']}")
+    k3.metric("عدد الأعضاء", f"{kpis['unique_members']}")
+
+    st.divider()
+
+
+
+    # -------- By member (Top 15) --------
+    profiling.section("by_member")
+    st.subheader("ساعات لكل عضو (Top 15)")
+    by_member = engine.totals("member", start, end).head(15)
+    st.dataframe(by_member.rename(columns={"member_id": "الرقم الجامعي", "name": "الاسم", "hours": "الساعات"}),
+                 use_container_width=True , hide_index=True)
+    if not by_member.empty:
+        st.bar_chart(by_member.set_index("name")["hours"])
+
+    st.divider()
+
+    # -------- By department --------
+    profiling.section("by_department")
+    st.subheader("ساعات حسب القسم")
+    # القسم والمهمة مفكوكان من notes بصيغة: "{dept} - {task} - {minutes} دقيقة"
+    by_dept = engine.totals("dept", start, end).rename(columns={"dept": "القسم"})
+    st.dataframe(by_dept.rename(columns={"hours": "الساعات"}), use_container_width=True , hide_index=True)
+    if not by_dept.empty:
+        st.bar_chart(by_dept.set_index("القسم")["hours"])
+
+    st.divider()
+
+    # -------- By task (Top 15) --------
+    profiling.section("by_task")
+    st.subheader("أكثر المهام تنفيذًا")
+    by_task = engine.totals("task", start, end).head(15).rename(columns={"task": "المهمة"})
+    st.dataframe(by_task.rename(columns={"hours": "الساعات"}), use_container_width=True , hide_index=True)
+    if not by_task.empty:
+        st.bar_chart(by_task.set_index("المهمة")["hours"])
+
+    st.divider()
+
+    # -------- Trends (weekly / monthly buckets, folded incrementally) --------
+    profiling.section("trends")
+    st.subheader("الاتجاه الزمني")
+    t1, t2, t3 = st.columns(3)
+    with t1:
+        granularity = st.radio("التجميع", options=list(TREND_FREQS), horizontal=True,
+                               format_func={"week": "أسبوعي", "month": "شهري"}.get)
+    with t2:
+        trend_dim = st.radio("حسب", options=["dept", "task"], horizontal=True,
+                             format_func={"dept": "القسم", "task": "المهمة"}.get)
+    with t3:
+        trend_value = st.radio("المقياس", options=["hours", "count"], horizontal=True,
+                               format_func={"hours": "الساعات", "count": "عدد الطلبات"}.get)
+
+    buckets = get_trends(granularity)
+    trend = buckets.table(trend_dim, trend_value)
+    if start is not None and not trend.empty:
+        # sorted period index: slicing is a binary search
+        trend = trend.loc[start.to_period(TREND_FREQS[granularity]).start_time:end]
+    if trend.empty:
+        st.caption("لا توجد بيانات ضمن الفترة المحددة.")
+    else:
+        # keep the chart readable: the busiest TREND_TOP series in the window
+        trend = trend[trend.sum().nlargest(TREND_TOP).index]
+        st.line_chart(trend)
+
+    # -------- Leaderboards (live rank index, not the date filter) --------
+    profiling.section("leaderboard")
+    st.divider()
+    st.subheader("لوحة الصدارة")
+    lb = leaderboard_service()
+    scopes = [leaderboard.SCOPE_GLOBAL, leaderboard.SCOPE_PERIOD] + [
+        leaderboard.dept_scope(d) for d in lb.departments()]
+    l1, l2 = st.columns([3, 1])
+    with l1:
+        scope = st.selectbox("النطاق", options=scopes, format_func=_scope_label)
+    with l2:
+        k = st.number_input("أعلى", min_value=1, max_value=100, value=LEADERBOARD_TOP)
+    top = lb.top_k(scope, int(k))
+    if top.empty:
+        st.caption("لا توجد ساعات معتمدة ضمن هذا النطاق.")
+    else:
+        st.dataframe(top.rename(columns=LEADERBOARD_COLS), use_container_width=True, hide_index=True)
+    member_id = st.text_input("ترتيب عضو", placeholder="الرقم الجامعي")
+    if member_id.strip():
+        rank = member_rank(member_id, scope)
+        if rank is None:
+            st.caption("العضو غير مرتب ضمن هذا النطاق.")
+        else:
+            st.info(f"الترتيب: **{rank}** من {lb.size(scope)}")
+
+    # -------- Download filtered data (built only on request) --------
+    profiling.section("export")
+    st.divider()
+    export_controls(
+        lambda: engine.rows(start, end).drop(columns=["dept", "task"]),
+        file_stem="analytics_approved_filtered",
+        key="analytics",
+        version=(engine.data_version,
+                 tuple(str(d) for d in date_range) if isinstance(date_range, (list, tuple)) else str(date_range)),
+        label="تنزيل النتائج",
+    )
+
+    profiling.finish()
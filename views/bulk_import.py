@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# Bulk Import view (pages/Bulk_Import.py and app.py).
+# - استيراد سجلات ساعات سابقة من ملف CSV / XLSX (utils.bulk_import)
+# - "تحقق فقط" يفحص الملف دون كتابة؛ "استيراد" يكتب الصفوف الصالحة على دفعات كبيرة
+# - الصفوف الموجودة مسبقًا (نفس العضو والتاريخ والمهمة) تُتجاوز، فإعادة الاستيراد آمنة
+
+import streamlit as st
+
+from utils import profiling
+
+def render():
+    st.title("استيراد سجلات الساعات")
+    profiling.page("bulk_import")
+
+    import pandas as pd
+    from utils.bulk_import import COLUMNS, REQUIRED, run_import
+
+    st.caption(
+        "الأعمدة المطلوبة: " + "، ".join(COLUMNS[k][0] for k in REQUIRED)
+        + " — اختيارية: " + "، ".join(v[0] for k, v in COLUMNS.items() if k not in REQUIRED)
+    )
+
+    profiling.section("form")
+    upload = st.file_uploader("ملف الساعات", type=["csv", "xlsx"])
+    status = st.radio("حالة الصفوف التي لا تحدد حالة", ["approved", "pending"], horizontal=True,
+                      format_func={"approved": "معتمدة", "pending": "قيد الانتظار"}.get)
+    hr_name = st.text_input("اسم المراجع للصفوف المعتمدة", value="استيراد")
+
+    c1, c2 = st.columns(2)
+    check = c1.button("تحقق فقط", disabled=upload is None)
+    go = c2.button("استيراد", type="primary", disabled=upload is None)
+
+    profiling.section("import")
+    if upload is not None and (check or go):
+        note = st.empty()
+
+        def _progress(r):
+            note.info(f"تمت معالجة {r['rows']} صف — صالحة: {r['imported']}، أخطاء: {len(r['errors'])}")
+
+        try:
+            with st.spinner("جارٍ المعالجة..."):
+                upload.seek(0)
+                report = run_import(upload, upload.name, status=status, hr_name=hr_name.strip(),
+                                    dry_run=not go, progress=_progress)
+            st.session_state["bulk_import_report"] = (report, bool(go))
+        except ValueError as e:
+            st.error(str(e))
+
+    profiling.section("report")
+    if "bulk_import_report" in st.session_state:
+        report, written = st.session_state["bulk_import_report"]
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("الصفوف", report["rows"])
+        k2.metric("تم استيرادها" if written else "صالحة", report["imported"])
+        k3.metric("موجودة مسبقًا", report["duplicates"])
+        k4.metric("أخطاء", len(report["errors"]))
+        if written and report["imported"]:
+            st.success(f"تم الاستيراد: الطلبات {report['first_id']} – {report['last_id']} "
+                       f"({report['api_calls']} عملية كتابة، {report['seconds']} ث).")
+        if report["errors"]:
+            errors = pd.DataFrame(report["errors"]).rename(
+                columns={"row": "السطر", "member_id": "الرقم الجامعي", "error": "الخطأ"})
+            st.dataframe(errors, use_container_width=True, hide_index=True)
+            st.download_button("تنزيل الأخطاء (CSV)", errors.to_csv(index=False).encode("utf-8-sig"),
+                               file_name="import_errors.csv", mime="text/csv")
+
+    profiling.finish()
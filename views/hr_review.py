@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+# HR Review view (pages/2_HR_Review.py and app.py).
+# HR dashboard: review pending requests, approve/reject, and see summaries.
+# - Request selection is a dropdown of current pending requests (no manual ID input).
+# - HR Name is a dropdown from list_hr_names().
+# - Pipeline metrics (queue depth, review latency, reviewer throughput) come from the
+#   running counters in utils.metrics, not from re-reading the sheets.
+# - Auto-approval (utils.auto_approve): last run, exceptions left for HR and a
+#   "run now" button; the periodic job is started here when enabled.
+# - Dead letters: queued operations Sheets kept refusing, with retry / discard.
+
+import streamlit as st
+
+from utils import profiling
+
+HR_NOTES_MAX_CHARS = 1000
+SELECTED_KEY = "hr_review_selected_id"
+DEAD_LETTER_COLS = {"seq": "#", "kind": "العملية", "id": "رقم الطلب", "name": "الاسم",
+                    "attempts": "المحاولات", "error": "الخطأ", "created_at": "وقت الإنشاء"}
+
+LATENCY_COLS = {"p50_h": "p50 (ساعة)", "p90_h": "p90 (ساعة)", "p99_h": "p99 (ساعة)"}
+
+def _h(v):
+    if v is None:
+        return "—"
+    return f"{v * 60:.0f} د" if v < 1 else f"{v:.1f} س"
+
+def render():
+    st.title(" HR Review & Dashboard")
+    profiling.page("hr_review")
+
+    import pandas as pd
+    from utils import auto_approve, reconcile
+    from utils.sheets import (
+        list_requests,
+        approve_request,
+        reject_request,
+        summary_by_member,
+        list_hr_names,
+        backend_status,
+        is_queued,
+        pipeline_metrics,
+        dead_letters,
+        retry_dead_letters,
+        discard_dead_letters,
+    )
+
+    auto_enabled = auto_approve.ensure_scheduler()
+    reconcile.ensure_scheduler()
+
+    # --- Degraded mode banner ---
+    status = backend_status()
+    if not status["healthy"] or status["queued"]:
+        st.warning(f"Google Sheets غير متاح حاليًا أو بطيء: البيانات المعروضة من آخر نسخة محفوظة، "
+                   f"وعدد العمليات في قائمة الانتظار: {status['queued']}.")
+
+    # --- Dead letters: ops Sheets kept refusing, out of the queue ---
+    dead_df = dead_letters()
+    if not dead_df.empty:
+        st.error(f"{len(dead_df)} عملية رفضتها Google Sheets بشكل متكرر وأُخرجت من قائمة الانتظار.")
+        with st.expander("العمليات المتوقفة"):
+            st.dataframe(dead_df[list(DEAD_LETTER_COLS)].rename(columns=DEAD_LETTER_COLS),
+                         use_container_width=True, hide_index=True)
+            picked = st.multiselect("العمليات", options=dead_df["seq"].tolist(),
+                                    format_func=lambda s: f"#{s}")
+            col_r, col_d = st.columns(2)
+            if col_r.button("إعادة المحاولة", disabled=not picked):
+                retry_dead_letters(picked)
+                st.rerun()
+            if col_d.button("حذف نهائي", disabled=not picked):
+                discard_dead_letters(picked)
+                st.rerun()
+
+    # --- Pending Requests table ---
+    profiling.section("pending_table")
+    st.subheader("Pending Requests")
+    pending_df = list_requests(status="pending")
+    st.dataframe(pending_df, use_container_width=True)
+
+    st.divider()
+    st.subheader("Approve / Reject")
+
+    # ---------- Request dropdown (only pending) ----------
+    profiling.section("review_form")
+    selected_id = None
+    if pending_df.empty:
+        st.info("لا توجد طلبات قيد الانتظار.")
+    else:
+        # Build a readable label per pending row to avoid manual ID entry
+        def _make_label(row: pd.Series) -> str:
+            rid = int(row.get("id", 0)) if pd.notna(row.get("id")) else 0
+            nm  = str(row.get("name", "") or "").strip()
+            dt  = str(row.get("date", "") or "").strip()
+            hrs = str(row.get("hours", "") or "").strip()
+            nts = str(row.get("notes", "") or "").strip()
+            return f"#{rid} — {nm} — {dt} — {hrs}h — {nts}"
+
+        # options are request ids: a pending-list change (new submits) rebuilds the
+        # widget, and the kept id re-selects the same request
+        ids = pending_df["id"].astype(int).tolist()
+        labels = dict(zip(ids, pending_df.apply(_make_label, axis=1)))
+        kept = st.session_state.get(SELECTED_KEY)
+        selected_id = st.selectbox(
+            "Request (pending only)",
+            options=ids,
+            index=ids.index(kept) if kept in ids else None,
+            format_func=labels.get,
+            placeholder="Select a pending request",
+        )
+    st.session_state[SELECTED_KEY] = selected_id
+
+    # ---------- HR Name dropdown ----------
+    hr_names = list_hr_names()
+    if hr_names:
+        hr_name = st.selectbox("HR Name *", options=hr_names, index=None, placeholder="Select HR name")
+    else:
+        hr_name = None
+        st.warning("لا توجد أسماء مهيأة للجنة HR. أضف الأسماء في الأسرار أو تحت قسم HR في Member_Data.")
+
+    hr_notes = st.text_input("HR Notes (optional)", max_chars=HR_NOTES_MAX_CHARS)
+
+    # Buttons are disabled unless both a request and an HR name are selected
+    approve_disabled = not (selected_id and hr_name)
+    reject_disabled  = not (selected_id and hr_name)
+
+    profiling.section("decision")
+    col_a, col_b = st.columns(2)
+
+    with col_a:
+        if st.button("Approve", type="primary", disabled=approve_disabled):
+            # Optional guard: ensure ID still pending (avoid approving already-processed ID)
+            if pending_df.empty or selected_id not in pending_df["id"].astype(int).tolist():
+                st.error("الطلب المحدد لم يعد ضمن قائمة الانتظار. حدّث الصفحة واختر مجددًا.")
+            else:
+                ok = approve_request(int(selected_id), str(hr_name).strip(), hr_notes.strip())
+                if ok and is_queued("approve", int(selected_id)):
+                    st.info(f"الموافقة على الطلب #{int(selected_id)} في قائمة الانتظار وستُطبّق تلقائيًا.")
+                elif ok:
+                    st.success(f"تمت الموافقة على الطلب #{int(selected_id)}")
+                    st.rerun()
+                else:
+                    st.error("تعذّر تنفيذ الموافقة. تحقق من الطلب المحدد.")
+
+    with col_b:
+        if st.button("Reject", disabled=reject_disabled):
+            if pending_df.empty or selected_id not in pending_df["id"].astype(int).tolist():
+                st.error("الطلب المحدد لم يعد ضمن قائمة الانتظار. حدّث الصفحة واختر مجددًا.")
+            else:
+                ok = reject_request(int(selected_id), str(hr_name).strip(), hr_notes.strip())
+                if ok and is_queued("reject", int(selected_id)):
+                    st.info(f"رفض الطلب #{int(selected_id)} في قائمة الانتظار وسيُطبّق تلقائيًا.")
+                elif ok:
+                    st.warning(f"تم رفض الطلب #{int(selected_id)}")
+                    st.rerun()
+                else:
+                    st.error("تعذّر تنفيذ الرفض. تحقق من الطلب المحدد.")
+
+    st.divider()
+    st.subheader("Approved Hours Summary (per member)")
+    profiling.section("summary")
+    sum_df = summary_by_member("approved")
+    st.dataframe(sum_df, use_container_width=True , hide_index=True)
+
+    # ---------- Auto-approval ----------
+    st.divider()
+    st.subheader("الاعتماد التلقائي")
+    profiling.section("auto_approve")
+    rules = auto_approve.load_rules()
+    st.caption(
+        ("يعمل تلقائيًا كل " + f"{int(rules['interval_seconds'])} ث" if auto_enabled else "غير مفعّل (تشغيل يدوي فقط)")
+        + f" — الحد اليومي: {rules['max_hours_per_day']} س، الأسبوعي: {rules['max_hours_per_week']} س"
+        + " — الأقسام: " + ("، ".join(rules["departments"]) or "الكل")
+    )
+    if st.button("تشغيل الآن"):
+        with st.spinner("جارٍ فحص الطلبات المعلّقة..."):
+            auto_approve.run_once()
+        st.rerun()
+
+    report = auto_approve.last_report()
+    if report is None:
+        st.caption("لم يُشغَّل بعد منذ بدء تشغيل الخادم.")
+    else:
+        st.caption(f"آخر تشغيل: {report['ran_at']} UTC — تم اعتماد {len(report['approved'])} "
+                   f"من {report['checked']} طلبًا معلّقًا، وتُرك {len(report['exceptions'])} للمراجعة.")
+        if not report["exceptions"].empty:
+            st.dataframe(report["exceptions"].rename(columns={"reason": "سبب عدم الاعتماد"}),
+                         use_container_width=True, hide_index=True)
+
+    # ---------- Pipeline metrics ----------
+    st.divider()
+    st.subheader("مؤشرات المراجعة")
+    profiling.section("metrics")
+    snap = pipeline_metrics().snapshot()
+
+    m1, m2, m3, m4, m5 = st.columns(5)
+    m1.metric("قيد الانتظار", f"{snap['pending']}")
+    m2.metric("أقدم طلب معلّق", _h(snap["oldest_pending_hours"]))
+    m3.metric("زمن المراجعة p50", _h(snap["latency_hours"]["p50_h"]))
+    m4.metric("زمن المراجعة p90", _h(snap["latency_hours"]["p90_h"]))
+    m5.metric("زمن المراجعة p99", _h(snap["latency_hours"]["p99_h"]))
+
+    c_dept, c_rev = st.columns(2)
+    with c_dept:
+        st.caption("حسب القسم")
+        if not snap["by_dept"].empty:
+            st.dataframe(snap["by_dept"].rename(columns={
+                "dept": "القسم", "pending": "قيد الانتظار", "submitted": "مُرسلة",
+                "approved": "معتمدة", "rejected": "مرفوضة", **LATENCY_COLS}),
+                use_container_width=True, hide_index=True)
+    with c_rev:
+        st.caption("حسب المراجع")
+        if not snap["by_reviewer"].empty:
+            st.dataframe(snap["by_reviewer"].rename(columns={
+                "reviewer": "المراجع", "approved": "معتمدة", "rejected": "مرفوضة", **LATENCY_COLS}),
+                use_container_width=True, hide_index=True)
+
+    profiling.finish()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# Member Form view (pages/1_Member_Form.py and app.py).
+# - Search a member (name / student ID / national ID) or browse by department,
+#   pick one of the department's tasks and a date, and submit a pending request.
+# - The data layer (pandas, utils.sheets) is imported inside render(), after the
+#   title is on screen.
+
+from datetime import date, datetime
+
+import streamlit as st
+
+from utils import profiling
+
+# Arabic column constants
+COL_DEPT = "Department"
+COL_TASK = "المهمة"
+COL_MINUTES = "المدة المقترحة ( بالدقائق)"
+
+SEARCH_LIMIT = 50
+
+def render():
+    st.title("إرسال الساعات")
+    profiling.page("member_form")
+
+    import pandas as pd
+    from utils import auto_approve
+    from utils.sheets import (
+        list_departments,
+        get_member_index,
+        list_tasks_by_dept,
+        append_request_from_selection,
+        backend_status,
+        is_queued,
+    )
+
+    auto_approve.ensure_scheduler()
+
+    # --- Degraded mode banner ---
+    status = backend_status()
+    if not status["healthy"]:
+        st.warning("Google Sheets غير متاح حاليًا: تُعرض آخر بيانات محفوظة، "
+                   "وتُحفظ الطلبات في قائمة انتظار وتُرسل تلقائيًا عند عودة الاتصال.")
+
+    # --- Departments ---
+    profiling.section("departments")
+    depts = list_departments()
+    if not depts:
+        st.error("لا توجد أقسام في Member_Data.")
+        st.stop()
+
+    member_row_df = pd.DataFrame()
+    task_row_df = pd.DataFrame()
+
+    # --- Member: search (name / student ID / national ID) or browse by department ---
+    profiling.section("members_tasks")
+    index = get_member_index()
+    query = st.text_input("بحث عن عضو", placeholder="جزء من الاسم (عربي أو إنجليزي) أو الرقم الجامعي أو رقم الهوية")
+
+    if query.strip():
+        hits = index.search(query, limit=SEARCH_LIMIT)
+        if not hits:
+            st.warning("لا توجد نتائج مطابقة.")
+        sel_pos = st.selectbox("الاسم", options=hits, index=0 if hits else None,
+                               format_func=index.label, placeholder="اختر الاسم")
+        dept = None
+        if sel_pos is not None:
+            member_row_df = index.rows([sel_pos])
+            dept = str(member_row_df[COL_DEPT].iloc[0]).strip() or None
+            st.caption(f"القسم: {dept or 'غير محدد'}")
+    else:
+        dept = st.selectbox("القسم", options=depts, index=0)
+        positions = index.by_dept(dept) if dept else []
+        if dept and not positions:
+            st.warning("لا توجد أسماء ضمن هذا القسم في Member_Data.")
+        sel_pos = st.selectbox("الاسم", options=positions, index=0 if positions else None,
+                               format_func=index.name, placeholder="اختر الاسم")
+        if sel_pos is not None:
+            member_row_df = index.rows([sel_pos])
+
+    # --- Tasks for the member's department ---
+    if dept:
+        tasks_df = list_tasks_by_dept(dept)
+        if tasks_df.empty:
+            st.warning("لا توجد مهام لهذا القسم في Tasks_Data.")
+            labels = []
+        else:
+            # Build label
+            tasks_df = tasks_df.assign(__label__=tasks_df.apply(
+                lambda r: f"{r[COL_TASK]} — {int(r[COL_MINUTES])} دقيقة", axis=1
+            ))
+            labels = tasks_df["__label__"].tolist()
+
+        sel_task = st.selectbox("المهمة", options=labels, index=0 if labels else None, placeholder="اختر المهمة")
+        if labels and sel_task:
+            task_row_df = tasks_df[tasks_df["__label__"] == sel_task].head(1)
+            if not task_row_df.empty:
+                minutes = float(task_row_df[COL_MINUTES].iloc[0])
+                hours = round(minutes / 60.0, 2)
+                st.info(f"الساعات المحسوبة: **{hours} ساعة**")
+
+    # --- Date picker ---
+    date_val = st.date_input("التاريخ", value=date.today(), format="YYYY-MM-DD")
+
+    # --- Ready flag & submit button ---
+    profiling.section("submit")
+    ready_to_submit = (
+        bool(dept)
+        and not member_row_df.empty
+        and not task_row_df.empty
+        and isinstance(date_val, (date, datetime))
+    )
+
+    if st.button("إرسال الطلب", type="primary", disabled=not ready_to_submit):
+        # Final guards
+        if member_row_df.empty:
+            st.error("العضو غير موجود.")
+            st.stop()
+        if task_row_df.empty:
+            st.error("المهمة غير موجودة.")
+            st.stop()
+        if not isinstance(date_val, (date, datetime)):
+            st.error("صيغة التاريخ غير صحيحة.")
+            st.stop()
+
+        # Prepare dicts
+        member_row = member_row_df.iloc[0].to_dict()
+        task_row = task_row_df.iloc[0].to_dict()
+
+        # Date ISO
+        date_str = date_val.date().isoformat() if isinstance(date_val, datetime) else date_val.isoformat()
+
+        # Append to Requests
+        req_id = append_request_from_selection(
+            dept=dept,
+            member_row=member_row,
+            task_row=task_row,
+            date_str=date_str,
+        )
+
+        if req_id is not None and is_queued("submit", req_id):
+            st.info(f"تم استلام الطلب #{req_id} وهو في قائمة الانتظار؛ سيُرسل تلقائيًا عند عودة الاتصال.")
+        elif req_id is not None:
+            st.success(f"تم الإرسال. رقم الطلب: #{req_id}")
+        else:
+            st.error("حدث خطأ أثناء إرسال الطلب. حاول مرة أخرى.")
+
+    profiling.finish()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# My Hours view (pages/4_My_Hours.py and app.py).
+# Member self-service: enter a student ID, see current-period and lifetime totals,
+# the member's ranks (overall / department / period) and their pending / approved /
+# rejected requests.
+# - Served from the shared per-member index (utils.sheets.member_hours): one dict
+#   lookup per view, no per-view scans of Requests / Approved.
+
+import streamlit as st
+
+from utils import profiling
+
+COLS = {
+    "id": "رقم الطلب", "date": "التاريخ", "hours": "الساعات", "notes": "المهمة",
+    "hr_name": "المراجع", "hr_notes": "ملاحظات HR", "created_at": "تاريخ الإرسال",
+}
+
+def render():
+    st.title("ساعاتي")
+    profiling.page("my_hours")
+
+    from utils import leaderboard
+    from utils.sheets import member_hours, backend_status, leaderboard_service
+
+    status = backend_status()
+    if not status["healthy"]:
+        st.warning("Google Sheets غير متاح حاليًا: تُعرض آخر بيانات محفوظة.")
+
+    profiling.section("lookup")
+    student_id = st.text_input("الرقم الجامعي", placeholder="مثال: 441000000")
+    info = member_hours(student_id) if student_id.strip() else None
+
+    profiling.section("render")
+    if not student_id.strip():
+        st.caption("أدخل رقمك الجامعي لعرض ساعاتك وطلباتك.")
+    elif info is None:
+        st.warning("لا توجد بيانات لهذا الرقم الجامعي.")
+    else:
+        st.subheader(info["name"] or info["member_id"])
+
+        k1, k2, k3 = st.columns(3)
+        k1.metric("ساعات الفترة الحالية", f"{info['period_hours']:.2f}", help=f"{info['period_count']} طلب معتمد")
+        k2.metric("إجمالي الساعات المعتمدة", f"{info['lifetime_hours']:.2f}", help=f"{info['lifetime_count']} طلب معتمد")
+        k3.metric("طلبات قيد الانتظار", f"{len(info['pending'])}")
+
+        ranks = leaderboard_service().ranks(info["member_id"])
+        if ranks:
+            labels = {leaderboard.SCOPE_GLOBAL: "الترتيب العام", leaderboard.SCOPE_PERIOD: "الترتيب في الفترة"}
+            cols = st.columns(len(ranks))
+            for col, (scope, (rank, total)) in zip(cols, ranks.items()):
+                col.metric(labels.get(scope, "الترتيب في القسم"), f"{rank}", help=f"من {total} عضو")
+
+        tabs = st.tabs([
+            f"قيد الانتظار ({len(info['pending'])})",
+            f"معتمدة ({len(info['approved'])})",
+            f"مرفوضة ({len(info['rejected'])})",
+        ])
+        for tab, key in zip(tabs, ("pending", "approved", "rejected")):
+            with tab:
+                df = info[key]
+                if df.empty:
+                    st.caption("لا توجد طلبات.")
+                else:
+                    view = df[[c for c in COLS if c in df.columns]].rename(columns=COLS)
+                    st.dataframe(view, use_container_width=True, hide_index=True)
+
+    profiling.finish()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Period Admin view (pages/Period_Admin.py and app.py).
+# - يعرض الـ Anchor الحالي
+# - يكوّن Snapshot للفترة الحالية (من Approved منذ الـ Anchor) عبر current_period_rollup
+# - زر واحد: تنزيل CSV للفترة الحالية + تصفير منطقي (لقطة مجمّدة للفترة + ضبط Anchor الآن وإعادة بناء الورقة)
+# - سجل الفترات المغلقة (ورقة Periods) مع مقارنة كل فترة بالتي قبلها
+# - فحص اتساق الأوراق (utils.reconcile): آخر نتيجة، وزرّا فحص / فحص وإصلاح
+
+from datetime import datetime
+
+import streamlit as st
+
+from utils import profiling
+
+def render():
+    st.title(" إدارة فترة الرفع")
+    profiling.page("period_admin")
+
+    import pandas as pd
+    from utils.sheets import (
+        get_period_anchor,
+        set_period_anchor_now,
+        current_period_rollup,   # نفس محرّك التجميع المستخدم في Members_Period
+        list_periods,
+        get_period_snapshot,
+        compare_periods,
+        approved_version,
+    )
+    from utils import reconcile
+    from utils.exports import export_controls
+
+    reconcile_enabled = reconcile.ensure_scheduler()
+    profiling.section("anchor")
+
+    anchor = get_period_anchor()
+
+    st.markdown("**المرجع الزمني الحالي:** " + (str(anchor) if anchor is not None else "غير محدد"))
+    st.info(
+        "سيقوم الزر أدناه بإنشاء ملف بيانات للفترة الحالية (منذ المرجع الزمني)، "
+        "ثم حفظ لقطة مجمّدة للفترة في ورقة مستقلة، وضبط المرجع الزمني على الوقت الحالي "
+        "وإعادة بناء لوحة فترة الأعضاء. لن تُحذف أي بيانات سابقة."
+    )
+
+    # ---------- الفترة الحالية (منذ الـ Anchor) ----------
+    profiling.section("current_period")
+    period_df = current_period_rollup()
+
+    st.subheader("معاينة الفترة الحالية")
+    st.dataframe(period_df, use_container_width=True, hide_index=True)
+
+    # ---------- زر: تنزيل ملف الفترة + تصفير الفترة ----------
+    profiling.section("export")
+    def _reset_period():
+        # يضبط الـ Anchor الآن ويعيد بناء Members_Period
+        ts = set_period_anchor_now()
+        st.session_state["period_reset_done"] = ts
+
+    export_controls(
+        period_df,
+        file_stem=f"members_period_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
+        key="period_export",
+        version=(str(anchor), approved_version()),
+        label=" تنزيل الفترة الحالية + بدء فترة جديدة",
+        on_click=_reset_period,   # بعد بدء التنزيل يُضبط الـ Anchor ويُعاد البناء
+        button_type="primary",
+    )
+
+    if "period_reset_done" in st.session_state:
+        st.success(f"تم ضبط Anchor على: {st.session_state['period_reset_done']}")
+        st.caption("تم أيضًا حفظ لقطة الفترة السابقة وإعادة بناء ورقة Members_Period للفترة الجديدة.")
+
+
+    st.divider()
+
+    # ---------- سجل الفترات المغلقة ----------
+    profiling.section("history")
+    st.subheader("الفترات السابقة")
+    periods = list_periods()
+    if periods.empty:
+        st.caption("لا توجد فترات مغلقة بعد.")
+    else:
+        def _period_label(r) -> str:
+            start = r["start"].strftime("%Y-%m-%d") if pd.notna(r["start"]) else "البداية"
+            end = r["end"].strftime("%Y-%m-%d") if pd.notna(r["end"]) else "?"
+            return f"{start} → {end} — {r['total_hours']:.2f} ساعة / {r['members']} عضو"
+
+        labels = {row["period_id"]: _period_label(row) for _, row in periods.iterrows()}
+        st.dataframe(periods.drop(columns=["sheet"]), use_container_width=True, hide_index=True)
+
+        sel_id = st.selectbox("عرض فترة", options=list(labels), format_func=labels.get)
+        if sel_id:
+            ids = list(labels)
+            pos = ids.index(sel_id)
+            base_id = ids[pos + 1] if pos + 1 < len(ids) else None   # الفترة التي قبلها
+            if base_id:
+                st.caption("مقارنة بالفترة السابقة: " + labels[base_id])
+                st.dataframe(compare_periods(sel_id, base_id), use_container_width=True, hide_index=True)
+            else:
+                st.dataframe(get_period_snapshot(sel_id), use_container_width=True, hide_index=True)
+
+    # ---------- فحص اتساق الأوراق ----------
+    st.divider()
+    profiling.section("reconcile")
+    st.subheader("فحص اتساق الأوراق")
+    settings = reconcile.load_settings()
+    st.caption(
+        (f"يعمل تلقائيًا كل {int(settings['interval_seconds'])} ث"
+         + (" مع الإصلاح" if settings["repair"] else " (تقرير فقط)")
+         if reconcile_enabled else "غير مفعّل (تشغيل يدوي فقط)")
+        + " — يقارن Approved وRejected ولوحات الساعات بورقة Requests، ويعيد فحص الأجزاء التي تغيّرت فقط."
+    )
+    r1, r2 = st.columns(2)
+    run = None
+    if r1.button("فحص الآن"):
+        run = False
+    if r2.button("فحص وإصلاح"):
+        run = True
+    if run is not None:
+        with st.spinner("جارٍ الفحص..."):
+            reconcile.run_once(repair=run)
+        st.rerun()
+
+    report = reconcile.last_report()
+    if report is None:
+        st.caption("لم يُشغَّل بعد منذ بدء تشغيل الخادم.")
+    else:
+        st.caption(f"آخر تشغيل: {report['ran_at']} UTC — أجزاء متغيرة: {report['blocks_changed']} من {report['blocks']}، "
+                   f"طلبات مفحوصة: {report['requests_checked']}، مشكلات: {len(report['issues'])}، "
+                   f"عمليات كتابة: {report['writes']}.")
+        if not report["issues"].empty:
+            st.dataframe(report["issues"].rename(columns={
+                "sheet": "الورقة", "key": "المفتاح", "issue": "المشكلة", "detail": "التفاصيل", "repaired": "أُصلحت"}),
+                use_container_width=True, hide_index=True)
+
+    profiling.finish()